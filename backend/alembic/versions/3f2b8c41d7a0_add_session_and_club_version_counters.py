@@ -0,0 +1,29 @@
+"""Add session and club version counters
+
+Revision ID: 3f2b8c41d7a0
+Revises: a9aba53724ab
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2b8c41d7a0'
+down_revision: Union[str, None] = 'a9aba53724ab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sessions', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('sessions', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('clubs', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('clubs', 'version')
+    op.drop_column('sessions', 'updated_at')
+    op.drop_column('sessions', 'version')
@@ -0,0 +1,25 @@
+"""Add fairness metrics to session history
+
+Revision ID: 8c5e07a2b913
+Revises: 3f2b8c41d7a0
+Create Date: 2026-10-18 11:40:07.215533
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5e07a2b913'
+down_revision: Union[str, None] = '3f2b8c41d7a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('session_history', sa.Column('fairness_metrics', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('session_history', 'fairness_metrics')
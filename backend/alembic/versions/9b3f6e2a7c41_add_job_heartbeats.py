@@ -0,0 +1,25 @@
+"""Add a heartbeat to running jobs
+
+Revision ID: 9b3f6e2a7c41
+Revises: c5e18b7f2d93
+Create Date: 2026-10-19 21:14:36.508213
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3f6e2a7c41'
+down_revision: Union[str, None] = 'c5e18b7f2d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeat_at')
@@ -0,0 +1,33 @@
+"""Add match scores and player ratings
+
+Revision ID: a7d2e94c1b36
+Revises: f3a81c6d5e27
+Create Date: 2026-10-19 16:02:41.530917
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e94c1b36'
+down_revision: Union[str, None] = 'f3a81c6d5e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('court_assignments', sa.Column('team_a_score', sa.Integer(), nullable=True))
+    op.add_column('court_assignments', sa.Column('team_b_score', sa.Integer(), nullable=True))
+    op.add_column('court_assignments', sa.Column('rating_delta', sa.Float(), nullable=True))
+    op.add_column('players', sa.Column('rating', sa.Float(), nullable=True))
+    op.add_column('players', sa.Column('rating_matches', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('players', 'rating_matches')
+    op.drop_column('players', 'rating')
+    op.drop_column('court_assignments', 'rating_delta')
+    op.drop_column('court_assignments', 'team_b_score')
+    op.drop_column('court_assignments', 'team_a_score')
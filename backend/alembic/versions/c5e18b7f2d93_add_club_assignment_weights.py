@@ -0,0 +1,25 @@
+"""Add tuned assignment weights to club settings
+
+Revision ID: c5e18b7f2d93
+Revises: a7d2e94c1b36
+Create Date: 2026-10-19 18:47:12.204611
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e18b7f2d93'
+down_revision: Union[str, None] = 'a7d2e94c1b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('club_settings', sa.Column('assignment_weights', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('club_settings', 'assignment_weights')
@@ -0,0 +1,29 @@
+"""Add row versions for delta sync
+
+Revision ID: d4a9c3e6f1b8
+Revises: b71d4e9a02c6
+Create Date: 2026-10-18 16:40:12.518304
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9c3e6f1b8'
+down_revision: Union[str, None] = 'b71d4e9a02c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('attendances', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('rounds', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('court_assignments', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('court_assignments', 'version')
+    op.drop_column('rounds', 'version')
+    op.drop_column('attendances', 'version')
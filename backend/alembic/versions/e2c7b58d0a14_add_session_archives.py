@@ -0,0 +1,35 @@
+"""Add session archives for cold storage of ended sessions
+
+Revision ID: e2c7b58d0a14
+Revises: d4a9c3e6f1b8
+Create Date: 2026-10-19 09:12:44.301876
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7b58d0a14'
+down_revision: Union[str, None] = 'd4a9c3e6f1b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('session_archives',
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('format', sa.String(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('round_count', sa.Integer(), nullable=False),
+    sa.Column('court_count', sa.Integer(), nullable=False),
+    sa.Column('raw_size', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('session_archives')
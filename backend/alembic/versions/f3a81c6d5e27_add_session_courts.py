@@ -0,0 +1,40 @@
+"""Add per-session court attributes
+
+Revision ID: f3a81c6d5e27
+Revises: e2c7b58d0a14
+Create Date: 2026-10-19 14:37:05.118204
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a81c6d5e27'
+down_revision: Union[str, None] = 'e2c7b58d0a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('session_courts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('court_number', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('show_court', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.Column('poor_lighting', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.Column('beginners_only', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id', 'court_number', name='uq_session_court_number')
+    )
+    op.create_index(op.f('ix_session_courts_id'), 'session_courts', ['id'], unique=False)
+    op.create_index(op.f('ix_session_courts_session_id'), 'session_courts', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_session_courts_session_id'), table_name='session_courts')
+    op.drop_index(op.f('ix_session_courts_id'), table_name='session_courts')
+    op.drop_table('session_courts')
@@ -7,6 +7,8 @@ This module implements a fair court assignment algorithm that:
 3. Avoids repeating recent partners and opponents
 4. Respects match type preferences (MM/MF/FF)
 5. Handles locked courts
+6. Maps groups to courts by min-cost assignment over court variety and
+   court attributes (see app/court_allocation.py)
 
 The algorithm is deterministic - same inputs produce same outputs.
 """
@@ -16,7 +18,10 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Dict, List, Optional, Set, Tuple
 
+from app.court_allocation import CourtInfo, allocate_courts
 from app.models import Gender, MatchType
+from app.profiling import current_profile
+from app.tracing import traced
 
 
 @dataclass
@@ -46,6 +51,9 @@ class AssignmentPreferences:
     avoid_repeat_opponents: float = 0.3
     balance_skill: float = 0.5
     court_variety: float = 0.3  # Weight for court variation
+    show_court_weight: float = 1.0  # Keep the show court for the strongest group
+    beginner_court_weight: float = 1.0  # Keep beginners-only courts for the weakest groups
+    poor_lighting_rotation: float = 1.0  # Avoid giving a poor-lighting court to the same players twice
 
 
 @dataclass
@@ -159,13 +167,13 @@ def calculate_partnership_penalty(
 
 def find_best_team_arrangement(
     players: List[PlayerStats],
-    preferences: AssignmentPreferences,
-    court_number: int = 0
+    preferences: AssignmentPreferences
 ) -> Tuple[Tuple[int, int], Tuple[int, int]]:
     """
     Find the best way to divide 4 players into 2 teams of 2.
     Returns indices of team A and team B.
-    Considers: skill balance, partner/opponent variety, court variety, and ensures valid match types.
+    Considers: skill balance, partner/opponent variety, and ensures valid match types.
+    Court variety does not depend on the arrangement; it is handled when groups are mapped to courts.
     """
     # Count genders in the group
     gender_count = {}
@@ -202,6 +210,10 @@ def find_best_team_arrangement(
             ((0, 3), (1, 2))
         ]
     
+    profile = current_profile()
+    if profile is not None:
+        profile.count("arrangements_evaluated", len(arrangements))
+    
     best_score = float('inf')
     best_arrangement = arrangements[0]
     
@@ -217,13 +229,7 @@ def find_best_team_arrangement(
             players, team_a_idx, team_b_idx, preferences
         )
         
-        # Calculate court variety penalty (prefer courts players haven't used)
-        court_penalty = 0.0
-        for player in players:
-            if court_number in player.courts_played:
-                court_penalty += preferences.court_variety * 3.0
-        
-        total_score = balance_score * 100.0 + partnership_penalty + court_penalty
+        total_score = balance_score * 100.0 + partnership_penalty
         
         if total_score < best_score:
             best_score = total_score
@@ -272,12 +278,14 @@ def select_players_for_match_type(
     return selected_groups
 
 
+@traced(kind="algorithm")
 def auto_assign_courts(
     player_stats: List[PlayerStats],
     num_courts: int,
     current_round: int,
     preferences: AssignmentPreferences,
-    locked_courts: Optional[Dict[int, List[int]]] = None
+    locked_courts: Optional[Dict[int, List[int]]] = None,
+    courts: Optional[Dict[int, CourtInfo]] = None
 ) -> Tuple[List[CourtAssignment], List[int]]:
     """
     Main auto-assignment algorithm.
@@ -288,10 +296,13 @@ def auto_assign_courts(
         current_round: Current round index
         preferences: Assignment preferences
         locked_courts: Dict of court_number -> [4 player IDs] for locked courts
+        courts: Dict of court_number -> CourtInfo for courts with attributes
     
     Returns:
         Tuple of (court_assignments, waiting_player_ids)
     """
+    profile = current_profile()
+    
     # Seed random for deterministic results
     random.seed(42 + current_round)
     
@@ -309,6 +320,10 @@ def auto_assign_courts(
         key=lambda p: calculate_priority_score(p, current_round, preferences),
         reverse=True
     )
+    if profile is not None:
+        profile.lap("priority_sort")
+        profile.count("players_available", len(available_players))
+        profile.count("players_locked", len(locked_player_ids))
     
     # Calculate how many courts we need to fill
     num_courts_to_fill = num_courts - (len(locked_courts) if locked_courts else 0)
@@ -415,10 +430,11 @@ def auto_assign_courts(
     
     # Remaining players wait
     remaining_players = males + females
+    if profile is not None:
+        profile.lap("gender_grouping")
     
     # Group selected players into courts (groups of 4)
     court_assignments = []
-    court_number = 0
     
     # Add locked courts first
     if locked_courts:
@@ -428,7 +444,7 @@ def auto_assign_courts(
                 p for p in player_stats if p.player_id in locked_player_ids_list
             ]
             if len(locked_players) == 4:
-                team_a_idx, team_b_idx = find_best_team_arrangement(locked_players, preferences, locked_court_num)
+                team_a_idx, team_b_idx = find_best_team_arrangement(locked_players, preferences)
                 match_type = determine_match_type(locked_players, team_a_idx, team_b_idx)
                 
                 court_assignments.append(CourtAssignment(
@@ -439,27 +455,27 @@ def auto_assign_courts(
                            locked_players[team_b_idx[1]].player_id),
                     match_type=match_type
                 ))
-                court_number = max(court_number, locked_court_num + 1)
-    
-    # Assign remaining courts
-    for i in range(0, len(selected_players), 4):
-        if i + 4 <= len(selected_players):
-            # Skip court numbers already used by locked courts
-            while locked_courts and court_number in locked_courts:
-                court_number += 1
-            
-            group = selected_players[i:i+4]
-            # Find best team arrangement (considers skill balance, partners, opponents, and court variety)
-            team_a_idx, team_b_idx = find_best_team_arrangement(group, preferences, court_number)
-            match_type = determine_match_type(group, team_a_idx, team_b_idx)
-            
-            court_assignments.append(CourtAssignment(
-                court_number=court_number,
-                team_a=(group[team_a_idx[0]].player_id, group[team_a_idx[1]].player_id),
-                team_b=(group[team_b_idx[0]].player_id, group[team_b_idx[1]].player_id),
-                match_type=match_type
-            ))
-            court_number += 1
+    
+    # Map the remaining groups to the free courts (min-cost assignment)
+    groups = [selected_players[i:i+4] for i in range(0, len(selected_players) - 3, 4)]
+    free_courts = [c for c in range(num_courts) if not locked_courts or c not in locked_courts]
+    court_numbers = allocate_courts(groups, free_courts, courts or {}, preferences)
+    
+    for group, court_number in zip(groups, court_numbers):
+        # Find best team arrangement (considers skill balance, partners and opponents)
+        team_a_idx, team_b_idx = find_best_team_arrangement(group, preferences)
+        match_type = determine_match_type(group, team_a_idx, team_b_idx)
+        
+        court_assignments.append(CourtAssignment(
+            court_number=court_number,
+            team_a=(group[team_a_idx[0]].player_id, group[team_a_idx[1]].player_id),
+            team_b=(group[team_b_idx[0]].player_id, group[team_b_idx[1]].player_id),
+            match_type=match_type
+        ))
+    
+    if profile is not None:
+        profile.lap("team_arrangement")
+        profile.count("courts_assigned", len(court_assignments))
     
     # Waiting players are those not assigned
     waiting_player_ids = [p.player_id for p in remaining_players]
@@ -0,0 +1,169 @@
+"""
+Cold storage for the rounds of ended sessions.
+
+``rounds`` and ``court_assignments`` only ever grow. Once a session has been
+ended for ``ARCHIVE_AFTER_DAYS`` its rounds and courts are encoded into a
+single SessionArchive row and deleted from the hot tables, so per-session
+queries keep scanning small tables.
+
+The payload is column-oriented JSON (one list per column, so repeated keys
+and player ids compress well) deflated with zlib. Read paths go through
+``session_rounds``, which returns the live rows or, for an archived session,
+detached Round/CourtAssignment objects decoded from the archive with their
+original ids and versions, so responses are byte-for-byte the same.
+``unarchive_session`` writes the rows back; ``write_archive`` re-encodes an
+archive whose decoded rows were changed (e.g. recomputed rating deltas).
+"""
+
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from app.models import CourtAssignment, MatchType, Round
+from app.models import Session as SessionModel
+from app.models import SessionArchive, SessionStatus
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+
+ARCHIVE_FORMAT = "columnar-json+zlib/1"
+
+ROUND_COLUMNS = ["id", "round_index", "started_at", "ended_at", "created_at", "version"]
+COURT_COLUMNS = [
+    "id", "round_id", "court_number",
+    "team_a_player1_id", "team_a_player2_id", "team_b_player1_id", "team_b_player2_id",
+    "match_type", "locked", "team_a_score", "team_b_score", "rating_delta", "version",
+]
+_DATETIME_COLUMNS = {"started_at", "ended_at", "created_at"}
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, MatchType):
+        return value.value
+    return value
+
+
+def _decode_value(column: str, value):
+    if value is None:
+        return None
+    if column in _DATETIME_COLUMNS:
+        return datetime.fromisoformat(value)
+    if column == "match_type":
+        return MatchType(value)
+    return value
+
+
+def encode_rounds(rounds: List[Round]) -> bytes:
+    """Encode rounds and their courts as uncompressed columnar JSON."""
+    courts = [court for round_obj in rounds for court in round_obj.court_assignments]
+    document = {
+        "rounds": {c: [_encode_value(getattr(r, c)) for r in rounds] for c in ROUND_COLUMNS},
+        "courts": {c: [_encode_value(getattr(ca, c)) for ca in courts] for c in COURT_COLUMNS},
+    }
+    return json.dumps(document, separators=(",", ":")).encode("utf-8")
+
+
+def decode_rounds(raw: bytes, session_id: int) -> List[Round]:
+    """Rebuild detached Round objects (with court_assignments) from ``encode_rounds`` output."""
+    document = json.loads(raw)
+    round_columns = document["rounds"]
+    court_columns = document["courts"]
+
+    rounds = {}
+    for values in zip(*(round_columns[c] for c in ROUND_COLUMNS)):
+        fields = {c: _decode_value(c, v) for c, v in zip(ROUND_COLUMNS, values)}
+        rounds[fields["id"]] = Round(session_id=session_id, court_assignments=[], **fields)
+
+    # Columns added after a session was archived decode as None
+    court_count = len(court_columns["id"])
+    for values in zip(*(court_columns.get(c, [None] * court_count) for c in COURT_COLUMNS)):
+        fields = {c: _decode_value(c, v) for c, v in zip(COURT_COLUMNS, values)}
+        rounds[fields["round_id"]].court_assignments.append(CourtAssignment(**fields))
+
+    return sorted(rounds.values(), key=lambda r: r.round_index)
+
+
+def decode_archive(archive: SessionArchive) -> List[Round]:
+    if archive.format != ARCHIVE_FORMAT:
+        raise ValueError(f"Unsupported session archive format: {archive.format}")
+    return decode_rounds(zlib.decompress(archive.payload), archive.session_id)
+
+
+def write_archive(archive: SessionArchive, rounds: List[Round]) -> SessionArchive:
+    """Store ``rounds`` (with their courts) as the archive's payload. The caller commits."""
+    raw = encode_rounds(rounds)
+    archive.format = ARCHIVE_FORMAT
+    archive.payload = zlib.compress(raw, 9)
+    archive.round_count = len(rounds)
+    archive.court_count = sum(len(r.court_assignments) for r in rounds)
+    archive.raw_size = len(raw)
+    return archive
+
+
+def session_rounds(session: SessionModel) -> List[Round]:
+    """A session's rounds ordered by round_index, read from the archive if the session is archived."""
+    if session.archive is not None:
+        return decode_archive(session.archive)
+    return sorted(session.rounds, key=lambda r: r.round_index)
+
+
+def archive_session(db: Session, session: SessionModel) -> SessionArchive:
+    """Move an ended session's rounds into a SessionArchive row. The caller commits."""
+    if session.status != SessionStatus.ENDED:
+        raise ValueError(f"Session {session.id} has not ended")
+    if session.archive is not None:
+        raise ValueError(f"Session {session.id} is already archived")
+
+    rounds = db.query(Round).options(selectinload(Round.court_assignments)).filter(
+        Round.session_id == session.id
+    ).order_by(Round.round_index).all()
+    archive = write_archive(SessionArchive(session_id=session.id, archived_at=datetime.utcnow()), rounds)
+    session.archive = archive
+
+    round_ids = [r.id for r in rounds]
+    if round_ids:
+        db.query(CourtAssignment).filter(CourtAssignment.round_id.in_(round_ids)).delete(synchronize_session=False)
+        db.query(Round).filter(Round.id.in_(round_ids)).delete(synchronize_session=False)
+    for round_obj in rounds:
+        db.expunge(round_obj)
+    db.expire(session, ["rounds"])
+    return archive
+
+
+def unarchive_session(db: Session, session: SessionModel) -> int:
+    """Write an archived session's rounds back to the hot tables with their original ids. The caller commits."""
+    archive = session.archive
+    if archive is None:
+        raise ValueError(f"Session {session.id} is not archived")
+
+    rounds = decode_archive(archive)
+    if rounds:
+        db.execute(insert(Round), [
+            dict({c: getattr(r, c) for c in ROUND_COLUMNS}, session_id=session.id) for r in rounds
+        ])
+        courts = [court for r in rounds for court in r.court_assignments]
+        if courts:
+            db.execute(insert(CourtAssignment), [{c: getattr(ca, c) for c in COURT_COLUMNS} for ca in courts])
+
+    session.archive = None
+    db.flush()
+    db.expire(session, ["rounds"])
+    return len(rounds)
+
+
+def archivable_sessions(db: Session, older_than_days: int, club_id: Optional[int] = None, limit: Optional[int] = None):
+    """Ended, not yet archived sessions whose end is older than ``older_than_days``."""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    query = db.query(SessionModel).outerjoin(SessionArchive).filter(
+        SessionModel.status == SessionStatus.ENDED,
+        SessionModel.ended_at < cutoff,
+        SessionArchive.session_id.is_(None)
+    )
+    if club_id is not None:
+        query = query.filter(SessionModel.club_id == club_id)
+    query = query.order_by(SessionModel.ended_at)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
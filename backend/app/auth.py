@@ -1,17 +1,92 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 
 import bcrypt
 from app.config import settings
+from app.tracing import submit
 from jose import JWTError, jwt
 
 
+# bcrypt is CPU-bound (and releases the GIL), so every request hashes on a
+# small dedicated pool instead of tying up the event loop or the request
+# threadpool. Submissions beyond workers + queue are rejected so a login
+# burst cannot pile up.
+@lru_cache()
+def get_password_executor() -> ThreadPoolExecutor:
+    """The password hashing pool, created on first use."""
+    return ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+_in_flight = 0  # Hashes running or queued on the pool
+_in_flight_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
 def get_password_hash(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost factor than BCRYPT_ROUNDS."""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def _password_capacity() -> int:
+    return settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+
+
+def _release(_=None) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def _submit(fn, *args) -> Future:
+    global _in_flight
+    with _in_flight_lock:
+        if _in_flight >= _password_capacity():
+            raise PasswordHasherBusy()
+        _in_flight += 1
+    try:
+        future = submit(get_password_executor(), fn, *args)
+    except Exception:
+        _release()
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+def password_queue_usage() -> Tuple[int, int]:
+    """(hashes running or queued, capacity) of the password hashing pool."""
+    with _in_flight_lock:
+        return _in_flight, _password_capacity()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit(verify_password, plain_password, hashed_password))
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(get_password_hash, password))
+
+
+def get_password_hash_pooled(password: str) -> str:
+    """``get_password_hash`` on the hashing pool, for sync endpoints (raises PasswordHasherBusy)."""
+    return _submit(get_password_hash, password).result()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -20,7 +95,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
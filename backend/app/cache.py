@@ -0,0 +1,160 @@
+"""
+HTTP conditional caching for read-heavy endpoints.
+
+ETags are derived from the session/club version counters (see
+app/versioning.py), so a matching ``If-None-Match`` can be answered with
+``304 Not Modified`` without touching rounds, courts or history rows.
+Serialised bodies are kept in a small in-process LRU cache bounded by both
+entry count and total bytes.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+from app.config import settings
+from fastapi import Request, Response
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of serialised response bodies keyed by resource."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        """Return the cached body for key if it was stored under the same ETag."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, etag: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[key] = (etag, body)
+            self._size += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """The process-wide response cache, created on first use."""
+    return ResponseCache(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes=settings.RESPONSE_CACHE_MAX_BYTES
+    )
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the given identity/version parts."""
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" matches "x"
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+
+def _to_http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value, usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the resource."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        modified = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    # Always revalidate: even an ended session can be restarted, which resets its rounds
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = _to_http_date(last_modified)
+    return headers
+
+
+def conditional_response(
+    request: Request,
+    cache_key: str,
+    etag: str,
+    build_body: Callable[[], bytes],
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """
+    Answer a GET with 304, a cached body, or a freshly built body.
+
+    ``build_body`` is only called on a cache miss and must return the JSON
+    encoded payload.
+    """
+    headers = cache_headers(etag, last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    response_cache = get_response_cache()
+    body = response_cache.get(cache_key, etag)
+    if body is None:
+        body = build_body()
+        response_cache.set(cache_key, etag, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
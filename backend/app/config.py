@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,8 +9,102 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Authenticated principal cache (see app/principals.py)
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # 0 disables the cache
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_TOKEN_CLAIMS: bool = False  # Embed and trust uid/role/club_id claims in access tokens
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded on the next successful login
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Logins beyond workers + queue get 503
+
+    # Server-side response cache for conditional GETs
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Session dashboard delta sync: clients further behind get a full payload,
+    # which also refreshes players that changed outside the session
+    DASHBOARD_MAX_DELTA_VERSIONS: int = 200
+
+    # Background job runner
+    JOB_WORKERS: int = 2  # 0 disables the in-process runner
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_HEARTBEAT_SECONDS: float = 30.0  # How often a worker marks its running job as alive
+    JOB_STALE_AFTER_SECONDS: int = 600  # Running jobs without a heartbeat for this long are re-queued
+    JOB_STALE_SWEEP_SECONDS: float = 60.0  # How often workers look for stale jobs and expired files
+    JOB_RETENTION_DAYS: int = 30  # Finished jobs older than this are deleted
+    EXPORT_DIR: str = "exports"
+    EXPORT_RETENTION_DAYS: int = 7  # Export files older than this are deleted
+
+    # Cold storage of ended sessions (see app/archive.py and archive_sessions.py)
+    ARCHIVE_AFTER_DAYS: int = 90
+
+    # Live session event feed
+    EVENT_BUFFER_SIZE: int = 200  # Events kept per session for resume
+    EVENT_SUBSCRIBER_QUEUE_SIZE: int = 100
+    EVENT_MAX_CHANNELS: int = 1000  # Sessions with buffered events; idle ones are evicted first
+    EVENT_HEARTBEAT_SECONDS: float = 15.0
+
+    # Response compression (Brotli is used when the brotli package is installed)
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Request metrics (see app/metrics.py)
+    METRICS_ENABLED: bool = True
+    METRICS_QUERY_BUDGET: int = 50  # SQL statements per request before it is flagged; 0 disables
+    SERVER_TIMING: bool = False  # Add Server-Timing headers with SQL and total time
+    ASSIGNMENT_PROFILING: bool = False  # Profile every auto-assign into the metrics, not just ?profile=true
+
+    # Slow-query log (see app/slow_queries.py)
+    SLOW_QUERY_MS: float = 0  # Statements slower than this are recorded; 0 disables
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # Share of slow SELECTs re-run under EXPLAIN ANALYZE
+    SLOW_QUERY_LOG_FILE: str = "logs/slow_queries.jsonl"  # Empty to keep records in memory only
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    SLOW_QUERY_BUFFER_SIZE: int = 200  # Records kept for GET /super-admin/slow-queries
+
+    # Request tracing (see app/tracing.py)
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "jsonl"  # "jsonl", "memory" or "package.module:factory"
+    TRACING_FILE: str = "logs/traces.jsonl"
+    TRACING_SAMPLE_RATE: float = 1.0  # Share of requests traced
+
+    # What-if round previews (see app/preview.py)
+    PREVIEW_WORKERS: int = 2  # Worker processes; 0 evaluates variants in the request thread
+    PREVIEW_MAX_VARIANTS: int = 8
+
+    # Readiness probe (see app/health.py)
+    HEALTH_CACHE_SECONDS: float = 2.0  # Probes within this window reuse the last result
+    HEALTH_MAX_POOL_USAGE: float = 0.9  # Share of pool connections (incl. overflow) checked out
+    HEALTH_CHECK_MIGRATIONS: bool = True  # Not ready until the database is at the Alembic head
+    HEALTH_MAX_JOB_BACKLOG: int = 1000  # Runnable queued jobs
+    HEALTH_MAX_EXECUTOR_QUEUE_USAGE: float = 0.9  # Share of a bounded in-process queue in use
+
+    # Router groups served by create_app(); "auth" is always included.
+    # "club": players, sessions, club settings, statistics, exports, jobs;
+    # "portal": /me; "super_admin": /super-admin
+    ROUTER_GROUPS: str = "club,portal,super_admin"
+
     class Config:
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache()
+def get_settings() -> Settings:
+    return Settings()
+
+
+class LazySettings:
+    """Module-level ``settings`` that reads the environment on first use rather than at import."""
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+
+settings = LazySettings()
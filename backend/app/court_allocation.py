@@ -0,0 +1,145 @@
+"""
+Mapping match groups to courts as a min-cost assignment problem.
+
+Once the groups of four and their teams are fixed, every (group, court)
+pair gets a cost:
+
+* court variety: players who already played on that court,
+* show court: weaker groups (the strongest group should get it),
+* beginners-only court: stronger groups,
+* poor lighting: players who already had a poor-lighting court this
+  session, so the bad court rotates.
+
+Group strength is the group's mean ``numeric_rank`` scaled to 0-1 between
+the weakest and strongest group of the round. The groups are then mapped to
+distinct free courts with the Hungarian algorithm (O(n² m) for n groups and
+m >= n courts), which minimises the total cost exactly. A tiny tie-break
+keeps groups on consecutive courts in selection order when nothing else
+matters, as before.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+# Same scale as the other per-player penalties of the algorithm
+PENALTY_SCALE = 3.0
+TIE_BREAK = 1e-6
+
+
+@dataclass
+class CourtInfo:
+    """Attributes of a court (see models.SessionCourt)."""
+    court_number: int
+    name: Optional[str] = None
+    show_court: bool = False
+    poor_lighting: bool = False
+    beginners_only: bool = False
+
+
+def hungarian(cost: Sequence[Sequence[float]]) -> List[int]:
+    """Assign every row to a distinct column minimising the total cost.
+
+    ``cost`` is n x m with n <= m. Returns the column chosen for each row.
+    Shortest augmenting path formulation with row/column potentials.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    if n > m:
+        raise ValueError(f"Cannot assign {n} rows to {m} columns")
+
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # owner[j]: row (1-based) assigned to column j, 0 if free
+    way = [0] * (m + 1)
+
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        min_reduced = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - u[i0] - v[j]
+                    if reduced < min_reduced[j]:
+                        min_reduced[j] = reduced
+                        way[j] = j0
+                    if min_reduced[j] < delta:
+                        delta = min_reduced[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_reduced[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    assignment = [0] * n
+    for j in range(1, m + 1):
+        if owner[j]:
+            assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
+def group_strengths(groups: Sequence[Sequence]) -> List[float]:
+    """Mean numeric_rank of each group scaled to 0 (weakest group) .. 1 (strongest)."""
+    means = [sum(p.numeric_rank for p in group) / len(group) for group in groups]
+    if not means:
+        return []
+    low, high = min(means), max(means)
+    if high == low:
+        return [0.5] * len(means)
+    return [(mean - low) / (high - low) for mean in means]
+
+
+def court_cost(group: Sequence, strength: float, court_number: int, court: Optional[CourtInfo],
+               poor_lighting_courts: set, preferences) -> float:
+    cost = sum(1 for p in group if court_number in p.courts_played) * preferences.court_variety * PENALTY_SCALE
+    if court is None:
+        return cost
+    if court.show_court:
+        cost += (1.0 - strength) * preferences.show_court_weight * PENALTY_SCALE
+    if court.beginners_only:
+        cost += strength * preferences.beginner_court_weight * PENALTY_SCALE
+    if court.poor_lighting:
+        repeats = sum(1 for p in group if p.courts_played & poor_lighting_courts)
+        cost += repeats * preferences.poor_lighting_rotation * PENALTY_SCALE
+    return cost
+
+
+def allocate_courts(
+    groups: Sequence[Sequence],
+    court_numbers: Sequence[int],
+    courts: Dict[int, CourtInfo],
+    preferences
+) -> List[int]:
+    """Court number for each group (groups of PlayerStats, in selection order)."""
+    if len(groups) > len(court_numbers):
+        raise ValueError(f"{len(groups)} groups but only {len(court_numbers)} free courts")
+    strengths = group_strengths(groups)
+    poor_lighting_courts = {number for number, court in courts.items() if court.poor_lighting}
+    cost = [
+        [
+            court_cost(group, strength, number, courts.get(number), poor_lighting_courts, preferences)
+            + TIE_BREAK * abs(g - c)
+            for c, number in enumerate(court_numbers)
+        ]
+        for g, (group, strength) in enumerate(zip(groups, strengths))
+    ]
+    return [court_numbers[column] for column in hungarian(cost)]
@@ -1,14 +1,41 @@
+from functools import lru_cache
+
 from app.config import settings
+from app.tracing import traced
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@lru_cache()
+def get_engine() -> Engine:
+    """The application engine, created on first use (loading the DB driver is not free)."""
+    return create_engine(settings.DATABASE_URL)
+
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to ``get_engine()`` when the first session is made."""
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
 
+def __getattr__(name):
+    # ``from app.database import engine`` keeps working for scripts
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@traced(kind="dependency")
 def get_db():
     db = SessionLocal()
     try:
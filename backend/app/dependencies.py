@@ -1,6 +1,10 @@
 from app.auth import decode_access_token
+from app.config import settings
 from app.database import get_db
+from app.metrics import record_club
 from app.models import User, UserRole
+from app.principals import Principal, get_principal_cache
+from app.tracing import traced
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
@@ -8,11 +12,8 @@ from sqlalchemy.orm import Session
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
+def get_user_from_token(token: str, db: Session) -> Principal:
+    """Resolve and validate the principal a bearer token belongs to."""
     payload = decode_access_token(token)
     
     if payload is None:
@@ -28,25 +29,46 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+    principal = None
+    if settings.AUTH_TOKEN_CLAIMS:
+        principal = Principal.from_claims(payload)
+        if principal is not None and not get_principal_cache().claims_trusted(principal, payload.get("iat")):
+            principal = None
+    
+    if principal is None:
+        principal = get_principal_cache().get(username)
     
-    if not user.is_active:
+    if principal is None:
+        user = db.query(User).filter(User.username == username).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        principal = Principal.from_user(user)
+        get_principal_cache().set(username, principal)
+    
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
     
-    return user
+    record_club(principal.club_id)
+    return principal
+
+
+@traced(kind="dependency")
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Principal:
+    return get_user_from_token(credentials.credentials, db)
 
 
 async def get_current_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Allow super admins, club admins, and session managers (backward compatibility)."""
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.CLUB_ADMIN, UserRole.SESSION_MANAGER]:
         raise HTTPException(
@@ -57,8 +79,8 @@ async def get_current_admin(
 
 
 async def get_current_super_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     if current_user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -68,8 +90,8 @@ async def get_current_super_admin(
 
 
 async def get_current_club_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Allow super admins and club admins."""
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.CLUB_ADMIN]:
         raise HTTPException(
@@ -80,8 +102,8 @@ async def get_current_club_admin(
 
 
 async def get_current_session_manager(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """Allow any admin role."""
     if current_user.role not in [UserRole.SUPER_ADMIN, UserRole.CLUB_ADMIN, UserRole.SESSION_MANAGER]:
         raise HTTPException(
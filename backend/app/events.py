@@ -0,0 +1,203 @@
+"""
+Per-session change feed for live screens (hall TV, admin tablets).
+
+Write endpoints publish compact events after their transaction commits.
+Each event carries the session's version counter (see app/versioning.py)
+as its sequence number, so clients can resume from the last number they
+saw. The broker keeps a bounded ring buffer of recent events per session
+and fans each new event out to every subscriber's asyncio queue.
+
+Channels are dropped once their session has ended (or been deleted) and its
+last subscriber has gone, and at most ``EVENT_MAX_CHANNELS`` are kept: the
+least recently used channels without subscribers are evicted first. A
+client resuming on a dropped channel gets a resync.
+
+The broker is in-process: with several app workers, each worker serves the
+subscribers connected to it and only sees events written through it, so
+live screens should be routed to one worker (or clients fall back to a
+resync when they notice a gap).
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Deque, List, Optional, Set, Tuple
+
+from app.config import settings
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+@dataclass
+class SessionEvent:
+    seq: int
+    type: str
+    data: dict
+
+    def to_sse(self) -> str:
+        payload = json.dumps(self.data, separators=(",", ":"), default=_json_default)
+        return f"id: {self.seq}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+# Sent instead of a backlog when the requested range is no longer buffered
+RESYNC = "resync"
+
+
+@dataclass(eq=False)
+class Subscriber:
+    queue: asyncio.Queue
+    loop: asyncio.AbstractEventLoop
+    overflowed: bool = False
+
+
+@dataclass
+class _Channel:
+    buffer: Deque[SessionEvent]
+    subscribers: Set[Subscriber] = field(default_factory=set)
+    closed: bool = False  # Session ended: drop the channel with its last subscriber
+
+
+class SessionEventBroker:
+    """Fan-out of session events with a bounded replay buffer per session."""
+
+    def __init__(self, buffer_size: int, queue_size: int, max_channels: int = 1000):
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.max_channels = max_channels
+        self._channels: "OrderedDict[int, _Channel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _channel(self, session_id: int) -> _Channel:
+        """The session's channel, marked most recently used. Call with the lock held."""
+        channel = self._channels.get(session_id)
+        if channel is None:
+            channel = _Channel(buffer=deque(maxlen=self.buffer_size))
+            self._channels[session_id] = channel
+            self._evict()
+        else:
+            self._channels.move_to_end(session_id)
+        return channel
+
+    def _evict(self) -> None:
+        excess = len(self._channels) - self.max_channels
+        if excess <= 0:
+            return
+        idle = [sid for sid, channel in self._channels.items() if not channel.subscribers][:excess]
+        for sid in idle:
+            del self._channels[sid]
+
+    def publish(self, session_id: int, seq: Optional[int], event_type: str, data: dict) -> None:
+        """Record an event and push it to all subscribers. Safe to call from worker threads."""
+        if seq is None:
+            return
+        event = SessionEvent(seq=seq, type=event_type, data=data)
+        with self._lock:
+            channel = self._channel(session_id)
+            channel.buffer.append(event)
+            channel.closed = False
+            subscribers = list(channel.subscribers)
+
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(self._deliver, subscriber, event)
+
+    @staticmethod
+    def _deliver(subscriber: Subscriber, event: SessionEvent) -> None:
+        if subscriber.overflowed:
+            return
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: stop feeding it and tell it to resync
+            subscriber.overflowed = True
+
+    def subscribe(
+        self,
+        session_id: int,
+        last_seq: Optional[int],
+        current_seq: int
+    ) -> Tuple[Subscriber, List[SessionEvent]]:
+        """
+        Register a subscriber and return the events it missed since ``last_seq``.
+
+        If the missed range is no longer buffered (or the client is ahead of
+        the server, e.g. after a restart) a single RESYNC event is returned.
+        """
+        subscriber = Subscriber(queue=asyncio.Queue(maxsize=self.queue_size), loop=asyncio.get_running_loop())
+        with self._lock:
+            channel = self._channel(session_id)
+            channel.subscribers.add(subscriber)
+            buffered = list(channel.buffer)
+
+        if last_seq is None:
+            return subscriber, []
+
+        # Events may be published slightly out of order by concurrent requests
+        backlog = sorted((event for event in buffered if event.seq > last_seq), key=lambda e: e.seq)
+        missing = set(range(last_seq + 1, current_seq + 1)) - {event.seq for event in backlog}
+        if last_seq > current_seq or missing:
+            return subscriber, [SessionEvent(seq=current_seq, type=RESYNC, data={"version": current_seq})]
+        return subscriber, backlog
+
+    def unsubscribe(self, session_id: int, subscriber: Subscriber) -> None:
+        with self._lock:
+            channel = self._channels.get(session_id)
+            if channel is None:
+                return
+            channel.subscribers.discard(subscriber)
+            if channel.closed and not channel.subscribers:
+                del self._channels[session_id]
+
+    def close(self, session_id: int) -> None:
+        """The session ended or was deleted: drop its channel once nobody is subscribed."""
+        with self._lock:
+            channel = self._channels.get(session_id)
+            if channel is None:
+                return
+            if channel.subscribers:
+                channel.closed = True
+            else:
+                del self._channels[session_id]
+
+    def channel_count(self) -> int:
+        with self._lock:
+            return len(self._channels)
+
+    def subscriber_count(self, session_id: Optional[int] = None) -> int:
+        with self._lock:
+            if session_id is not None:
+                channel = self._channels.get(session_id)
+                return len(channel.subscribers) if channel else 0
+            return sum(len(c.subscribers) for c in self._channels.values())
+
+
+@lru_cache()
+def get_session_events() -> SessionEventBroker:
+    """The process-wide event broker, created on first use."""
+    return SessionEventBroker(
+        buffer_size=settings.EVENT_BUFFER_SIZE,
+        queue_size=settings.EVENT_SUBSCRIBER_QUEUE_SIZE,
+        max_channels=settings.EVENT_MAX_CHANNELS
+    )
+
+
+def court_event_data(court) -> dict:
+    """Compact representation of a court assignment for change events."""
+    return {
+        "round_id": court.round_id,
+        "court_number": court.court_number,
+        "players": [
+            court.team_a_player1_id, court.team_a_player2_id,
+            court.team_b_player1_id, court.team_b_player2_id
+        ],
+        "match_type": court.match_type.value if court.match_type else None,
+        "locked": court.locked,
+        "scores": [court.team_a_score, court.team_b_score],
+    }
@@ -0,0 +1,230 @@
+"""
+Streaming export of a club's match history.
+
+Rows are produced by a single joined query that is read through a
+server-side cursor in fixed-size batches, so memory use stays flat no
+matter how many sessions a club has. The encoders below turn the row
+stream into CSV / newline-delimited JSON chunks and optionally gzip them
+on the fly.
+
+Sessions moved to cold storage (see app/archive.py) are no longer in the
+joined tables; their rows are decoded from the archive one session at a
+time and emitted before the live ones.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Tuple
+
+from app.archive import decode_archive
+from app.models import CourtAssignment, Player, Round
+from app.models import Session as SessionModel
+from app.models import SessionArchive
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+DEFAULT_BATCH_SIZE = 2000
+
+MATCH_HISTORY_COLUMNS = [
+    "session_id",
+    "session_name",
+    "session_date",
+    "session_status",
+    "round_id",
+    "round_index",
+    "round_started_at",
+    "round_ended_at",
+    "court_number",
+    "match_type",
+    "team_a_player1_id",
+    "team_a_player1_name",
+    "team_a_player2_id",
+    "team_a_player2_name",
+    "team_b_player1_id",
+    "team_b_player1_name",
+    "team_b_player2_id",
+    "team_b_player2_name",
+]
+
+
+def match_history_query(club_id: int, session_id: Optional[int] = None):
+    """Build the joined select used for every export format."""
+    pa1 = aliased(Player)
+    pa2 = aliased(Player)
+    pb1 = aliased(Player)
+    pb2 = aliased(Player)
+
+    stmt = (
+        select(
+            SessionModel.id,
+            SessionModel.name,
+            SessionModel.date,
+            SessionModel.status,
+            Round.id,
+            Round.round_index,
+            Round.started_at,
+            Round.ended_at,
+            CourtAssignment.court_number,
+            CourtAssignment.match_type,
+            CourtAssignment.team_a_player1_id,
+            pa1.full_name,
+            CourtAssignment.team_a_player2_id,
+            pa2.full_name,
+            CourtAssignment.team_b_player1_id,
+            pb1.full_name,
+            CourtAssignment.team_b_player2_id,
+            pb2.full_name,
+        )
+        .join(Round, Round.session_id == SessionModel.id)
+        .join(CourtAssignment, CourtAssignment.round_id == Round.id)
+        .outerjoin(pa1, pa1.id == CourtAssignment.team_a_player1_id)
+        .outerjoin(pa2, pa2.id == CourtAssignment.team_a_player2_id)
+        .outerjoin(pb1, pb1.id == CourtAssignment.team_b_player1_id)
+        .outerjoin(pb2, pb2.id == CourtAssignment.team_b_player2_id)
+        .where(SessionModel.club_id == club_id)
+        .order_by(SessionModel.id, Round.round_index, CourtAssignment.court_number)
+    )
+
+    if session_id is not None:
+        stmt = stmt.where(SessionModel.id == session_id)
+
+    return stmt
+
+
+def _plain(value):
+    """Convert enum/datetime column values into plain export values."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def iter_archived_match_history_rows(
+    db: Session,
+    club_id: int,
+    session_id: Optional[int] = None
+) -> Iterator[Tuple]:
+    """Yield match history rows of archived sessions, decoding one archive at a time."""
+    query = db.query(SessionModel).join(SessionArchive).filter(SessionModel.club_id == club_id)
+    if session_id is not None:
+        query = query.filter(SessionModel.id == session_id)
+
+    for session in query.order_by(SessionModel.id).all():
+        rounds = decode_archive(session.archive)
+        player_ids = {
+            pid for r in rounds for court in r.court_assignments
+            for pid in (court.team_a_player1_id, court.team_a_player2_id,
+                        court.team_b_player1_id, court.team_b_player2_id)
+            if pid is not None
+        }
+        names = dict(db.query(Player.id, Player.full_name).filter(Player.id.in_(player_ids))) if player_ids else {}
+
+        for round_obj in rounds:
+            for court in round_obj.court_assignments:
+                row = (
+                    session.id, session.name, session.date, session.status,
+                    round_obj.id, round_obj.round_index, round_obj.started_at, round_obj.ended_at,
+                    court.court_number, court.match_type,
+                    court.team_a_player1_id, names.get(court.team_a_player1_id),
+                    court.team_a_player2_id, names.get(court.team_a_player2_id),
+                    court.team_b_player1_id, names.get(court.team_b_player1_id),
+                    court.team_b_player2_id, names.get(court.team_b_player2_id),
+                )
+                yield tuple(_plain(value) for value in row)
+        db.expire(session, ["archive"])  # Drop the payload before decoding the next one
+
+
+def iter_match_history_rows(
+    db: Session,
+    club_id: int,
+    session_id: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[Tuple]:
+    """
+    Yield match history rows as plain tuples (ordered like MATCH_HISTORY_COLUMNS).
+
+    Uses a server-side cursor (``stream_results``) and fetches ``batch_size``
+    rows at a time, so only one batch is ever held in memory. Archived
+    sessions come first, one decoded archive at a time.
+    """
+    yield from iter_archived_match_history_rows(db, club_id, session_id)
+
+    result = db.execute(
+        match_history_query(club_id, session_id).execution_options(
+            stream_results=True,
+            yield_per=batch_size
+        )
+    )
+    try:
+        for partition in result.partitions(batch_size):
+            for row in partition:
+                yield tuple(_plain(value) for value in row)
+    finally:
+        result.close()
+
+
+def iter_csv(rows: Iterable[Tuple], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Encode rows as CSV (with header), emitting one chunk per ``rows_per_chunk`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(MATCH_HISTORY_COLUMNS)
+
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    tail = buffer.getvalue()
+    if tail:
+        yield tail.encode("utf-8")
+
+
+def iter_ndjson(rows: Iterable[Tuple], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON objects."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(MATCH_HISTORY_COLUMNS, row)), separators=(",", ":")))
+        if len(lines) >= rows_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally (gzip container, not raw deflate)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def iter_record_batches(rows: Iterable[Tuple], batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    """Group rows into column-oriented dicts, used by the Parquet/Arrow CLI writer."""
+    columns = {name: [] for name in MATCH_HISTORY_COLUMNS}
+    count = 0
+    for row in rows:
+        for name, value in zip(MATCH_HISTORY_COLUMNS, row):
+            columns[name].append(value)
+        count += 1
+        if count >= batch_size:
+            yield columns
+            columns = {name: [] for name in MATCH_HISTORY_COLUMNS}
+            count = 0
+
+    if count:
+        yield columns
@@ -0,0 +1,235 @@
+"""
+Fairness metrics for a session.
+
+A session is turned into a rounds x players assignment matrix once, and
+every metric is computed from that matrix with vectorised numpy operations:
+
+- team[r, p]      team slot the player was on in round r (court_idx * 2 + side),
+                  or -1 when sitting out
+- eligible[r, p]  whether the player was checked in when round r was created,
+                  so late arrivals are not penalised for rounds they missed
+
+Metrics are registered by name with ``register_metric`` so new ones can be
+added without touching the endpoints that report them.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+SITTING_OUT = -1
+
+MetricFn = Callable[["AssignmentMatrix"], float]
+METRICS: Dict[str, MetricFn] = {}
+
+
+def register_metric(name: str):
+    """Decorator registering a metric function under ``name``."""
+    def decorator(fn: MetricFn) -> MetricFn:
+        METRICS[name] = fn
+        return fn
+    return decorator
+
+
+@dataclass
+class AssignmentMatrix:
+    """Rounds x players view of a session's court assignments."""
+    player_ids: List[int]
+    team: np.ndarray  # (R, P) int
+    eligible: np.ndarray  # (R, P) bool
+    ranks: np.ndarray  # (P,) float
+    number_of_courts: int
+
+    @property
+    def num_rounds(self) -> int:
+        return self.team.shape[0]
+
+    @property
+    def num_players(self) -> int:
+        return self.team.shape[1]
+
+    @property
+    def played(self) -> np.ndarray:
+        return self.team >= 0
+
+    @property
+    def num_slots(self) -> int:
+        """Number of team slots (two per court) used by the widest round."""
+        return max(int(self.team.max(initial=SITTING_OUT)) + 1, 0)
+
+    def team_one_hot(self, swap_sides: bool = False) -> np.ndarray:
+        """(R, P, K) membership tensor; ``swap_sides`` maps each team to its opponents."""
+        slots = self.num_slots + (self.num_slots % 2)
+        one_hot = np.zeros((self.num_rounds, self.num_players, slots), dtype=np.float64)
+        rounds_idx, players_idx = np.nonzero(self.played)
+        teams = self.team[rounds_idx, players_idx]
+        if swap_sides:
+            teams = teams ^ 1
+        one_hot[rounds_idx, players_idx, teams] = 1.0
+        return one_hot
+
+
+def played_rounds(rounds: Iterable) -> List:
+    """Rounds that were started; a planned round has not been played and does not count."""
+    return [r for r in rounds if r.started_at is not None]
+
+
+def build_assignment_matrix(
+    rounds: Iterable,
+    player_ranks: Dict[int, float],
+    number_of_courts: int,
+    check_in_times: Optional[Dict[int, datetime]] = None
+) -> AssignmentMatrix:
+    """
+    Build the assignment matrix from Round rows (with court_assignments loaded).
+
+    Only players in ``player_ranks`` get a column; anyone else found on a
+    court (e.g. players who have since left) is ignored.
+    """
+    player_ids = list(player_ranks.keys())
+    column = {pid: idx for idx, pid in enumerate(player_ids)}
+    rounds = list(rounds)
+    check_in_times = check_in_times or {}
+
+    team = np.full((len(rounds), len(player_ids)), SITTING_OUT, dtype=np.int64)
+    eligible = np.ones((len(rounds), len(player_ids)), dtype=bool)
+
+    for r, round_obj in enumerate(rounds):
+        for court_idx, court in enumerate(round_obj.court_assignments):
+            sides = (
+                (court.team_a_player1_id, court.team_a_player2_id),
+                (court.team_b_player1_id, court.team_b_player2_id),
+            )
+            for side, pids in enumerate(sides):
+                for pid in pids:
+                    if pid in column:
+                        team[r, column[pid]] = court_idx * 2 + side
+
+        if round_obj.created_at is not None:
+            for pid, check_in in check_in_times.items():
+                if pid in column and check_in is not None and check_in > round_obj.created_at:
+                    eligible[r, column[pid]] = False
+
+    # Anyone who actually played a round was obviously there for it
+    eligible |= team >= 0
+
+    ranks = np.array([player_ranks[pid] for pid in player_ids], dtype=np.float64)
+    return AssignmentMatrix(player_ids, team, eligible, ranks, number_of_courts)
+
+
+def gini(values: np.ndarray) -> float:
+    """Gini coefficient of non-negative values (0 = perfectly equal)."""
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    n = values.size
+    total = values.sum()
+    if n == 0 or total == 0:
+        return 0.0
+    ranks = np.arange(1, n + 1)
+    return float((2.0 * np.sum(ranks * values)) / (n * total) - (n + 1.0) / n)
+
+
+def play_rates(matrix: AssignmentMatrix) -> np.ndarray:
+    """Share of eligible rounds each player actually played (players with no eligible rounds excluded)."""
+    eligible_rounds = matrix.eligible.sum(axis=0)
+    played_rounds = (matrix.played & matrix.eligible).sum(axis=0)
+    mask = eligible_rounds > 0
+    return played_rounds[mask] / eligible_rounds[mask]
+
+
+@register_metric("gini_play_time")
+def gini_play_time(matrix: AssignmentMatrix) -> float:
+    return gini(play_rates(matrix))
+
+
+@register_metric("max_consecutive_sit_outs")
+def max_consecutive_sit_outs(matrix: AssignmentMatrix) -> float:
+    """Longest run of eligible rounds any player spent waiting."""
+    if matrix.num_rounds == 0 or matrix.num_players == 0:
+        return 0.0
+    sitting = (matrix.eligible & ~matrix.played).astype(np.int64)
+    running = np.cumsum(sitting, axis=0)
+    # Value of the running total at the last round the player was not sitting
+    resets = np.maximum.accumulate(np.where(sitting == 0, running, 0), axis=0)
+    return float((running - resets).max())
+
+
+def _pair_counts(matrix: AssignmentMatrix, opponents: bool) -> np.ndarray:
+    one_hot = matrix.team_one_hot()
+    other = matrix.team_one_hot(swap_sides=True) if opponents else one_hot
+    counts = np.einsum("rpk,rqk->pq", one_hot, other)
+    np.fill_diagonal(counts, 0)
+    return counts
+
+
+@register_metric("partner_repeat_rate")
+def partner_repeat_rate(matrix: AssignmentMatrix) -> float:
+    """Fraction of partnerships that repeat an earlier pairing."""
+    if matrix.num_rounds == 0:
+        return 0.0
+    counts = np.triu(_pair_counts(matrix, opponents=False), k=1)
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    return float((total - np.count_nonzero(counts)) / total)
+
+
+@register_metric("opponent_diversity")
+def opponent_diversity(matrix: AssignmentMatrix) -> float:
+    """Average share of distinct opponents among all opponent encounters (1 = never repeated)."""
+    if matrix.num_rounds == 0:
+        return 1.0
+    counts = _pair_counts(matrix, opponents=True)
+    encounters = counts.sum(axis=1)
+    distinct = np.count_nonzero(counts, axis=1)
+    mask = encounters > 0
+    if not mask.any():
+        return 1.0
+    return float(np.mean(distinct[mask] / encounters[mask]))
+
+
+def skill_gaps(matrix: AssignmentMatrix) -> np.ndarray:
+    """Absolute difference of average team rank for every complete match."""
+    if matrix.num_rounds == 0:
+        return np.zeros(0)
+    one_hot = matrix.team_one_hot()
+    rank_sums = np.einsum("rpk,p->rk", one_hot, matrix.ranks)
+    sizes = one_hot.sum(axis=1)
+    team_a_sizes, team_b_sizes = sizes[:, 0::2], sizes[:, 1::2]
+    complete = (team_a_sizes == 2) & (team_b_sizes == 2)
+    gaps = np.abs(rank_sums[:, 0::2] - rank_sums[:, 1::2]) / 2.0
+    return gaps[complete]
+
+
+@register_metric("avg_skill_gap")
+def avg_skill_gap(matrix: AssignmentMatrix) -> float:
+    gaps = skill_gaps(matrix)
+    return float(gaps.mean()) if gaps.size else 0.0
+
+
+@register_metric("max_skill_gap")
+def max_skill_gap(matrix: AssignmentMatrix) -> float:
+    gaps = skill_gaps(matrix)
+    return float(gaps.max()) if gaps.size else 0.0
+
+
+@register_metric("court_utilisation")
+def court_utilisation(matrix: AssignmentMatrix) -> float:
+    """Share of available court slots that hosted a full match."""
+    capacity = matrix.num_rounds * matrix.number_of_courts
+    if capacity == 0:
+        return 0.0
+    full_courts = int(skill_gaps(matrix).size)
+    return float(min(full_courts / capacity, 1.0))
+
+
+def fairness_score(matrix: AssignmentMatrix) -> float:
+    """Headline score in 0-100 (100 = everyone played an equal share of the rounds they were present for)."""
+    return round(100.0 * (1.0 - gini_play_time(matrix)), 2)
+
+
+def compute_metrics(matrix: AssignmentMatrix, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+    """Run the requested (default: all registered) metrics over the matrix."""
+    selected = list(names) if names is not None else list(METRICS)
+    return {name: round(METRICS[name](matrix), 4) for name in selected}
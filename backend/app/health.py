@@ -0,0 +1,157 @@
+"""
+Liveness and readiness probes.
+
+``/health/live`` only says the process is serving requests. ``/health/ready``
+tells a load balancer whether this instance should get traffic, based on:
+
+* ``pool``: share of the connection pool (including overflow) checked out,
+  against ``HEALTH_MAX_POOL_USAGE``. Checked first; when the pool is
+  saturated the database ping is skipped instead of queueing for a
+  connection.
+* ``database``: a ``SELECT 1`` round trip.
+* ``migrations``: the database's Alembic revision against the head of
+  alembic/versions (``HEALTH_CHECK_MIGRATIONS``), so a new image is not put
+  in rotation before ``alembic upgrade head`` has run.
+* ``jobs``: runnable queued jobs, against ``HEALTH_MAX_JOB_BACKLOG``.
+* ``executors``: in-process work queues (password hashing, EXPLAIN
+  sampling) against ``HEALTH_MAX_EXECUTOR_QUEUE_USAGE`` of their capacity.
+
+Results are cached for ``HEALTH_CACHE_SECONDS`` and concurrent probes share
+one evaluation, so aggressive probe intervals cost at most one connection
+checkout per window.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+from app.config import settings
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+
+
+@lru_cache()
+def alembic_heads() -> FrozenSet[str]:
+    """Head revisions shipped with this build (read once; they cannot change while running)."""
+    from alembic.script import ScriptDirectory
+    return frozenset(ScriptDirectory(ALEMBIC_DIR).get_heads())
+
+
+def database_revisions(connection) -> FrozenSet[str]:
+    from alembic.runtime.migration import MigrationContext
+    return frozenset(MigrationContext.configure(connection).get_current_heads())
+
+
+def pool_usage(engine: Engine) -> Optional[Tuple[int, int]]:
+    """(checked out, capacity) for a QueuePool, or None for pools without a limit (SQLite)."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return pool.checkedout(), capacity
+
+
+def executor_queues() -> Dict[str, Tuple[int, int]]:
+    """(in flight, capacity) of the bounded in-process work queues."""
+    from app.auth import password_queue_usage
+    from app.slow_queries import get_slow_query_recorder
+
+    queues = {"password_hashing": password_queue_usage()}
+    recorder = get_slow_query_recorder()
+    if recorder is not None:
+        queues["explain_sampling"] = recorder.explain_queue_usage()
+    return queues
+
+
+class ReadinessProbe:
+    def __init__(self, engine_factory: Callable[[], Engine], cache_seconds: float = 2.0):
+        self.engine_factory = engine_factory
+        self.cache_seconds = cache_seconds
+        self._lock = threading.Lock()
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+
+    def check(self) -> dict:
+        """The cached readiness result, re-evaluated at most once per ``cache_seconds``."""
+        with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.cache_seconds:
+                self._result = self.evaluate()
+                self._checked_at = time.monotonic()
+            return self._result
+
+    def evaluate(self) -> dict:
+        from app.models import Job, JobStatus
+
+        engine = self.engine_factory()
+        checks = {}
+
+        usage = pool_usage(engine)
+        if usage is None:
+            checks["pool"] = {"ok": True, "detail": f"{type(engine.pool).__name__} has no size limit"}
+        else:
+            checked_out, capacity = usage
+            checks["pool"] = {
+                "ok": checked_out < capacity * settings.HEALTH_MAX_POOL_USAGE,
+                "checked_out": checked_out,
+                "capacity": capacity,
+            }
+
+        if not checks["pool"]["ok"]:
+            checks["database"] = {"ok": False, "detail": "skipped, connection pool saturated"}
+        else:
+            started = time.perf_counter()
+            stage = "database"
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                    checks["database"] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+                    if settings.HEALTH_CHECK_MIGRATIONS:
+                        stage = "migrations"
+                        current, heads = database_revisions(conn), alembic_heads()
+                        checks["migrations"] = {
+                            "ok": current == heads,
+                            "current": sorted(current),
+                            "head": sorted(heads),
+                        }
+
+                    stage = "jobs"
+                    backlog = conn.execute(select(func.count()).select_from(Job).where(
+                        Job.status == JobStatus.QUEUED,
+                        Job.run_after <= datetime.utcnow()
+                    )).scalar()
+                    checks["jobs"] = {"ok": backlog <= settings.HEALTH_MAX_JOB_BACKLOG, "backlog": backlog}
+            except Exception as exc:
+                checks[stage] = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+        queues = {}
+        for name, (in_flight, capacity) in executor_queues().items():
+            queues[name] = {"in_flight": in_flight, "capacity": capacity}
+        checks["executors"] = {
+            "ok": all(q["in_flight"] < q["capacity"] * settings.HEALTH_MAX_EXECUTOR_QUEUE_USAGE for q in queues.values()),
+            "queues": queues,
+        }
+
+        ready = all(check["ok"] for check in checks.values())
+        return {
+            "status": "ready" if ready else "unavailable",
+            "checked_at": datetime.utcnow().isoformat(),
+            "checks": checks,
+        }
+
+
+_readiness_probe: Optional[ReadinessProbe] = None
+
+
+def get_readiness_probe() -> ReadinessProbe:
+    global _readiness_probe
+    if _readiness_probe is None:
+        from app.database import get_engine
+        _readiness_probe = ReadinessProbe(get_engine, settings.HEALTH_CACHE_SECONDS)
+    return _readiness_probe
@@ -0,0 +1,362 @@
+"""
+In-process background job runner backed by the ``jobs`` table.
+
+Requests enqueue a Job row in their own transaction; a small pool of worker
+threads claims queued jobs (``FOR UPDATE SKIP LOCKED`` on PostgreSQL, so
+several app processes can share the table), runs the registered handler
+with a fresh DB session and records the result. Failed jobs are retried
+with exponential backoff up to ``max_attempts``. Because the queue lives in
+the database, jobs survive restarts and no external broker is needed.
+
+While a job runs its worker refreshes ``heartbeat_at`` every
+``JOB_HEARTBEAT_SECONDS``. Every ``JOB_STALE_SWEEP_SECONDS`` a worker
+re-queues RUNNING jobs whose heartbeat is older than
+``JOB_STALE_AFTER_SECONDS`` (their process died; a long job that is still
+running keeps beating), deletes finished jobs after ``JOB_RETENTION_DAYS``
+and export files after ``EXPORT_RETENTION_DAYS``. With ``JOB_WORKERS = 0``
+nothing would pick jobs up, so ``enqueue_job`` runs them inline instead.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Job, JobStatus
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Session, dict], Optional[dict]]
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(job_type: str):
+    """Decorator registering a handler for ``job_type``."""
+    def decorator(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[job_type] = fn
+        return fn
+    return decorator
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: dict,
+    club_id: Optional[int] = None,
+    max_attempts: Optional[int] = None
+) -> Job:
+    """Add a job to the queue. The caller commits, so the job is only visible if its transaction succeeds."""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {job_type}")
+
+    job = Job(
+        job_type=job_type,
+        club_id=club_id,
+        payload=payload,
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow()
+    )
+    db.add(job)
+    db.flush()
+    if settings.JOB_WORKERS <= 0:
+        run_inline(db, job)
+    else:
+        job_runner.notify()
+    return job
+
+
+def run_inline(db: Session, job: Job) -> None:
+    """Run a job in the caller's transaction (no runner to pick it up). A failure marks it FAILED."""
+    job.status = JobStatus.RUNNING
+    job.attempts = 1
+    job.started_at = datetime.utcnow()
+    try:
+        with db.begin_nested():
+            job.result = JOB_HANDLERS[job.job_type](db, dict(job.payload or {}))
+    except Exception as exc:
+        job.status = JobStatus.FAILED
+        job.error = f"{type(exc).__name__}: {exc}"
+        logger.error("Inline job %s (%s) failed: %s", job.id, job.job_type, job.error)
+    else:
+        job.status = JobStatus.SUCCEEDED
+    job.finished_at = datetime.utcnow()
+
+
+def queue_depth(db: Session) -> int:
+    """Number of jobs waiting to run."""
+    return db.query(Job).filter(Job.status == JobStatus.QUEUED).count()
+
+
+def remove_expired_exports() -> int:
+    """Delete export files older than EXPORT_RETENTION_DAYS; returns how many."""
+    cutoff = time.time() - settings.EXPORT_RETENTION_DAYS * 86400
+    removed = 0
+    try:
+        entries = list(os.scandir(settings.EXPORT_DIR))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            continue  # Removed by another worker
+    return removed
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: 2s, 4s, 8s ... capped at five minutes."""
+    return timedelta(seconds=min(2 ** attempts, 300))
+
+
+class JobRunner:
+    """Pool of worker threads polling the jobs table."""
+
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._claim_lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def notify(self) -> None:
+        """Wake idle workers early (e.g. right after a job was enqueued)."""
+        self._wakeup.set()
+
+    def start(self, num_workers: int) -> None:
+        if self.running or num_workers <= 0:
+            return
+        self._stop.clear()
+        self._next_sweep = 0.0  # First worker sweeps right away
+        for i in range(num_workers):
+            thread = threading.Thread(target=self._work_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %d job workers", num_workers)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def requeue_stale_jobs(self) -> int:
+        """Put jobs left RUNNING by a crashed/restarted process (no recent heartbeat) back on the queue."""
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+        db = SessionLocal()
+        try:
+            count = db.query(Job).filter(
+                Job.status == JobStatus.RUNNING,
+                func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff
+            ).update({Job.status: JobStatus.QUEUED, Job.locked_by: None}, synchronize_session=False)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def prune_finished_jobs(self) -> int:
+        """Delete succeeded and failed jobs that finished more than JOB_RETENTION_DAYS ago."""
+        cutoff = datetime.utcnow() - timedelta(days=settings.JOB_RETENTION_DAYS)
+        db = SessionLocal()
+        try:
+            count = db.query(Job).filter(
+                Job.status.in_([JobStatus.SUCCEEDED, JobStatus.FAILED]),
+                Job.finished_at < cutoff
+            ).delete(synchronize_session=False)
+            db.commit()
+            return count
+        finally:
+            db.close()
+
+    def sweep_if_due(self) -> int:
+        """Re-queue stale jobs and delete expired jobs and exports if no worker did so in the
+        last JOB_STALE_SWEEP_SECONDS. Returns the number of re-queued jobs."""
+        with self._sweep_lock:
+            now = time.monotonic()
+            if now < self._next_sweep:
+                return 0
+            self._next_sweep = now + settings.JOB_STALE_SWEEP_SECONDS
+        count = self.requeue_stale_jobs()
+        if count:
+            logger.warning("Re-queued %d stale jobs", count)
+        pruned = self.prune_finished_jobs()
+        removed = remove_expired_exports()
+        if pruned or removed:
+            logger.info("Deleted %d old jobs and %d expired export files", pruned, removed)
+        return count
+
+    def beat(self, job_id: int) -> bool:
+        """Mark a job this worker is running as alive; False if it is no longer ours."""
+        db = SessionLocal()
+        try:
+            count = db.query(Job).filter(
+                Job.id == job_id,
+                Job.status == JobStatus.RUNNING,
+                Job.locked_by == self.worker_id
+            ).update({Job.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+            return count > 0
+        finally:
+            db.close()
+
+    @contextmanager
+    def heartbeat(self, job_id: int):
+        """Beat for ``job_id`` every JOB_HEARTBEAT_SECONDS from a side thread while the block runs."""
+        done = threading.Event()
+
+        def loop():
+            while not done.wait(settings.JOB_HEARTBEAT_SECONDS):
+                try:
+                    self.beat(job_id)
+                except Exception:
+                    logger.exception("Heartbeat for job %s failed", job_id)
+
+        thread = threading.Thread(target=loop, name=f"job-heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            done.set()
+            thread.join()
+
+    def claim_next(self, db: Session) -> Optional[Job]:
+        """Atomically move the oldest runnable job to RUNNING."""
+        with self._claim_lock:
+            job = db.query(Job).filter(
+                Job.status == JobStatus.QUEUED,
+                Job.run_after <= datetime.utcnow()
+            ).order_by(Job.id).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.rollback()
+                return None
+
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.locked_by = self.worker_id
+            job.started_at = datetime.utcnow()
+            job.heartbeat_at = job.started_at
+            db.commit()
+            return job
+
+    def run_one(self) -> bool:
+        """Claim and execute a single job. Returns False when the queue is empty."""
+        db = SessionLocal()
+        try:
+            job = self.claim_next(db)
+            if job is None:
+                return False
+
+            handler = JOB_HANDLERS.get(job.job_type)
+            try:
+                if handler is None:
+                    raise ValueError(f"No handler registered for job type {job.job_type}")
+                with self.heartbeat(job.id):
+                    result = handler(db, dict(job.payload or {}))
+                job.status = JobStatus.SUCCEEDED
+                job.result = result
+                job.error = None
+                job.finished_at = datetime.utcnow()
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                job = db.query(Job).filter(Job.id == job.id).first()
+                job.error = f"{type(exc).__name__}: {exc}"
+                if job.attempts < job.max_attempts:
+                    job.status = JobStatus.QUEUED
+                    job.run_after = datetime.utcnow() + retry_delay(job.attempts)
+                    logger.warning("Job %s (%s) failed, retrying: %s", job.id, job.job_type, job.error)
+                else:
+                    job.status = JobStatus.FAILED
+                    job.finished_at = datetime.utcnow()
+                    logger.error("Job %s (%s) failed permanently: %s", job.id, job.job_type, job.error)
+                job.locked_by = None
+                db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _work_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.sweep_if_due()
+                ran = self.run_one()
+            except Exception:
+                logger.exception("Job worker error")
+                ran = False
+            if not ran:
+                self._wakeup.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+                self._wakeup.clear()
+
+
+job_runner = JobRunner()
+
+
+# Handlers
+
+@job_handler("session_snapshot")
+def run_session_snapshot(db: Session, payload: dict) -> dict:
+    """Create the SessionHistory row for a session run that has just ended."""
+    from app.models import Session as SessionModel
+    from app.snapshots import create_session_history
+    from app.versioning import bump_club_version
+
+    session = db.query(SessionModel).filter(SessionModel.id == payload["session_id"]).first()
+    if session is None:
+        return {"skipped": "session deleted"}
+
+    history = create_session_history(
+        db,
+        session,
+        datetime.fromisoformat(payload["started_at"]),
+        datetime.fromisoformat(payload["ended_at"])
+    )
+    bump_club_version(db, session.club_id)
+    db.flush()
+    return {"session_history_id": history.id}
+
+
+@job_handler("match_history_export")
+def run_match_history_export(db: Session, payload: dict) -> dict:
+    """Write a gzip CSV/NDJSON match history export to EXPORT_DIR."""
+    from app.export import (gzip_stream, iter_csv, iter_match_history_rows,
+                            iter_ndjson)
+
+    club_id = payload["club_id"]
+    export_format = payload.get("format", "csv")
+    os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+    filename = f"match-history-club{club_id}-{datetime.utcnow():%Y%m%d%H%M%S}.{export_format}.gz"
+    path = os.path.join(settings.EXPORT_DIR, filename)
+
+    row_count = 0
+
+    def counted(rows):
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    rows = counted(iter_match_history_rows(db, club_id, payload.get("session_id")))
+    chunks = iter_csv(rows) if export_format == "csv" else iter_ndjson(rows)
+    with open(path, "wb") as fh:
+        for chunk in gzip_stream(chunks):
+            fh.write(chunk)
+
+    return {"path": path, "filename": filename, "rows": row_count}
@@ -1,42 +1,175 @@
-from app.routers import (auth, club_settings, player_portal, players, sessions,
-                         statistics, super_admin)
-from fastapi import FastAPI
+"""
+Application factory.
+
+``create_app()`` builds the FastAPI app and imports only the routers of the
+requested groups (``ROUTER_GROUPS``) and the modules of enabled features
+(the job runner and preview workers for "club", metrics, tracing, the
+slow-query log), so portal-only or admin-only deployments skip what they do
+not serve. Settings are read, and the database engine, caches, event broker
+and worker pools are created on first use, not at import time.
+
+``app`` is created lazily on first access, so ``uvicorn app.main:app`` and
+``from app.main import app`` keep working; ``uvicorn --factory
+app.main:create_app`` works too.
+"""
+
+from importlib import import_module
+from typing import Iterable, List, Optional
+
+from app.config import settings
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+
+ROUTER_GROUPS = {
+    "auth": ["auth"],
+    "club": ["players", "sessions", "club_settings", "statistics", "exports", "jobs"],
+    "portal": ["player_portal"],
+    "super_admin": ["super_admin"],
+}
+
+
+def router_modules(groups: Iterable[str]) -> List[str]:
+    """Router module names for ``groups`` (plus "auth", which every deployment needs to log in)."""
+    modules = list(ROUTER_GROUPS["auth"])
+    for group in groups:
+        if group not in ROUTER_GROUPS:
+            raise ValueError(f"Unknown router group {group!r}; expected one of {', '.join(ROUTER_GROUPS)}")
+        for module in ROUTER_GROUPS[group]:
+            if module not in modules:
+                modules.append(module)
+    return modules
+
+
+def configured_groups() -> List[str]:
+    return [group.strip() for group in settings.ROUTER_GROUPS.split(",") if group.strip()]
+
+
+def create_app(groups: Optional[Iterable[str]] = None) -> FastAPI:
+    from app.auth import PasswordHasherBusy
+    from app.compression import CompressionMiddleware
+
+    modules = router_modules(configured_groups() if groups is None else groups)
+
+    app = FastAPI(
+        title="Badminton Club Manager",
+        description="API for managing badminton club sessions and court assignments",
+        version="1.0.0",
+        default_response_class=ORJSONResponse
+    )
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+    # CORS configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://localhost:5174", "http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Job-Id", "Server-Timing", "X-Assignment-Profile", "X-Trace-Id"],
+    )
+
+    # Outermost, so latency covers the other middleware too
+    if settings.METRICS_ENABLED:
+        from app.metrics import MetricsMiddleware, registry
+
+        app.add_middleware(
+            MetricsMiddleware,
+            query_budget=settings.METRICS_QUERY_BUDGET,
+            server_timing=settings.SERVER_TIMING,
+        )
+
+    if settings.TRACING_ENABLED:
+        from app.tracing import (TracingMiddleware, configure_tracing,
+                                 instrument_routes)
+
+        configure_tracing(settings)
+        app.add_middleware(TracingMiddleware)
+
+    @app.exception_handler(PasswordHasherBusy)
+    def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+        return ORJSONResponse(
+            {"detail": "Too many password operations in progress, please try again"},
+            status_code=503,
+            headers={"Retry-After": "1"},
+        )
+
+    # Include routers
+    for module in modules:
+        app.include_router(import_module(f"app.routers.{module}").router)
+
+    # Jobs are enqueued and previews run by the club routers only
+    if "sessions" in modules:
+        from app.jobs import job_runner
+        from app.preview import shutdown_preview_executor
+
+        if settings.JOB_WORKERS > 0:
+            @app.on_event("startup")
+            def start_job_runner():
+                job_runner.start(settings.JOB_WORKERS)
+
+            @app.on_event("shutdown")
+            def stop_job_runner():
+                job_runner.stop()
+
+        @app.on_event("shutdown")
+        def stop_preview_workers():
+            shutdown_preview_executor()
+
+    if settings.SLOW_QUERY_MS > 0:
+        from app.database import get_engine
+        from app.slow_queries import install_slow_query_log
+
+        @app.on_event("startup")
+        def start_slow_query_log():
+            install_slow_query_log(get_engine(), settings)
+
+    @app.get("/")
+    def root():
+        return {
+            "message": "Badminton Club Manager API",
+            "version": "1.0.0",
+            "docs": "/docs"
+        }
+
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        def metrics():
+            """Prometheus scrape endpoint."""
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "healthy"}
+
+    @app.get("/health/live")
+    def liveness():
+        """The process is up and serving requests."""
+        return {"status": "alive"}
+
+    @app.get("/health/ready")
+    def readiness():
+        """Whether this instance should receive traffic; 503 with the failing checks if not."""
+        from app.health import get_readiness_probe
+
+        result = get_readiness_probe().check()
+        return ORJSONResponse(result, status_code=200 if result["status"] == "ready" else 503)
+
+    # Last, so every route above gets a handler span
+    if settings.TRACING_ENABLED:
+        instrument_routes(app)
+
+    return app
+
 
-app = FastAPI(
-    title="Badminton Club Manager",
-    description="API for managing badminton club sessions and court assignments",
-    version="1.0.0"
-)
-
-# CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:5174", "http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router)
-app.include_router(players.router)
-app.include_router(sessions.router)
-app.include_router(player_portal.router)
-app.include_router(club_settings.router)
-app.include_router(statistics.router)
-app.include_router(super_admin.router)
-
-
-@app.get("/")
-def root():
-    return {
-        "message": "Badminton Club Manager API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
-
-
-@app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+def __getattr__(name):
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,297 @@
+"""
+Per-request latency and SQL instrumentation, exposed in Prometheus format.
+
+``MetricsMiddleware`` opens a RequestStats for every HTTP request and keeps
+it in a context variable. SQLAlchemy ``before/after_cursor_execute`` hooks
+(registered on the Engine class, so every engine is covered) add each
+statement's count and time to the stats of the request that issued it;
+statements run outside a request (job workers) are not attributed.
+
+When the request finishes the middleware observes three histograms labelled
+by route template, method, status and club:
+
+* ``http_request_duration_seconds``
+* ``http_request_sql_statements``
+* ``http_request_sql_duration_seconds``
+
+and counts requests over ``METRICS_QUERY_BUDGET`` statements (also logged
+with the route, so N+1 endpoints are easy to find). ``GET /metrics``
+renders everything in the Prometheus text format; no client library is
+needed. With ``SERVER_TIMING`` enabled responses also carry a
+``Server-Timing`` header (``db`` and ``app`` durations) that shows up in the
+browser's network panel.
+
+Metrics are per process; with several workers let Prometheus scrape each
+one (or aggregate in the query).
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+UNMATCHED_ROUTE = "unmatched"
+NO_CLUB = "none"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Tuple[str, ...] = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_number(value)}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.labelnames = tuple(labelnames)
+        # labels -> [per-bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, labels: Tuple[str, ...]) -> int:
+        series = self._values.get(labels)
+        return series[-1] if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._values.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_number(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        for metric in self._metrics:
+            metric.clear()
+
+
+REQUEST_LABELS = ("route", "method", "status", "club")
+
+registry = MetricsRegistry()
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency.", LATENCY_BUCKETS, REQUEST_LABELS
+))
+request_sql_statements = registry.register(Histogram(
+    "http_request_sql_statements", "SQL statements executed per HTTP request.", STATEMENT_BUCKETS, REQUEST_LABELS
+))
+request_sql_duration = registry.register(Histogram(
+    "http_request_sql_duration_seconds", "Time spent in SQL per HTTP request.", LATENCY_BUCKETS, REQUEST_LABELS
+))
+query_budget_exceeded = registry.register(Counter(
+    "http_requests_over_query_budget_total", "Requests that ran more SQL statements than the query budget.",
+    ("route", "method")
+))
+
+
+@dataclass
+class RequestStats:
+    started: float
+    scope: Optional[dict] = None
+    sql_statements: int = 0
+    sql_seconds: float = 0.0
+    club_id: Optional[int] = None
+
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "metrics_request", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current_request.get()
+
+
+def current_route() -> Optional[str]:
+    """Route of the request being handled as "METHOD /template", or None outside a request."""
+    stats = _current_request.get()
+    if stats is None or stats.scope is None:
+        return None
+    return f"{stats.scope['method']} {route_template(stats.scope)}"
+
+
+def record_club(club_id: Optional[int]) -> None:
+    """Label the current request with the caller's club (called once the user is authenticated)."""
+    stats = _current_request.get()
+    if stats is not None:
+        stats.club_id = club_id
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    starts = conn.info.get("metrics_query_start")
+    if stats is None or not starts:
+        return
+    stats.sql_statements += 1
+    stats.sql_seconds += time.perf_counter() - starts.pop()
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that handled the request (keeps label cardinality bounded)."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    templates = getattr(app.state, "metrics_route_templates", None)
+    if templates is None:
+        templates = {}
+        for route in app.routes:
+            route_endpoint = getattr(route, "endpoint", None)
+            if route_endpoint is not None:
+                templates.setdefault(route_endpoint, route.path)
+        app.state.metrics_route_templates = templates
+    return templates.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, query_budget: int = 50, server_timing: bool = False) -> None:
+        self.app = app
+        self.query_budget = query_budget
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(started=time.perf_counter(), scope=scope)
+        token = _current_request.set(stats)
+        status_code = 500
+        streaming = False
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                streaming = headers.get("content-type", "").startswith("text/event-stream")
+                if self.server_timing:
+                    elapsed_ms = (time.perf_counter() - stats.started) * 1000
+                    headers.append("Server-Timing", (
+                        f'db;dur={stats.sql_seconds * 1000:.1f};desc="{stats.sql_statements} queries", '
+                        f"app;dur={elapsed_ms:.1f}"
+                    ))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            _current_request.reset(token)
+            # Long-lived event streams would only distort the latency histograms
+            if not streaming:
+                self.observe(scope, stats, status_code)
+
+    def observe(self, scope: Scope, stats: RequestStats, status_code: int) -> None:
+        route = route_template(scope)
+        method = scope["method"]
+        club = NO_CLUB if stats.club_id is None else str(stats.club_id)
+        labels = (route, method, str(status_code), club)
+
+        request_duration.observe(labels, time.perf_counter() - stats.started)
+        request_sql_statements.observe(labels, stats.sql_statements)
+        request_sql_duration.observe(labels, stats.sql_seconds)
+
+        if self.query_budget and stats.sql_statements > self.query_budget:
+            query_budget_exceeded.inc((route, method))
+            logger.warning(
+                "%s %s ran %d SQL statements (budget %d, %.1f ms in SQL)",
+                method, route, stats.sql_statements, self.query_budget, stats.sql_seconds * 1000
+            )
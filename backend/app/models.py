@@ -4,7 +4,8 @@ from datetime import datetime
 from app.database import Base
 from sqlalchemy import ARRAY, JSON, Boolean, Column, DateTime
 from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import Float, ForeignKey, Integer, String, false
+from sqlalchemy import (Float, ForeignKey, Integer, LargeBinary, String,
+                        UniqueConstraint, false)
 from sqlalchemy.orm import relationship
 
 
@@ -46,6 +47,13 @@ class SubscriptionStatus(str, enum.Enum):
     SUSPENDED = "suspended"
 
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class UserRole(str, enum.Enum):
     SUPER_ADMIN = "super_admin"  # Manages all clubs, appoints club admins
     CLUB_ADMIN = "club_admin"    # Full club access: settings, players, statistics, sessions
@@ -69,6 +77,7 @@ class Club(Base):
     max_sessions_per_month = Column(Integer, default=20)
     
     is_active = Column(Boolean, default=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped when club statistics change
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -112,6 +121,8 @@ class Player(Base):
     rank_system = Column(String, nullable=True)  # e.g., "DublinDiv", "RegionLetters"
     rank_value = Column(String, nullable=True)  # e.g., "1", "A"
     numeric_rank = Column(Float, nullable=True)  # Derived number for sorting
+    rating = Column(Float, nullable=True)  # Elo rating from match results (see app/ratings.py)
+    rating_matches = Column(Integer, nullable=False, default=0, server_default="0")  # Rated matches played
     skill_tier = Column(Integer, nullable=True)  # 1-5
     level = Column(String, nullable=True)  # Player's division according to club ranking system
     contact_number = Column(String, nullable=True)
@@ -141,11 +152,36 @@ class Session(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     started_at = Column(DateTime, nullable=True)
     ended_at = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every change to the session's data
+    updated_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     club = relationship("Club", back_populates="sessions")
     attendances = relationship("Attendance", back_populates="session", cascade="all, delete-orphan")
     rounds = relationship("Round", back_populates="session", cascade="all, delete-orphan")
+    archive = relationship("SessionArchive", back_populates="session", uselist=False, cascade="all, delete-orphan")
+    courts = relationship("SessionCourt", back_populates="session", cascade="all, delete-orphan",
+                          order_by="SessionCourt.court_number")
+
+
+class SessionCourt(Base):
+    """Attributes of one of a session's courts, used when allocating groups to courts (see app/court_allocation.py).
+
+    Courts without a row are plain courts.
+    """
+    __tablename__ = "session_courts"
+    __table_args__ = (UniqueConstraint("session_id", "court_number", name="uq_session_court_number"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+    court_number = Column(Integer, nullable=False)
+    name = Column(String, nullable=True)  # e.g. "Court 1 (show)"
+    show_court = Column(Boolean, nullable=False, default=False)  # Reserved for the strongest groups
+    poor_lighting = Column(Boolean, nullable=False, default=False)  # Rotated so nobody gets it twice
+    beginners_only = Column(Boolean, nullable=False, default=False)  # Reserved for the weakest groups
+
+    # Relationships
+    session = relationship("Session", back_populates="courts")
 
 
 class Attendance(Base):
@@ -156,6 +192,7 @@ class Attendance(Base):
     player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
     status = Column(SQLEnum(AttendanceStatus, native_enum=True, values_callable=lambda obj: [e.value for e in obj]), default=AttendanceStatus.PRESENT)
     check_in_time = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Session version of the last change
 
     # Relationships
     session = relationship("Session", back_populates="attendances")
@@ -171,6 +208,7 @@ class Round(Base):
     started_at = Column(DateTime, nullable=True)
     ended_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Session version of the last change to the round or its courts
 
     # Relationships
     session = relationship("Session", back_populates="rounds")
@@ -189,6 +227,10 @@ class CourtAssignment(Base):
     team_b_player2_id = Column(Integer, ForeignKey("players.id"), nullable=True)
     match_type = Column(SQLEnum(MatchType, native_enum=True, values_callable=lambda obj: [e.value for e in obj]), default=MatchType.OTHER)
     locked = Column(Boolean, default=False)
+    team_a_score = Column(Integer, nullable=True)
+    team_b_score = Column(Integer, nullable=True)
+    rating_delta = Column(Float, nullable=True)  # Rating change applied to team A (team B got the opposite); None if unrated
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # Session version of the last change
 
     # Relationships
     round = relationship("Round", back_populates="court_assignments")
@@ -198,6 +240,22 @@ class CourtAssignment(Base):
     team_b_player2 = relationship("Player", foreign_keys=[team_b_player2_id])
 
 
+class SessionArchive(Base):
+    """Rounds and court assignments of an ended session, moved out of the hot tables (see app/archive.py)."""
+    __tablename__ = "session_archives"
+
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), primary_key=True)
+    format = Column(String, nullable=False)  # Encoding of payload, e.g. "columnar-json+zlib/1"
+    payload = Column(LargeBinary, nullable=False)
+    round_count = Column(Integer, nullable=False, default=0)
+    court_count = Column(Integer, nullable=False, default=0)
+    raw_size = Column(Integer, nullable=False, default=0)  # Uncompressed payload size in bytes
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    session = relationship("Session", back_populates="archive")
+
+
 class ClubSettings(Base):
     __tablename__ = "club_settings"
 
@@ -210,6 +268,7 @@ class ClubSettings(Base):
     letter_range_end = Column(String, nullable=True)  # For LETTER_RANGE type
     custom_levels = Column(ARRAY(String), nullable=True)  # For CUSTOM type, e.g., ["Beginner", "Intermediate", "Advanced"]
     auto_choose_match_types = Column(Boolean, default=False)  # Auto-select match types for rounds
+    assignment_weights = Column(JSON, nullable=True)  # Tuned AssignmentPreferences defaults (see app/tuning.py)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -239,4 +298,27 @@ class SessionHistory(Base):
     # Match type distribution stored as JSON
     match_type_distribution = Column(JSON, default={"MM": 0, "MF": 0, "FF": 0})
     
+    # Detailed fairness metrics (see app/fairness.py) stored as JSON
+    fairness_metrics = Column(JSON, nullable=True)
+    
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False, index=True)  # Registered handler name, see app/jobs.py
+    club_id = Column(Integer, ForeignKey("clubs.id", ondelete="CASCADE"), nullable=True, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(SQLEnum(JobStatus, native_enum=True, values_callable=lambda obj: [e.value for e in obj]), default=JobStatus.QUEUED, nullable=False, index=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=3, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)  # Not picked up before this time (retry backoff)
+    locked_by = Column(String, nullable=True)  # Worker that claimed the job
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed by the worker while the job runs
+    finished_at = Column(DateTime, nullable=True)
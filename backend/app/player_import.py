@@ -0,0 +1,181 @@
+"""
+Bulk player import from CSV or XLSX.
+
+Rows are read lazily from the file, validated against PlayerCreate in
+batches, given a ``numeric_rank`` derived from the club's ranking scale
+(see app/rankings.py) when they only carry a level, de-duplicated against
+the club's existing players and each other by normalised full name, and
+inserted with one multi-row INSERT per batch. Every rejected row is
+reported with its line number and reasons; the rest are imported.
+
+XLSX input requires openpyxl (pip install openpyxl).
+"""
+
+import csv
+import io
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterable, Iterator, List, Tuple
+
+from app.models import ClubSettings, Player
+from app.rankings import club_levels, level_to_numeric_rank
+from app.schemas import PlayerCreate
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+
+# Columns accepted in the file; user accounts are never linked by an import
+IMPORT_COLUMNS = [name for name in PlayerCreate.model_fields if name != "user_id"]
+
+# Alternative header spellings seen in club spreadsheets
+HEADER_ALIASES = {
+    "name": "full_name",
+    "player": "full_name",
+    "player_name": "full_name",
+    "sex": "gender",
+    "phone": "contact_number",
+    "mobile": "contact_number",
+    "rank": "rank_value",
+    "tier": "skill_tier",
+    "division": "level",
+}
+
+
+@dataclass
+class RowError:
+    row: int  # Line number in the file, header is line 1
+    errors: List[str]
+
+
+@dataclass
+class ImportReport:
+    total_rows: int = 0
+    created: int = 0
+    duplicates: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+def normalise_header(header: str) -> str:
+    key = "_".join(str(header or "").strip().lower().replace("-", " ").split())
+    return HEADER_ALIASES.get(key, key)
+
+
+def normalise_name(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def _rows_from_table(rows: Iterable[tuple]) -> Iterator[Tuple[int, dict]]:
+    rows = iter(rows)
+    try:
+        headers = [normalise_header(h) for h in next(rows)]
+    except StopIteration:
+        return
+    for line_number, values in enumerate(rows, start=2):
+        record = {}
+        for header, value in zip(headers, values):
+            if header not in IMPORT_COLUMNS:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            if value not in (None, ""):
+                record[header] = value
+        if record:
+            yield line_number, record
+
+
+def iter_csv_rows(fileobj: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, raw record) pairs from a CSV byte stream."""
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    yield from _rows_from_table(csv.reader(text))
+
+
+def iter_xlsx_rows(fileobj: IO[bytes]) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, raw record) pairs from the first sheet of an XLSX workbook."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RuntimeError("XLSX import requires openpyxl (pip install openpyxl)")
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        yield from _rows_from_table(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(fileobj: IO[bytes], filename: str) -> Iterator[Tuple[int, dict]]:
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        return iter_xlsx_rows(fileobj)
+    return iter_csv_rows(fileobj)
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _format_errors(exc: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+
+
+def import_players(
+    db: Session,
+    club_id: int,
+    rows: Iterable[Tuple[int, dict]],
+    batch_size: int = DEFAULT_IMPORT_BATCH_SIZE,
+    dry_run: bool = False
+) -> ImportReport:
+    """Validate and insert players for a club. The caller commits (or rolls back for a dry run)."""
+    settings = db.query(ClubSettings).filter(ClubSettings.club_id == club_id).first()
+    levels = club_levels(settings)
+    seen_names = {
+        normalise_name(name)
+        for (name,) in db.query(Player.full_name).filter(Player.club_id == club_id)
+    }
+
+    report = ImportReport()
+    for batch in _batches(rows, batch_size):
+        values: List[Dict] = []
+        for line_number, record in batch:
+            report.total_rows += 1
+            try:
+                player = PlayerCreate.model_validate(record)
+            except ValidationError as exc:
+                report.errors.append(RowError(row=line_number, errors=_format_errors(exc)))
+                continue
+
+            if player.level is not None and player.numeric_rank is None:
+                player.numeric_rank = level_to_numeric_rank(player.level, levels)
+                if player.numeric_rank is None:
+                    report.errors.append(RowError(
+                        row=line_number,
+                        errors=[f"level: '{player.level}' is not one of the club's levels"]
+                    ))
+                    continue
+
+            key = normalise_name(player.full_name)
+            if not key:
+                report.errors.append(RowError(row=line_number, errors=["full_name: must not be empty"]))
+                continue
+            if key in seen_names:
+                report.duplicates += 1
+                continue
+            seen_names.add(key)
+
+            data = player.model_dump(include=set(IMPORT_COLUMNS))
+            data["club_id"] = club_id
+            values.append(data)
+
+        if values and not dry_run:
+            # executemany of a Core insert is sent as multi-row INSERT ... VALUES pages
+            db.execute(insert(Player), values)
+        report.created += len(values)
+
+    return report
@@ -0,0 +1,141 @@
+"""
+What-if previews of the next round under several preference variants.
+
+The sessions router reads everything the algorithm and the fairness metrics
+need into one ``SessionSnapshot``. ``preview_variants`` then runs one
+``evaluate_variant`` per variant on a process pool (the algorithm is pure
+Python and CPU-bound, so threads would serialise on the GIL). Each worker
+gets the same snapshot and nothing is written back. Every candidate is
+scored by appending it to the session's history and computing the fairness
+metrics (app/fairness.py), so candidates can be compared side by side.
+
+``PREVIEW_WORKERS = 0`` evaluates the variants inline. Workers are spawned,
+not forked: the API process runs threads (job runner, event streams) and
+holds database connections, which a forked child would inherit mid-use.
+"""
+
+import multiprocessing
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.algorithm import (AssignmentPreferences, PlayerStats,
+                           auto_assign_courts)
+from app.config import settings
+from app.court_allocation import CourtInfo
+from app.fairness import (build_assignment_matrix, compute_metrics,
+                          fairness_score, skill_gaps)
+from app.tracing import submit
+
+
+@dataclass
+class CourtView:
+    team_a_player1_id: Optional[int]
+    team_a_player2_id: Optional[int]
+    team_b_player1_id: Optional[int]
+    team_b_player2_id: Optional[int]
+
+
+@dataclass
+class RoundView:
+    created_at: Optional[datetime]
+    court_assignments: List[CourtView]
+
+
+@dataclass
+class SessionSnapshot:
+    """Picklable inputs of one auto-assignment run."""
+    player_stats: List[PlayerStats]
+    rated_ranks: Dict[int, float]  # numeric_rank-scale ratings, for variants balancing on rating
+    history: List[RoundView]
+    player_ranks: Dict[int, float]  # fairness metric ranks (numeric_rank, as in the session stats)
+    check_in_times: Dict[int, datetime]
+    number_of_courts: int
+    round_index: int
+    locked_courts: Dict[int, List[int]] = field(default_factory=dict)
+    courts: Dict[int, CourtInfo] = field(default_factory=dict)
+
+
+def evaluate_variant(snapshot: SessionSnapshot, preferences: AssignmentPreferences,
+                     balance_on_rating: bool = False) -> dict:
+    """Run the algorithm for one variant and score the resulting round."""
+    started = time.perf_counter()
+    player_stats = snapshot.player_stats
+    if balance_on_rating:
+        player_stats = [
+            replace(ps, numeric_rank=snapshot.rated_ranks[ps.player_id]) if ps.player_id in snapshot.rated_ranks else ps
+            for ps in player_stats
+        ]
+
+    assignments, waiting_ids = auto_assign_courts(
+        player_stats,
+        snapshot.number_of_courts,
+        snapshot.round_index,
+        preferences,
+        snapshot.locked_courts or None,
+        snapshot.courts
+    )
+
+    candidate = RoundView(datetime.utcnow(), [
+        CourtView(a.team_a[0], a.team_a[1], a.team_b[0], a.team_b[1]) for a in assignments
+    ])
+    matrix = build_assignment_matrix(
+        snapshot.history + [candidate], snapshot.player_ranks, snapshot.number_of_courts, snapshot.check_in_times
+    )
+    round_matrix = build_assignment_matrix([candidate], snapshot.player_ranks, snapshot.number_of_courts)
+    gaps = skill_gaps(round_matrix)
+
+    return {
+        "court_assignments": [
+            {
+                "court_number": a.court_number,
+                "team_a_player1_id": a.team_a[0],
+                "team_a_player2_id": a.team_a[1],
+                "team_b_player1_id": a.team_b[0],
+                "team_b_player2_id": a.team_b[1],
+                "match_type": a.match_type,
+                "locked": a.court_number in snapshot.locked_courts,
+            }
+            for a in sorted(assignments, key=lambda a: a.court_number)
+        ],
+        "waiting_player_ids": waiting_ids,
+        "match_type_counts": dict(Counter(a.match_type.value for a in assignments)),
+        "round_skill_gap": round(float(gaps.mean()), 4) if gaps.size else 0.0,
+        "fairness_score": fairness_score(matrix),
+        "fairness_metrics": compute_metrics(matrix),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+_preview_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_preview_executor() -> Optional[ProcessPoolExecutor]:
+    global _preview_executor
+    if settings.PREVIEW_WORKERS <= 0:
+        return None
+    if _preview_executor is None:
+        _preview_executor = ProcessPoolExecutor(
+            max_workers=settings.PREVIEW_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _preview_executor
+
+
+def shutdown_preview_executor():
+    global _preview_executor
+    if _preview_executor is not None:
+        _preview_executor.shutdown(wait=False, cancel_futures=True)
+        _preview_executor = None
+
+
+def preview_variants(snapshot: SessionSnapshot,
+                     variants: Sequence[Tuple[AssignmentPreferences, bool]]) -> List[dict]:
+    """``evaluate_variant`` for every (preferences, balance_on_rating) variant, in order."""
+    executor = get_preview_executor()
+    if executor is None or len(variants) == 1:
+        return [evaluate_variant(snapshot, prefs, on_rating) for prefs, on_rating in variants]
+    futures = [submit(executor, evaluate_variant, snapshot, prefs, on_rating) for prefs, on_rating in variants]
+    return [future.result() for future in futures]
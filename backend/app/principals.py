@@ -0,0 +1,148 @@
+"""
+Resolved identity of the caller for authenticated requests.
+
+``get_current_user`` used to load the full User row on every request. It now
+produces a small immutable Principal (id, username, role, club_id,
+is_active) which is kept in a per-process TTL cache keyed by the token
+subject. Routers that change or remove users call ``invalidate`` after
+committing so role changes and deactivations apply immediately in this
+process; other processes pick them up within ``AUTH_CACHE_TTL_SECONDS``.
+
+When ``AUTH_TOKEN_CLAIMS`` is enabled, access tokens also carry signed
+uid/role/club_id claims and are trusted without any lookup, except for
+tokens issued before the subject was last invalidated in this process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.models import User, UserRole
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    role: UserRole
+    club_id: Optional[int]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            club_id=user.club_id,
+            is_active=user.is_active
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """Build a principal from token claims, or None if they are absent or malformed."""
+        try:
+            return cls(
+                id=int(payload["uid"]),
+                username=payload["sub"],
+                role=UserRole(payload["role"]),
+                club_id=payload.get("club_id"),
+                is_active=True  # Only active users are issued tokens
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def principal_claims(user: User) -> dict:
+    """Claims to embed in an access token for ``user``."""
+    claims = {"sub": user.username}
+    if settings.AUTH_TOKEN_CLAIMS:
+        claims.update({"uid": user.id, "role": user.role.value, "club_id": user.club_id})
+    return claims
+
+
+class PrincipalCache:
+    """Thread-safe TTL cache of principals keyed by token subject."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._invalidated_at: Dict[str, float] = {}
+        self._club_invalidated_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            return principal
+
+    def set(self, subject: str, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries.pop(subject, None)
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, principal)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: str) -> None:
+        """Forget cached principals and distrust claims in tokens issued before now."""
+        now = time.time()
+        with self._lock:
+            for subject in subjects:
+                if subject is None:
+                    continue
+                self._entries.pop(subject, None)
+                self._invalidated_at[subject] = now
+
+    def invalidate_club(self, club_id: int) -> None:
+        """Forget every principal of a club (e.g. when the club is deleted)."""
+        now = time.time()
+        with self._lock:
+            subjects = [s for s, (_, p) in self._entries.items() if p.club_id == club_id]
+            for subject in subjects:
+                del self._entries[subject]
+            self._club_invalidated_at[club_id] = now
+
+    def claims_trusted(self, principal: Principal, issued_at) -> bool:
+        """False if the subject or its club changed after the token was issued (or the token has no iat)."""
+        if issued_at is None:
+            return False
+        if isinstance(issued_at, datetime):
+            issued_at = issued_at.timestamp()
+        with self._lock:
+            invalidated_at = max(
+                self._invalidated_at.get(principal.username, 0.0),
+                self._club_invalidated_at.get(principal.club_id, 0.0)
+            )
+        return issued_at > invalidated_at
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._invalidated_at.clear()
+            self._club_invalidated_at.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache()
+def get_principal_cache() -> PrincipalCache:
+    """The process-wide principal cache, created on first use."""
+    return PrincipalCache(
+        ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+        max_entries=settings.AUTH_CACHE_MAX_ENTRIES
+    )
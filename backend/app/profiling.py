@@ -0,0 +1,98 @@
+"""
+Optional phase timers and counters for the auto-assignment hot path.
+
+Profiling is off unless a request asks for it (``?profile=true`` on
+auto_assign) or ``ASSIGNMENT_PROFILING`` is set. When off, the only cost in
+the algorithm is reading a context variable once per call and skipping
+``if profile is not None`` branches.
+
+Phases are recorded as laps: ``profile.lap("priority_sort")`` charges the
+time since the previous lap to that phase, so the router and the algorithm
+can mark consecutive phases without nesting or re-indenting code. Every
+finished profile is also aggregated into the Prometheus metrics.
+
+Inside a request trace (app/tracing.py) a profile is always collected and
+each lap is also exported as a "phase" span, but only explicitly enabled
+profiles reach the metrics.
+"""
+
+import contextvars
+import json
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.metrics import LATENCY_BUCKETS, Counter, Histogram, registry
+from app.tracing import is_recording, tracer
+
+assignment_phase_duration = registry.register(Histogram(
+    "assignment_phase_duration_seconds", "Time spent in each auto-assignment phase.", LATENCY_BUCKETS, ("phase",)
+))
+assignment_events = registry.register(Counter(
+    "assignment_profile_events_total", "Counters collected by profiled auto-assignments.", ("counter",)
+))
+
+
+class Profile:
+    __slots__ = ("phases_us", "counters", "_last")
+
+    def __init__(self):
+        self.phases_us: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """Charge the time since the previous lap to ``phase``."""
+        now = time.perf_counter()
+        self.phases_us[phase] = self.phases_us.get(phase, 0.0) + (now - self._last) * 1e6
+        if is_recording():
+            tracer.record_span(phase, "phase", self._last, now)
+        self._last = now
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self) -> dict:
+        return {
+            "phases_us": {name: round(value, 1) for name, value in self.phases_us.items()},
+            "counters": dict(self.counters),
+        }
+
+    def header_value(self) -> str:
+        return json.dumps(self.as_dict(), separators=(",", ":"))
+
+    def server_timing(self) -> str:
+        return ", ".join(f"assign-{name};dur={us / 1000:.2f}" for name, us in self.phases_us.items())
+
+
+_active_profile: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar(
+    "assignment_profile", default=None
+)
+
+
+def current_profile() -> Optional[Profile]:
+    return _active_profile.get()
+
+
+@contextmanager
+def profiling(enabled: bool) -> Iterator[Optional[Profile]]:
+    """Activate a Profile for the enclosed code (or yield None when disabled) and record it in the metrics."""
+    if not enabled and not is_recording():
+        yield None
+        return
+
+    profile = Profile()
+    token = _active_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _active_profile.reset(token)
+        if enabled:
+            record_profile(profile)
+
+
+def record_profile(profile: Profile) -> None:
+    for phase, us in profile.phases_us.items():
+        assignment_phase_duration.observe((phase,), us / 1e6)
+    for name, value in profile.counters.items():
+        assignment_events.inc((name,), value)
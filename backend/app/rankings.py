@@ -0,0 +1,45 @@
+"""
+Club ranking scales.
+
+A club's ClubSettings define an ordered list of levels (integer range,
+letter range or custom names). ``numeric_rank``, which the court
+assignment algorithm balances on, is the level's position on that list
+mapped onto 1-10, so it is comparable between clubs using different scales.
+"""
+
+from typing import List, Optional
+
+from app.models import ClubSettings, RankingSystemType
+
+DEFAULT_LEVELS = [str(i) for i in range(1, 11)]
+DEFAULT_CUSTOM_LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+
+def club_levels(settings: Optional[ClubSettings]) -> List[str]:
+    """Ordered levels for a club's ranking system."""
+    if settings is None:
+        return DEFAULT_LEVELS
+
+    levels = []
+    if settings.ranking_system_type == RankingSystemType.INT_RANGE:
+        if settings.int_range_start and settings.int_range_end:
+            levels = [str(i) for i in range(settings.int_range_start, settings.int_range_end + 1)]
+    elif settings.ranking_system_type == RankingSystemType.LETTER_RANGE:
+        if settings.letter_range_start and settings.letter_range_end:
+            start_ord = ord(settings.letter_range_start.upper())
+            end_ord = ord(settings.letter_range_end.upper())
+            levels = [chr(i) for i in range(start_ord, end_ord + 1)]
+    elif settings.ranking_system_type == RankingSystemType.CUSTOM:
+        levels = settings.custom_levels or DEFAULT_CUSTOM_LEVELS
+    return levels
+
+
+def level_to_numeric_rank(level: str, levels: List[str]) -> Optional[float]:
+    """Position of ``level`` on the club's scale mapped onto 1-10, or None if unknown."""
+    lookup = {name.strip().casefold(): index for index, name in enumerate(levels)}
+    index = lookup.get(level.strip().casefold())
+    if index is None:
+        return None
+    if len(levels) == 1:
+        return 5.0
+    return round(1 + 9 * index / (len(levels) - 1), 2)
@@ -0,0 +1,296 @@
+"""
+Doubles Elo ratings from match results.
+
+A team's rating is the mean of its two players' ratings. After a scored
+match each player of team A moves by ``K_FACTOR * (result - expected)``
+(result 1 for a win, 0 for a loss, 0.5 for a draw) and each player of team B
+by the opposite amount, so every match is zero-sum. Players without a
+rating start from their ``numeric_rank`` (``RATING_PER_RANK`` points per
+rank step, rank 5.0 = 1500), so the admin's ranking is the prior that
+results refine.
+
+* ``rate_round`` applies the scored courts of a round when it ends.
+* ``rate_court`` re-applies one court when its score is entered or corrected
+  later; the court's previous change (``rating_delta``) is reverted first.
+* ``revert_court_ratings`` takes back the changes of rated courts before they
+  are deleted or get other players, since the change belongs to the players
+  who played. ``revert_session_ratings`` does so for a whole session,
+  reading an archived session's courts from its archive.
+* ``replay`` recomputes a club's whole history from the seed ratings with
+  numpy, one vectorised step per round (a round's players are on distinct
+  courts, so its matches are independent). ``recompute_club_ratings``
+  loads the history, live and archived, and writes the results back,
+  including the courts' rating changes inside session archives; see
+  recompute_ratings.py.
+
+``rank_from_rating`` maps a rating back onto the numeric_rank scale, so the
+assignment algorithm's weights work unchanged when it balances on ratings.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from app.archive import decode_archive, session_rounds, write_archive
+from app.models import CourtAssignment, Player, Round
+from app.models import Session as SessionModel
+from app.models import SessionArchive
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+K_FACTOR = 32.0
+BASE_RATING = 1500.0
+BASE_RANK = 5.0
+RATING_PER_RANK = 100.0
+
+
+def initial_rating(numeric_rank: Optional[float]) -> float:
+    rank = numeric_rank if numeric_rank is not None else BASE_RANK
+    return BASE_RATING + (rank - BASE_RANK) * RATING_PER_RANK
+
+
+def player_rating(player: Player) -> float:
+    return player.rating if player.rating is not None else initial_rating(player.numeric_rank)
+
+
+def rank_from_rating(rating: float) -> float:
+    return BASE_RANK + (rating - BASE_RATING) / RATING_PER_RANK
+
+
+def expected_score(team_a_rating: float, team_b_rating: float) -> float:
+    """Probability-like expected result of team A against team B."""
+    return 1.0 / (1.0 + 10.0 ** ((team_b_rating - team_a_rating) / 400.0))
+
+
+def match_result(team_a_score: int, team_b_score: int) -> float:
+    if team_a_score > team_b_score:
+        return 1.0
+    if team_a_score < team_b_score:
+        return 0.0
+    return 0.5
+
+
+def match_delta(ratings: Sequence[float], team_a_score: int, team_b_score: int, k: float = K_FACTOR) -> float:
+    """Rating change of each team A player; ``ratings`` are team A player 1, 2, team B player 1, 2."""
+    team_a = (ratings[0] + ratings[1]) / 2.0
+    team_b = (ratings[2] + ratings[3]) / 2.0
+    return k * (match_result(team_a_score, team_b_score) - expected_score(team_a, team_b))
+
+
+def court_player_ids(court) -> List[Optional[int]]:
+    return [court.team_a_player1_id, court.team_a_player2_id, court.team_b_player1_id, court.team_b_player2_id]
+
+
+def is_rateable(court) -> bool:
+    """A full court with both scores entered."""
+    return (court.team_a_score is not None and court.team_b_score is not None
+            and all(pid is not None for pid in court_player_ids(court)))
+
+
+def revert_court(court: CourtAssignment, players: Dict[int, Player]):
+    """Take a court's rating change back from its current players."""
+    if court.rating_delta is None:
+        return
+    for i, pid in enumerate(court_player_ids(court)):
+        player = players.get(pid)
+        if player is not None and player.rating is not None:
+            player.rating -= court.rating_delta if i < 2 else -court.rating_delta
+            player.rating_matches = max((player.rating_matches or 0) - 1, 0)
+    court.rating_delta = None
+
+
+def revert_court_ratings(db: Session, courts: Sequence[CourtAssignment]) -> int:
+    """Revert the rated ones of ``courts`` before they are deleted or their players change. The caller commits."""
+    rated = [court for court in courts if court.rating_delta is not None]
+    if not rated:
+        return 0
+    ids = {pid for court in rated for pid in court_player_ids(court)}
+    players = {p.id: p for p in db.query(Player).filter(Player.id.in_(ids))}
+    for court in rated:
+        revert_court(court, players)
+    return len(rated)
+
+
+def revert_session_ratings(db: Session, session: SessionModel) -> int:
+    """Revert every rated court of a session, archived or not, before its rounds are thrown away. The caller commits."""
+    courts = [court for round_obj in session_rounds(session) for court in round_obj.court_assignments]
+    return revert_court_ratings(db, courts)
+
+
+def rate_court(court: CourtAssignment, players: Dict[int, Player], ended: bool = True) -> bool:
+    """(Re-)apply a court's result to its players' ratings; returns whether it is rated now.
+
+    A previous rating change of the court is reverted first, so corrected or
+    cleared scores do not count twice. ``players`` must hold the court's players.
+    """
+    revert_court(court, players)
+    ids = court_player_ids(court)
+
+    if not ended or not is_rateable(court) or any(pid not in players for pid in ids):
+        return False
+
+    ratings = [player_rating(players[pid]) for pid in ids]
+    delta = match_delta(ratings, court.team_a_score, court.team_b_score)
+    for i, pid in enumerate(ids):
+        players[pid].rating = ratings[i] + (delta if i < 2 else -delta)
+        players[pid].rating_matches = (players[pid].rating_matches or 0) + 1
+    court.rating_delta = delta
+    return True
+
+
+def rate_round(db: Session, round_obj: Round) -> int:
+    """Apply the not yet rated, scored courts of an ended round. The caller commits."""
+    courts = [c for c in round_obj.court_assignments if c.rating_delta is None and is_rateable(c)]
+    if not courts:
+        return 0
+    ids = {pid for court in courts for pid in court_player_ids(court)}
+    players = {p.id: p for p in db.query(Player).filter(Player.id.in_(ids))}
+    return sum(1 for court in courts if rate_court(court, players))
+
+
+@dataclass
+class MatchHistory:
+    """A club's rated matches in the order they were played."""
+    player_ids: List[int]
+    seeds: np.ndarray  # (P,) starting rating per player
+    players: np.ndarray  # (M, 4) player column per slot (team A, team A, team B, team B)
+    scores: np.ndarray  # (M, 2) team A, team B score
+    round_starts: np.ndarray  # index of the first match of each round
+    court_ids: List[Optional[int]]  # court assignment id (archived courts keep their original id)
+
+    @property
+    def num_matches(self) -> int:
+        return self.players.shape[0]
+
+
+def build_history(player_seeds: Dict[int, float], matches: Sequence[Tuple]) -> MatchHistory:
+    """``matches`` are (order key, round key, court id, [4 player ids], team A score, team B score).
+
+    Matches with a player outside ``player_seeds`` are skipped.
+    """
+    player_ids = list(player_seeds)
+    column = {pid: i for i, pid in enumerate(player_ids)}
+    rows = sorted(
+        (m for m in matches if all(pid in column for pid in m[3])),
+        key=lambda m: (m[0], m[1])
+    )
+
+    players = np.array([[column[pid] for pid in m[3]] for m in rows], dtype=np.int64).reshape(-1, 4)
+    scores = np.array([[m[4], m[5]] for m in rows], dtype=np.float64).reshape(-1, 2)
+    round_keys = [m[1] for m in rows]
+    round_starts = np.array(
+        [i for i in range(len(rows)) if i == 0 or round_keys[i] != round_keys[i - 1]], dtype=np.int64
+    )
+    return MatchHistory(
+        player_ids=player_ids,
+        seeds=np.array([player_seeds[pid] for pid in player_ids], dtype=np.float64),
+        players=players,
+        scores=scores,
+        round_starts=round_starts,
+        court_ids=[m[2] for m in rows],
+    )
+
+
+def replay(history: MatchHistory, k: float = K_FACTOR) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Final ratings (P,), per-match team A rating change (M,) and rated matches per player (P,)."""
+    ratings = history.seeds.copy()
+    deltas = np.zeros(history.num_matches, dtype=np.float64)
+    result = np.where(
+        history.scores[:, 0] > history.scores[:, 1], 1.0,
+        np.where(history.scores[:, 0] < history.scores[:, 1], 0.0, 0.5)
+    )
+    bounds = np.append(history.round_starts, history.num_matches)
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        idx = history.players[start:end]
+        current = ratings[idx]
+        team_a = current[:, :2].mean(axis=1)
+        team_b = current[:, 2:].mean(axis=1)
+        delta = k * (result[start:end] - 1.0 / (1.0 + 10.0 ** ((team_b - team_a) / 400.0)))
+        np.add.at(ratings, idx[:, :2], delta[:, None])
+        np.add.at(ratings, idx[:, 2:], -delta[:, None])
+        deltas[start:end] = delta
+    matches = np.bincount(history.players.ravel(), minlength=len(history.player_ids))
+    return ratings, deltas, matches
+
+
+def club_archives(db: Session, club_id: int) -> List[SessionArchive]:
+    return db.query(SessionArchive).join(
+        SessionModel, SessionArchive.session_id == SessionModel.id
+    ).filter(SessionModel.club_id == club_id).all()
+
+
+def load_club_history(db: Session, club_id: int) -> MatchHistory:
+    """Scored matches of ended rounds across the club's live and archived sessions."""
+    seeds = {
+        pid: initial_rating(rank)
+        for pid, rank in db.query(Player.id, Player.numeric_rank).filter(Player.club_id == club_id)
+    }
+
+    matches = []
+    live = db.query(
+        Round.ended_at, Round.id, CourtAssignment.id,
+        CourtAssignment.team_a_player1_id, CourtAssignment.team_a_player2_id,
+        CourtAssignment.team_b_player1_id, CourtAssignment.team_b_player2_id,
+        CourtAssignment.team_a_score, CourtAssignment.team_b_score
+    ).join(Round, CourtAssignment.round_id == Round.id).join(
+        SessionModel, Round.session_id == SessionModel.id
+    ).filter(
+        SessionModel.club_id == club_id,
+        Round.ended_at.isnot(None),
+        CourtAssignment.team_a_score.isnot(None),
+        CourtAssignment.team_b_score.isnot(None)
+    )
+    for ended_at, round_id, court_id, a1, a2, b1, b2, score_a, score_b in live:
+        if None not in (a1, a2, b1, b2):
+            matches.append((ended_at, round_id, court_id, [a1, a2, b1, b2], score_a, score_b))
+
+    for archive in club_archives(db, club_id):
+        for round_obj in decode_archive(archive):
+            if round_obj.ended_at is None:
+                continue
+            for court in round_obj.court_assignments:
+                if is_rateable(court):
+                    matches.append((round_obj.ended_at, round_obj.id, court.id, court_player_ids(court),
+                                    court.team_a_score, court.team_b_score))
+
+    return build_history(seeds, matches)
+
+
+def recompute_club_ratings(db: Session, club_id: int, k: float = K_FACTOR) -> Tuple[MatchHistory, np.ndarray]:
+    """Replay the club's history and store ratings and the courts' rating changes, live and archived. The caller commits.
+
+    Players without rated matches go back to no rating (seeded from numeric_rank on use).
+    """
+    history = load_club_history(db, club_id)
+    ratings, deltas, matches = replay(history, k)
+
+    if history.player_ids:
+        db.execute(update(Player), [
+            {"id": pid, "rating": float(ratings[i]) if matches[i] else None, "rating_matches": int(matches[i])}
+            for i, pid in enumerate(history.player_ids)
+        ])
+
+    club_rounds = db.query(Round.id).join(SessionModel, Round.session_id == SessionModel.id).filter(
+        SessionModel.club_id == club_id
+    )
+    db.query(CourtAssignment).filter(CourtAssignment.round_id.in_(club_rounds.scalar_subquery())).update(
+        {CourtAssignment.rating_delta: None}, synchronize_session=False
+    )
+    court_deltas = {court_id: float(deltas[i]) for i, court_id in enumerate(history.court_ids) if court_id is not None}
+
+    # Archived courts are rewritten inside their archive, so a later revert takes back the right amount
+    archived = set()
+    for archive in club_archives(db, club_id):
+        rounds = decode_archive(archive)
+        for court in (court for round_obj in rounds for court in round_obj.court_assignments):
+            archived.add(court.id)
+            court.rating_delta = court_deltas.get(court.id)
+        write_archive(archive, rounds)
+
+    rated = [
+        {"id": court_id, "rating_delta": delta}
+        for court_id, delta in court_deltas.items() if court_id not in archived
+    ]
+    if rated:
+        db.execute(update(CourtAssignment), rated)
+    return history, ratings
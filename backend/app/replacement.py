@@ -0,0 +1,130 @@
+"""
+Substitutes for players who leave during a round.
+
+``ReplacementPool`` holds the waiting players bucketed by gender, each
+bucket ordered by the auto-assignment priority score (highest last, so
+taking the next substitute is a list pop). ``fill_court`` picks the
+substitutes for all open slots of a court at once: it chooses the match type
+the court can still become (MF, MM or FF) whose substitutes have the highest
+combined priority, then places them so mixed courts keep one man and one
+woman per team.
+"""
+
+from bisect import insort
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.algorithm import (AssignmentPreferences, PlayerStats,
+                           calculate_priority_score)
+from app.models import Gender
+
+OPPOSITE = {Gender.MALE: Gender.FEMALE, Gender.FEMALE: Gender.MALE}
+
+
+class ReplacementPool:
+    """Waiting players by gender, highest priority first."""
+
+    def __init__(self, waiting: Iterable[PlayerStats], current_round: int,
+                 preferences: Optional[AssignmentPreferences] = None):
+        self.current_round = current_round
+        self.preferences = preferences or AssignmentPreferences()
+        self._players: Dict[int, PlayerStats] = {}
+        self._priority: Dict[int, float] = {}
+        # (priority, -player_id) ascending: the best candidate is at the end
+        self._buckets: Dict[Gender, List[Tuple[float, int]]] = defaultdict(list)
+        for player in waiting:
+            self.add(player)
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._players
+
+    def add(self, player: PlayerStats):
+        priority = calculate_priority_score(player, self.current_round, self.preferences)
+        self._players[player.player_id] = player
+        self._priority[player.player_id] = priority
+        insort(self._buckets[player.gender], (priority, -player.player_id))
+
+    def available(self, gender: Gender) -> int:
+        return len(self._buckets[gender])
+
+    def peek(self, gender: Gender, count: int) -> List[PlayerStats]:
+        """The next ``count`` players of ``gender`` without taking them."""
+        return [self._players[-key] for _, key in islice(reversed(self._buckets[gender]), count)]
+
+    def priority(self, player_id: int) -> float:
+        return self._priority[player_id]
+
+    def take(self, gender: Gender) -> PlayerStats:
+        _, key = self._buckets[gender].pop()
+        del self._priority[-key]
+        return self._players.pop(-key)
+
+
+def needed_genders(genders: Sequence[Optional[Gender]]) -> List[Dict[Gender, int]]:
+    """Gender counts that complete the court as MF, MM or FF (in that order), where possible.
+
+    ``genders`` are in team order, so MF is only offered while neither team
+    already has two players of the same gender.
+    """
+    present = [g for g in genders if g is not None]
+    holes = len(genders) - len(present)
+    males = sum(1 for g in present if g == Gender.MALE)
+    females = sum(1 for g in present if g == Gender.FEMALE)
+    teams = (genders[:2], genders[2:])
+    options = []
+    if males + females == len(present):
+        if all(team.count(g) <= 1 for team in teams for g in OPPOSITE):
+            options.append({Gender.MALE: 2 - males, Gender.FEMALE: 2 - females})
+        if females == 0:
+            options.append({Gender.MALE: holes, Gender.FEMALE: 0})
+        if males == 0:
+            options.append({Gender.MALE: 0, Gender.FEMALE: holes})
+    return options
+
+
+def fill_court(pool: ReplacementPool, genders: Sequence[Optional[Gender]]) -> Optional[Dict[int, PlayerStats]]:
+    """Substitutes for the open slots (None) of a court, by slot index.
+
+    ``genders`` are the genders of the four slots in team order (team A
+    player 1, player 2, team B player 1, player 2). Returns None, taking
+    nobody, when the pool cannot complete the court as a valid match.
+    """
+    holes = [i for i, g in enumerate(genders) if g is None]
+    if not holes:
+        return {}
+
+    best, best_score = None, None
+    for option in needed_genders(genders):
+        if any(pool.available(g) < count for g, count in option.items()):
+            continue
+        score = sum(pool.priority(p.player_id) for g, count in option.items() for p in pool.peek(g, count))
+        if best_score is None or score > best_score:
+            best, best_score = option, score
+    if best is None:
+        return None
+
+    # Mixed teams: a hole next to a present partner takes the opposite gender
+    remaining = dict(best)
+    slot_genders = {}
+    for i in holes:
+        partner = genders[i ^ 1]
+        wanted = OPPOSITE.get(partner)
+        if partner is not None and remaining.get(wanted, 0) > 0:
+            slot_genders[i] = wanted
+            remaining[wanted] -= 1
+    for i in holes:
+        if i in slot_genders:
+            continue
+        wanted = OPPOSITE.get(slot_genders.get(i ^ 1))
+        if wanted is not None and remaining[wanted] > 0:
+            gender = wanted
+        else:
+            gender = Gender.MALE if remaining[Gender.MALE] > 0 else Gender.FEMALE
+        slot_genders[i] = gender
+        remaining[gender] -= 1
+
+    return {i: pool.take(slot_genders[i]) for i in holes}
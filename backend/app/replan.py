@@ -0,0 +1,209 @@
+"""
+Warm-start re-planning of an unstarted round.
+
+When players arrive or leave after the next round has been generated,
+re-running the auto-assignment rebuilds every court and people who already
+walked to their court get shuffled around. ``replan_round`` instead starts
+from the round as it is and makes the fewest slot changes that make it valid
+and fair again:
+
+1. Slots of players who are no longer present become holes. Courts beyond
+   the session's court count are dissolved.
+2. If there are more holes than waiting players, the courts with the most
+   holes are dissolved (the cheapest way to free players), unlocked courts
+   first.
+3. Holes are filled from the waiting players by min-cost assignment
+   (Hungarian algorithm): waiting priority first, then keeping the court's
+   match type, then partner/opponent repeats and skill.
+4. Free courts are filled from the remaining waiting players with the
+   regular algorithm, when at least four are waiting.
+5. While moves are left, a waiting player whose priority is at least one
+   round of waiting above a playing player of the same gender takes that
+   player's slot.
+
+A move is one slot of an existing court changing hands (players who left do
+not count, nor do courts that were empty). When restoring validity alone
+needs more than ``max_moves`` moves, ``replan_round`` returns None and the
+caller falls back to a full run.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set
+
+from app.algorithm import (AssignmentPreferences, CourtAssignment, PlayerStats,
+                           auto_assign_courts, calculate_priority_score,
+                           determine_match_type)
+from app.court_allocation import CourtInfo, hungarian
+from app.models import Gender, MatchType
+
+GENDER_MISMATCH = 1000.0
+OPPOSITE = {Gender.MALE: Gender.FEMALE, Gender.FEMALE: Gender.MALE}
+
+
+@dataclass
+class ReplanResult:
+    assignments: List[CourtAssignment]  # the whole round after re-planning
+    waiting_ids: List[int]
+    changed_courts: List[int]  # court numbers whose players changed, including new courts
+    removed_courts: List[int]  # court numbers dissolved
+    moves: int
+
+
+def court_slots(assignment: CourtAssignment) -> List[Optional[int]]:
+    return [assignment.team_a[0], assignment.team_a[1], assignment.team_b[0], assignment.team_b[1]]
+
+
+def required_gender(slots: Sequence[Optional[int]], index: int, match_type: MatchType,
+                    stats: Dict[int, PlayerStats]) -> Optional[Gender]:
+    """Gender a replacement in slot ``index`` needs to keep the court's match type, if any."""
+    if match_type == MatchType.MM:
+        return Gender.MALE
+    if match_type == MatchType.FF:
+        return Gender.FEMALE
+    if match_type != MatchType.MF:
+        return None
+    partner = slots[index ^ 1]
+    if partner is not None:
+        return OPPOSITE.get(stats[partner].gender)
+    # Both team slots are open: one man, one woman
+    return Gender.MALE if index % 2 == 0 else Gender.FEMALE
+
+
+def fill_cost(candidate: PlayerStats, slots: Sequence[Optional[int]], index: int, required: Optional[Gender],
+              priority: float, stats: Dict[int, PlayerStats], preferences: AssignmentPreferences) -> float:
+    cost = -priority
+    if required is not None and candidate.gender != required:
+        cost += GENDER_MISMATCH
+    partner = slots[index ^ 1]
+    if partner is not None and partner in candidate.recent_partners:
+        cost += preferences.avoid_repeat_partners * 10.0
+    opponents = slots[2:] if index < 2 else slots[:2]
+    cost += sum(1 for o in opponents if o is not None and o in candidate.recent_opponents) \
+        * preferences.avoid_repeat_opponents * 5.0
+    others = [stats[pid].numeric_rank for pid in slots if pid is not None]
+    if others:
+        cost += abs(candidate.numeric_rank - sum(others) / len(others)) * preferences.balance_skill * 10.0
+    return cost
+
+
+def replan_round(
+    current: Sequence[CourtAssignment],
+    player_stats: List[PlayerStats],
+    num_courts: int,
+    current_round: int,
+    preferences: AssignmentPreferences,
+    max_moves: int,
+    locked: Optional[Set[int]] = None,
+    courts: Optional[Dict[int, CourtInfo]] = None
+) -> Optional[ReplanResult]:
+    """Re-plan ``current`` (court assignments, None for empty slots) for the players in ``player_stats``."""
+    locked = locked or set()
+    stats = {p.player_id: p for p in player_stats}
+    priority = {p.player_id: calculate_priority_score(p, current_round, preferences) for p in player_stats}
+
+    original = {a.court_number: court_slots(a) for a in current}
+    match_types = {a.court_number: a.match_type for a in current}
+    plan: Dict[int, List[Optional[int]]] = {}
+    seen: Set[int] = set()
+    for number in sorted(original):
+        slots = []
+        for pid in original[number]:
+            keep = pid is not None and pid in stats and pid not in seen
+            slots.append(pid if keep else None)
+            if keep:
+                seen.add(pid)
+        plan[number] = slots
+
+    moves = 0
+    removed = []
+
+    def dissolve(number):
+        nonlocal moves
+        moves += sum(1 for pid in plan.pop(number) if pid is not None)
+        removed.append(number)
+
+    for number in [n for n in plan if n >= num_courts]:
+        dissolve(number)
+
+    def waiting_players():
+        placed = {pid for slots in plan.values() for pid in slots if pid is not None}
+        return sorted((p for p in player_stats if p.player_id not in placed),
+                      key=lambda p: (-priority[p.player_id], p.player_id))
+
+    def hole_count():
+        return sum(1 for slots in plan.values() for pid in slots if pid is None)
+
+    while hole_count() > len(waiting_players()):
+        number = min(plan, key=lambda n: (n in locked, -plan[n].count(None), -n))
+        dissolve(number)
+
+    # Fill the holes
+    holes = [(number, index) for number, slots in plan.items() for index, pid in enumerate(slots) if pid is None]
+    placed_now: Set[int] = set()
+    if holes:
+        candidates = waiting_players()
+        cost = []
+        for number, index in holes:
+            slots = plan[number]
+            required = required_gender(slots, index, match_types[number], stats)
+            cost.append([
+                fill_cost(c, slots, index, required, priority[c.player_id], stats, preferences)
+                for c in candidates
+            ])
+        for (number, index), column in zip(holes, hungarian(cost)):
+            plan[number][index] = candidates[column].player_id
+            placed_now.add(candidates[column].player_id)
+        moves += len(holes)
+
+    if moves > max_moves:
+        return None
+
+    # New courts on free court numbers; nobody is moved for these
+    new_courts = set()
+    if len(waiting_players()) >= 4 and len(plan) < num_courts:
+        fixed = {number: list(slots) for number, slots in plan.items()}
+        extra, _ = auto_assign_courts(player_stats, num_courts, current_round, preferences, fixed, courts)
+        for assignment in extra:
+            if assignment.court_number not in fixed:
+                plan[assignment.court_number] = court_slots(assignment)
+                new_courts.add(assignment.court_number)
+
+    # Fairness swaps with the moves left
+    for candidate in waiting_players():
+        if moves >= max_moves:
+            break
+        swappable = [
+            (number, index, pid)
+            for number, slots in plan.items()
+            if number not in locked and number not in new_courts
+            for index, pid in enumerate(slots)
+            if pid not in placed_now and stats[pid].gender == candidate.gender
+        ]
+        if not swappable:
+            continue
+        number, index, pid = min(swappable, key=lambda s: (priority[s[2]], -s[2]))
+        gap = priority[candidate.player_id] - priority[pid]
+        if gap <= 0 or gap < preferences.prioritize_waiting * 100.0:
+            continue
+        plan[number][index] = candidate.player_id
+        placed_now.add(candidate.player_id)
+        moves += 1
+
+    assignments = []
+    for number in sorted(plan):
+        slots = plan[number]
+        group = [stats[pid] for pid in slots]
+        assignments.append(CourtAssignment(
+            court_number=number,
+            team_a=(slots[0], slots[1]),
+            team_b=(slots[2], slots[3]),
+            match_type=determine_match_type(group, [0, 1], [2, 3])
+        ))
+
+    return ReplanResult(
+        assignments=assignments,
+        waiting_ids=[p.player_id for p in waiting_players()],
+        changed_courts=[n for n in sorted(plan) if plan[n] != original.get(n)],
+        removed_courts=sorted(removed),
+        moves=moves
+    )
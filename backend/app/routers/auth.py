@@ -1,19 +1,22 @@
 from datetime import timedelta
 
-from app.auth import create_access_token, get_password_hash, verify_password
+from app.auth import (PasswordHasherBusy, create_access_token,
+                      get_password_hash_async, get_password_hash_pooled,
+                      password_needs_rehash, verify_password_async)
 from app.config import settings
 from app.database import get_db
 from app.models import Player, User
+from app.principals import principal_claims
 from app.schemas import Token, UserCreate, UserLogin, UserResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/login", response_model=Token)
-def login(user_login: UserLogin, db: Session = Depends(get_db)):
-    """Login endpoint - accepts username or email (email must be verified)."""
+def find_login_user(db: Session, user_login: UserLogin) -> User:
+    """Look up the user for a login attempt - accepts username or email (email must be verified)."""
     # Check if input looks like an email
     is_email = "@" in user_login.username_or_email
     
@@ -42,8 +45,31 @@ def login(user_login: UserLogin, db: Session = Depends(get_db)):
                 detail="Incorrect username or password",
             )
     
+    return user
+
+
+def save_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+@router.post("/login", response_model=Token)
+async def login(user_login: UserLogin, db: Session = Depends(get_db)):
+    """Login endpoint - accepts username or email (email must be verified)."""
+    # Database work stays on the request threadpool, bcrypt runs on the hashing pool
+    user = await run_in_threadpool(find_login_user, db, user_login)
+    
     # Verify password
-    if not verify_password(user_login.password, user.hashed_password):
+    try:
+        password_ok = await verify_password_async(user_login.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, please try again",
+            headers={"Retry-After": "1"},
+        )
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect credentials",
@@ -55,9 +81,17 @@ def login(user_login: UserLogin, db: Session = Depends(get_db)):
             detail="Inactive user",
         )
     
+    # Upgrade hashes made with an old cost factor while we have the plain password
+    if password_needs_rehash(user.hashed_password):
+        try:
+            new_hash = await get_password_hash_async(user_login.password)
+            await run_in_threadpool(save_password_hash, db, user, new_hash)
+        except PasswordHasherBusy:
+            pass  # Try again on a later login
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=principal_claims(user), expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -75,7 +109,7 @@ def register(user_create: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_create.password)
+    hashed_password = get_password_hash_pooled(user_create.password)
     new_user = User(
         email=user_create.email,
         hashed_password=hashed_password,
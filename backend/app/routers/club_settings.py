@@ -1,13 +1,16 @@
 from datetime import datetime
 from typing import List
 
-from app.auth import get_password_hash
+from app.auth import get_password_hash_pooled
 from app.database import get_db
 from app.dependencies import get_current_admin, get_current_club_admin
 from app.models import ClubSettings, RankingSystemType, User, UserRole
+from app.principals import Principal, get_principal_cache
+from app.rankings import club_levels
 from app.schemas import (AvailableLevelsResponse, ClubSettingsCreate,
                          ClubSettingsResponse, ClubSettingsUpdate, UserCreate,
                          UserResponse, UserUpdate)
+from app.tuning import WEIGHT_FIELDS
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
@@ -17,7 +20,7 @@ router = APIRouter(prefix="/club-settings", tags=["club-settings"])
 @router.get("", response_model=ClubSettingsResponse)
 def get_club_settings(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Get club settings for the current user's club."""
     if current_user.club_id is None:
@@ -45,7 +48,7 @@ def get_club_settings(
 def update_club_settings(
     settings_update: ClubSettingsUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Update club settings for the current user's club."""
     if current_user.club_id is None:
@@ -60,6 +63,14 @@ def update_club_settings(
         settings = ClubSettings(club_id=current_user.club_id)
         db.add(settings)
     
+    if settings_update.assignment_weights:
+        unknown = sorted(set(settings_update.assignment_weights) - set(WEIGHT_FIELDS))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown assignment weights: {', '.join(unknown)}"
+            )
+    
     update_data = settings_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(settings, field, value)
@@ -72,29 +83,14 @@ def update_club_settings(
 @router.get("/levels", response_model=AvailableLevelsResponse)
 def get_available_levels(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Get available levels based on current club settings."""
     if current_user.club_id is None:
         return AvailableLevelsResponse(levels=[str(i) for i in range(1, 11)], recent_sessions=[])
     
     settings = db.query(ClubSettings).filter(ClubSettings.club_id == current_user.club_id).first()
-    if not settings:
-        return AvailableLevelsResponse(levels=[str(i) for i in range(1, 11)], recent_sessions=[])
-    
-    levels = []
-    if settings.ranking_system_type == RankingSystemType.INT_RANGE:
-        if settings.int_range_start and settings.int_range_end:
-            levels = [str(i) for i in range(settings.int_range_start, settings.int_range_end + 1)]
-    elif settings.ranking_system_type == RankingSystemType.LETTER_RANGE:
-        if settings.letter_range_start and settings.letter_range_end:
-            start_ord = ord(settings.letter_range_start.upper())
-            end_ord = ord(settings.letter_range_end.upper())
-            levels = [chr(i) for i in range(start_ord, end_ord + 1)]
-    elif settings.ranking_system_type == RankingSystemType.CUSTOM:
-        levels = settings.custom_levels or ["Beginner", "Intermediate", "Advanced"]
-    
-    return AvailableLevelsResponse(levels=levels, recent_sessions=[])
+    return AvailableLevelsResponse(levels=club_levels(settings), recent_sessions=[])
 
 
 # Session Manager management endpoints (club admins only)
@@ -102,7 +98,7 @@ def get_available_levels(
 @router.get("/session-managers", response_model=List[UserResponse])
 def get_session_managers(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Get all session managers for the current club."""
     if not current_user.club_id:
@@ -122,7 +118,7 @@ def get_session_managers(
 def create_session_manager(
     user_data: UserCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Create a new session manager for the current club."""
     if not current_user.club_id:
@@ -149,7 +145,7 @@ def create_session_manager(
             )
     
     # Force role to be SESSION_MANAGER
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = get_password_hash_pooled(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -175,7 +171,7 @@ def update_session_manager(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Update a session manager's information (club admins can edit session managers in their club)."""
     if not current_user.club_id:
@@ -191,6 +187,8 @@ def update_session_manager(
             detail="User not found"
         )
     
+    old_username = user.username
+    
     # Can only edit session managers in the same club
     if user.club_id != current_user.club_id:
         raise HTTPException(
@@ -233,7 +231,7 @@ def update_session_manager(
         user.is_email_verified = False  # Reset verification when email changes
     
     if user_update.password is not None:
-        user.hashed_password = get_password_hash(user_update.password)
+        user.hashed_password = get_password_hash_pooled(user_update.password)
     
     if user_update.full_name is not None:
         user.full_name = user_update.full_name
@@ -249,6 +247,7 @@ def update_session_manager(
         user.is_active = user_update.is_active
     
     db.commit()
+    get_principal_cache().invalidate(old_username, user.username)
     db.refresh(user)
     return user
 
@@ -257,7 +256,7 @@ def update_session_manager(
 def delete_session_manager(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Delete a session manager (club admins can delete session managers in their club)."""
     if not current_user.club_id:
@@ -293,6 +292,8 @@ def delete_session_manager(
             detail="Cannot delete yourself"
         )
     
+    username = user.username
     db.delete(user)
     db.commit()
+    get_principal_cache().invalidate(username)
     return None
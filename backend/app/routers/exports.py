@@ -0,0 +1,141 @@
+import os
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from app.database import SessionLocal, get_db
+from app.dependencies import get_current_club_admin
+from app.export import (gzip_stream, iter_csv, iter_match_history_rows,
+                        iter_ndjson)
+from app.jobs import enqueue_job
+from app.models import Club, Job, JobStatus
+from app.principals import Principal
+from app.schemas import JobResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+def _stream_match_history(club_id: int, session_id: Optional[int], export_format: ExportFormat, compress: bool):
+    """Open a dedicated DB session for the lifetime of the stream."""
+    db = SessionLocal()
+    try:
+        rows = iter_match_history_rows(db, club_id, session_id)
+        chunks = iter_csv(rows) if export_format == ExportFormat.CSV else iter_ndjson(rows)
+        if compress:
+            chunks = gzip_stream(chunks)
+        for chunk in chunks:
+            yield chunk
+    finally:
+        db.close()
+
+
+def resolve_export_club(db: Session, current_user: Principal, club_id: Optional[int]) -> int:
+    """Club admins always export their own club; super admins must name one."""
+    if current_user.club_id is not None:
+        club_id = current_user.club_id
+    elif club_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="club_id is required"
+        )
+
+    club = db.query(Club).filter(Club.id == club_id).first()
+    if not club:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Club not found"
+        )
+    return club_id
+
+
+@router.get("/match-history")
+def export_match_history(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    gzip: bool = Query(True),
+    session_id: Optional[int] = Query(None),
+    club_id: Optional[int] = Query(None, description="Required for super admins"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_club_admin)
+):
+    """Stream the club's sessions, rounds and court assignments as CSV or NDJSON."""
+    club_id = resolve_export_club(db, current_user, club_id)
+
+    extension = "csv" if format == ExportFormat.CSV else "ndjson"
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    filename = f"match-history-club{club_id}-{datetime.utcnow():%Y%m%d}.{extension}"
+    headers = {}
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    return StreamingResponse(
+        _stream_match_history(club_id, session_id, format, gzip),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@router.post("/match-history/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+def queue_match_history_export(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    session_id: Optional[int] = Query(None),
+    club_id: Optional[int] = Query(None, description="Required for super admins"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_club_admin)
+):
+    """Queue a gzip export in the background; poll /jobs/{id} and download when it succeeds."""
+    club_id = resolve_export_club(db, current_user, club_id)
+
+    job = enqueue_job(db, "match_history_export", {
+        "club_id": club_id,
+        "format": format.value,
+        "session_id": session_id
+    }, club_id=club_id)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@router.get("/jobs/{job_id}/download")
+def download_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_club_admin)
+):
+    """Download the file produced by a finished export job."""
+    query = db.query(Job).filter(Job.id == job_id, Job.job_type == "match_history_export")
+    if current_user.club_id is not None:
+        query = query.filter(Job.club_id == current_user.club_id)
+
+    job = query.first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export is {job.status.value}"
+        )
+
+    if not os.path.exists(job.result["path"]):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Export file has expired, please export again"
+        )
+
+    return FileResponse(
+        job.result["path"],
+        media_type="application/gzip",
+        filename=job.result["filename"]
+    )
@@ -0,0 +1,53 @@
+from typing import List, Optional
+
+from app.database import get_db
+from app.dependencies import get_current_admin
+from app.models import Job, JobStatus
+from app.principals import Principal
+from app.schemas import JobResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("", response_model=List[JobResponse])
+def get_jobs(
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """List recent background jobs for the current user's club."""
+    query = db.query(Job)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(Job.club_id == current_user.club_id)
+    
+    if job_status is not None:
+        query = query.filter(Job.status == job_status)
+    
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Get the status of a background job."""
+    query = db.query(Job).filter(Job.id == job_id)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(Job.club_id == current_user.club_id)
+    
+    job = query.first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
@@ -1,9 +1,13 @@
 from typing import List
 
+from app.archive import session_rounds
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.models import (Attendance, AttendanceStatus, CourtAssignment, Player,
-                        Round, User)
+                        Round)
+from app.models import Session as SessionModel
+from app.models import User
+from app.principals import Principal
 from app.schemas import PlayerProfileStats, SessionResponse, UserResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
@@ -13,16 +17,16 @@ router = APIRouter(prefix="/me", tags=["player-portal"])
 
 @router.get("", response_model=UserResponse)
 def get_my_profile(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get current user profile."""
-    return current_user
+    return db.query(User).filter(User.id == current_user.id).first()
 
 
 @router.get("/stats", response_model=PlayerProfileStats)
 def get_my_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get player statistics."""
@@ -52,7 +56,7 @@ def get_my_stats(
         session = attendance.session
         session_matches = 0
         
-        for round_obj in session.rounds:
+        for round_obj in session_rounds(session):
             for court in round_obj.court_assignments:
                 player_ids = [
                     court.team_a_player1_id, court.team_a_player2_id,
@@ -126,7 +130,7 @@ def get_my_stats(
 
 @router.get("/sessions", response_model=List[SessionResponse])
 def get_my_sessions(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get sessions the player attended."""
@@ -138,8 +142,8 @@ def get_my_sessions(
         )
     
     # Get sessions through attendance
-    sessions = db.query(Attendance.session).filter(
+    sessions = db.query(SessionModel).join(Attendance).filter(
         Attendance.player_id == player.id
     ).all()
     
-    return [s[0] for s in sessions]
+    return sessions
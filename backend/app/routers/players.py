@@ -1,10 +1,16 @@
+import csv
 from typing import List, Optional
 
 from app.database import get_db
 from app.dependencies import get_current_club_admin
-from app.models import Player, User
-from app.schemas import PlayerCreate, PlayerResponse, PlayerUpdate
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.models import Player
+from app.player_import import import_players, iter_import_rows
+from app.principals import Principal
+from app.schemas import (PlayerCreate, PlayerImportResponse,
+                         PlayerImportRowError, PlayerResponse, PlayerUpdate)
+from app.versioning import bump_player_versions
+from fastapi import (APIRouter, Depends, File, HTTPException, Query,
+                     UploadFile, status)
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/players", tags=["players"])
@@ -17,7 +23,7 @@ def get_players(
     search: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Get all players for the current user's club with optional filters."""
     query = db.query(Player)
@@ -40,7 +46,7 @@ def get_players(
 def get_player(
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Get a specific player by ID."""
     query = db.query(Player).filter(Player.id == player_id)
@@ -58,11 +64,49 @@ def get_player(
     return player
 
 
+@router.post("/import", response_model=PlayerImportResponse)
+def import_players_file(
+    file: UploadFile = File(..., description="CSV or XLSX with a header row"),
+    dry_run: bool = Query(False, description="Validate and report without saving"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_club_admin)
+):
+    """Bulk-create players from a spreadsheet. Invalid and duplicate rows are skipped and reported."""
+    if current_user.club_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User must be associated with a club to create players"
+        )
+    
+    try:
+        rows = iter_import_rows(file.file, file.filename or "")
+        report = import_players(db, current_user.club_id, rows, dry_run=dry_run)
+    except (RuntimeError, UnicodeDecodeError, csv.Error) as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read file: {exc}"
+        )
+    
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    
+    return PlayerImportResponse(
+        total_rows=report.total_rows,
+        created=report.created,
+        duplicates=report.duplicates,
+        dry_run=dry_run,
+        errors=[PlayerImportRowError(row=e.row, errors=e.errors) for e in report.errors]
+    )
+
+
 @router.post("", response_model=PlayerResponse, status_code=status.HTTP_201_CREATED)
 def create_player(
     player: PlayerCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Create a new player for the current user's club."""
     if current_user.club_id is None:
@@ -86,7 +130,7 @@ def update_player(
     player_id: int,
     player_update: PlayerUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Update a player."""
     query = db.query(Player).filter(Player.id == player_id)
@@ -107,6 +151,9 @@ def update_player(
     for field, value in update_data.items():
         setattr(player, field, value)
     
+    # Cached rounds and statistics show the player's name, gender and rank
+    if update_data:
+        bump_player_versions(db, player)
     db.commit()
     db.refresh(player)
     return player
@@ -116,7 +163,7 @@ def update_player(
 def delete_player(
     player_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_club_admin)
+    current_user: Principal = Depends(get_current_club_admin)
 ):
     """Delete a player (soft delete by setting is_active=False)."""
     query = db.query(Player).filter(Player.id == player_id)
@@ -133,5 +180,6 @@ def delete_player(
         )
     
     player.is_active = False
+    bump_player_versions(db, player)
     db.commit()
     return None
@@ -1,33 +1,117 @@
+import asyncio
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from app.algorithm import AssignmentPreferences
 from app.algorithm import CourtAssignment as AlgoCourtAssignment
 from app.algorithm import PlayerStats, auto_assign_courts
-from app.database import get_db
-from app.dependencies import get_current_admin, get_current_user
+from app.archive import session_rounds
+from app.cache import conditional_response, make_etag
+from app.config import settings
+from app.court_allocation import CourtInfo
+from app.database import SessionLocal, get_db
+from app.dependencies import (get_current_admin, get_current_user,
+                              get_user_from_token)
+from app.events import (RESYNC, SessionEvent, court_event_data,
+                        get_session_events)
+from app.fairness import (build_assignment_matrix, compute_metrics,
+                          fairness_score, played_rounds)
+from app.jobs import enqueue_job
 from app.models import (Attendance, AttendanceStatus, CourtAssignment, Gender,
-                        MatchType, Player, Round)
+                        Job, JobStatus, MatchType, Player, Round)
 from app.models import Session as SessionModel
-from app.models import SessionHistory, SessionStatus, User
+from app.models import SessionCourt, SessionStatus
+from app.preview import CourtView, RoundView, SessionSnapshot, preview_variants
+from app.principals import Principal
+from app.profiling import current_profile, profiling
+from app.ratings import (court_player_ids, rank_from_rating, rate_court,
+                         rate_round, revert_court_ratings,
+                         revert_session_ratings)
+from app.replacement import ReplacementPool, fill_court
+from app.replan import court_slots, replan_round
 from app.schemas import (AttendanceCreate, AttendanceResponse,
-                         AutoAssignmentRequest, CourtAssignmentResponse,
-                         CourtAssignmentUpdate, PlayerSessionStats,
-                         RoundResponse, SessionCreate, SessionResponse,
+                         AutoAssignmentPreferences, AutoAssignmentRequest,
+                         CourtAssignmentBatchUpdate, CourtAssignmentResponse,
+                         CourtAssignmentUpdate, CourtScoreUpdate,
+                         PlayerSessionStats, RoundPreviewRequest,
+                         RoundPreviewResponse, RoundReplanRequest,
+                         RoundReplanResponse, RoundResponse,
+                         SessionCourtResponse, SessionCourtsUpdate,
+                         SessionCreate, SessionDashboard, SessionResponse,
                          SessionStats, SessionUpdate)
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from app.tuning import club_assignment_weights, preferences_with
+from app.versioning import bump_club_version, bump_session_version
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, status)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+rounds_adapter = TypeAdapter(List[RoundResponse])
+
+
+COURT_SLOTS = ('team_a_player1_id', 'team_a_player2_id', 'team_b_player1_id', 'team_b_player2_id')
+
+
+def edit_court(db: Session, court: CourtAssignment, update_data: dict) -> bool:
+    """Set a court's edited fields; returns whether its players changed.
+
+    A rated court's rating change is reverted from the players who played it
+    first. Re-rate an ended round with ``rate_round`` once its edits are done.
+    """
+    relineup = any(field in COURT_SLOTS and getattr(court, field) != value for field, value in update_data.items())
+    if relineup:
+        revert_court_ratings(db, [court])
+    for field, value in update_data.items():
+        setattr(court, field, value)
+    return relineup
+
+
+def session_cache_validators(session: SessionModel, resource: str):
+    """ETag and Last-Modified for a per-session cached resource."""
+    etag = make_etag(resource, session.id, session.version)
+    last_modified = session.updated_at or session.ended_at or session.created_at
+    return etag, last_modified
+
+
+def resolve_match_type(team_a_ids: List[int], team_b_ids: List[int], player_map: dict) -> MatchType:
+    """Match type of a court from its teams' genders (mixed means one man and one woman per team)."""
+    if len(team_a_ids) < 2 or len(team_b_ids) < 2:
+        return MatchType.OTHER
+
+    team_a_genders = [player_map[pid].gender for pid in team_a_ids if pid in player_map]
+    team_b_genders = [player_map[pid].gender for pid in team_b_ids if pid in player_map]
+    genders = team_a_genders + team_b_genders
+
+    male_count = sum(1 for g in genders if g == Gender.MALE)
+    female_count = sum(1 for g in genders if g == Gender.FEMALE)
+
+    if male_count == 4:
+        return MatchType.MM
+    if female_count == 4:
+        return MatchType.FF
+
+    team_a_male = sum(1 for g in team_a_genders if g == Gender.MALE)
+    team_a_female = sum(1 for g in team_a_genders if g == Gender.FEMALE)
+    team_b_male = sum(1 for g in team_b_genders if g == Gender.MALE)
+    team_b_female = sum(1 for g in team_b_genders if g == Gender.FEMALE)
+
+    if team_a_male == 1 and team_a_female == 1 and team_b_male == 1 and team_b_female == 1:
+        return MatchType.MF
+
+    return MatchType.OTHER
+
 
 @router.get("", response_model=List[SessionResponse])
 def get_sessions(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Get all sessions for the current user's club."""
     query = db.query(SessionModel)
@@ -44,7 +128,7 @@ def get_sessions(
 def get_session(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get a specific session by ID."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -62,11 +146,89 @@ def get_session(
     return session
 
 
+@router.get("/{session_id}/dashboard", response_model=SessionDashboard)
+def get_session_dashboard(
+    session_id: int,
+    since_version: Optional[int] = Query(None, ge=0, description="Only return rows changed after this session version"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Session, players, rounds with courts and attendance in one payload.
+    
+    Pass the ``version`` of the previous response as ``since_version`` to get
+    only rounds (with their courts) and attendance changed since then, plus
+    the full id lists so rows deleted in the meantime can be dropped. A
+    version the server cannot answer with a delta gets the full payload
+    (``is_delta`` false).
+    """
+    query = db.query(SessionModel).filter(SessionModel.id == session_id)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
+    
+    session = query.first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    # A client ahead of the server (e.g. restored database) or too far behind gets a full reload
+    is_delta = (
+        since_version is not None
+        and session.version - settings.DASHBOARD_MAX_DELTA_VERSIONS <= since_version <= session.version
+    )
+    min_version = since_version if is_delta else -1
+    
+    if session.archive is not None:
+        archived_rounds = session_rounds(session)
+        rounds = [r for r in archived_rounds if r.version > min_version]
+        round_ids = [r.id for r in archived_rounds]
+    else:
+        rounds = db.query(Round).options(selectinload(Round.court_assignments)).filter(
+            Round.session_id == session_id,
+            Round.version > min_version
+        ).order_by(Round.round_index).all()
+        round_ids = [row.id for row in db.query(Round.id).filter(Round.session_id == session_id)]
+    attendance = db.query(Attendance).filter(
+        Attendance.session_id == session_id,
+        Attendance.version > min_version
+    ).all()
+    attendance_ids = [row.id for row in db.query(Attendance.id).filter(Attendance.session_id == session_id)]
+    
+    # Players referenced by the returned rows (covers guests and inactive players)
+    player_ids = {att.player_id for att in attendance}
+    for round_obj in rounds:
+        for court in round_obj.court_assignments:
+            player_ids.update(pid for pid in (
+                court.team_a_player1_id, court.team_a_player2_id,
+                court.team_b_player1_id, court.team_b_player2_id
+            ) if pid)
+    player_filter = Player.id.in_(player_ids)
+    if not is_delta:
+        player_filter = or_(player_filter, and_(Player.club_id == session.club_id, Player.is_active.is_(True)))
+    players = db.query(Player).filter(player_filter).all() if (player_ids or not is_delta) else []
+    
+    return SessionDashboard(
+        version=session.version,
+        since_version=since_version if is_delta else None,
+        is_delta=is_delta,
+        session=session,
+        players=players,
+        rounds=rounds,
+        attendance=attendance,
+        round_ids=round_ids,
+        attendance_ids=attendance_ids
+    )
+
+
 @router.post("", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
 def create_session(
     session: SessionCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Create a new session."""
     # Ensure club_id is set from the current user
@@ -91,7 +253,7 @@ def update_session(
     session_id: int,
     session_update: SessionUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Update a session."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -111,7 +273,9 @@ def update_session(
     for field, value in update_data.items():
         setattr(session, field, value)
     
+    seq = bump_session_version(db, session.id)
     db.commit()
+    get_session_events().publish(session.id, seq, "session_updated", {"fields": sorted(update_data)})
     db.refresh(session)
     return session
 
@@ -120,7 +284,7 @@ def update_session(
 def delete_session(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Delete a session."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -136,16 +300,95 @@ def delete_session(
             detail="Session not found"
         )
     
+    bump_club_version(db, session.club_id)
+    revert_session_ratings(db, session)
     db.delete(session)
     db.commit()
+    get_session_events().close(session_id)
     return None
 
 
+@router.get("/{session_id}/courts", response_model=List[SessionCourtResponse])
+def get_session_courts(
+    session_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Court attributes of a session (courts without attributes are not listed)."""
+    query = db.query(SessionModel).filter(SessionModel.id == session_id)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
+    
+    session = query.first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    return session.courts
+
+
+@router.put("/{session_id}/courts", response_model=List[SessionCourtResponse])
+def update_session_courts(
+    session_id: int,
+    update: SessionCourtsUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Replace the court attributes used when auto-assignment maps groups to courts."""
+    query = db.query(SessionModel).filter(SessionModel.id == session_id)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
+    
+    session = query.first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    numbers = [court.court_number for court in update.courts]
+    if len(set(numbers)) != len(numbers):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each court can only be listed once"
+        )
+    out_of_range = sorted(n for n in numbers if not 0 <= n < session.number_of_courts)
+    if out_of_range:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Session has courts 0-{session.number_of_courts - 1}; got {out_of_range}"
+        )
+    
+    # Update rows in place so the (session, court_number) unique constraint holds mid-flush
+    existing = {court.court_number: court for court in session.courts}
+    for court_update in update.courts:
+        court = existing.pop(court_update.court_number, None)
+        if court is None:
+            court = SessionCourt(session_id=session.id, court_number=court_update.court_number)
+            session.courts.append(court)
+        for field, value in court_update.dict().items():
+            setattr(court, field, value)
+    for court in existing.values():
+        session.courts.remove(court)
+    
+    seq = bump_session_version(db, session.id)
+    db.commit()
+    get_session_events().publish(session.id, seq, "session_updated", {"fields": ["courts"]})
+    db.refresh(session)
+    return session.courts
+
+
 @router.post("/{session_id}/start", response_model=SessionResponse)
 def start_session(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Start a session by setting started_at timestamp and changing status to ACTIVE. Clears previous session data for fresh start."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -161,8 +404,22 @@ def start_session(
             detail="Session not found"
         )
     
+    # Don't wipe rounds/attendance the previous run's snapshot job still needs
+    pending_snapshot = db.query(Job.id).filter(
+        Job.job_type == "session_snapshot",
+        Job.club_id == session.club_id,
+        Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]),
+        Job.payload["session_id"].as_integer() == session.id
+    ).first()
+    if pending_snapshot is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Previous run statistics are still being saved, please try again in a moment"
+        )
+    
     # Clear previous session data for a fresh start
     # Delete court assignments first (they reference rounds via foreign key)
+    revert_session_ratings(db, session)
     rounds = db.query(Round).filter(Round.session_id == session_id).all()
     for round_obj in rounds:
         db.query(CourtAssignment).filter(CourtAssignment.round_id == round_obj.id).delete()
@@ -170,13 +427,16 @@ def start_session(
     # Now delete rounds and attendance
     db.query(Round).filter(Round.session_id == session_id).delete()
     db.query(Attendance).filter(Attendance.session_id == session_id).delete()
+    session.archive = None
     
     # Set started_at, clear ended_at, and update status to ACTIVE
     session.started_at = datetime.utcnow()
     session.ended_at = None
     session.status = SessionStatus.ACTIVE
     
+    seq = bump_session_version(db, session.id)
     db.commit()
+    get_session_events().publish(session.id, seq, "session_started", {"started_at": session.started_at})
     db.refresh(session)
     return session
 
@@ -184,10 +444,11 @@ def start_session(
 @router.post("/{session_id}/end", response_model=SessionResponse)
 def end_session(
     session_id: int,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
-    """End a session, save statistics snapshot, and preserve data."""
+    """End a session, queue its statistics snapshot, and preserve data."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
     
     # Filter by club_id if user is not a super admin
@@ -210,97 +471,31 @@ def end_session(
     
     if active_round:
         active_round.ended_at = datetime.utcnow()
+        rate_round(db, active_round)
     
-    # Calculate and save statistics snapshot before ending
+    ended_at = datetime.utcnow()
+    
+    # Statistics snapshot is computed by the background job runner
+    snapshot_job = None
     if session.started_at:
-        rounds = db.query(Round).filter(Round.session_id == session_id).all()
-        attendance_records = db.query(Attendance).filter(
-            Attendance.session_id == session_id,
-            Attendance.status == AttendanceStatus.PRESENT
-        ).all()
-        
-        player_ids = {att.player_id for att in attendance_records}
-        matches_per_player = {}
-        waiting_times = {}
-        match_type_counts = {"MM": 0, "MF": 0, "FF": 0}
-        total_matches = 0
-        total_round_duration = 0
-        
-        for round_obj in rounds:
-            if round_obj.started_at is None:
-                continue
-            
-            # Count matches
-            for court in round_obj.court_assignments:
-                if (court.team_a_player1_id and court.team_a_player2_id and 
-                    court.team_b_player1_id and court.team_b_player2_id):
-                    total_matches += 1
-                    if court.match_type.value in match_type_counts:
-                        match_type_counts[court.match_type.value] += 1
-                    
-                    for player_id in [court.team_a_player1_id, court.team_a_player2_id,
-                                     court.team_b_player1_id, court.team_b_player2_id]:
-                        matches_per_player[player_id] = matches_per_player.get(player_id, 0) + 1
-            
-            # Calculate round duration and waiting time
-            if round_obj.started_at and round_obj.ended_at:
-                round_duration = (round_obj.ended_at - round_obj.started_at).total_seconds() / 60
-                total_round_duration += round_duration
-                
-                playing_players = set()
-                for court in round_obj.court_assignments:
-                    if court.team_a_player1_id:
-                        playing_players.add(court.team_a_player1_id)
-                    if court.team_a_player2_id:
-                        playing_players.add(court.team_a_player2_id)
-                    if court.team_b_player1_id:
-                        playing_players.add(court.team_b_player1_id)
-                    if court.team_b_player2_id:
-                        playing_players.add(court.team_b_player2_id)
-                
-                waiting_players = player_ids - playing_players
-                for player_id in waiting_players:
-                    waiting_times[player_id] = waiting_times.get(player_id, 0) + round_duration
-        
-        avg_matches = sum(matches_per_player.values()) / len(player_ids) if player_ids else 0
-        avg_waiting = sum(waiting_times.values()) / len(player_ids) if player_ids else 0
-        
-        if len(matches_per_player) > 1:
-            match_counts = list(matches_per_player.values())
-            mean = sum(match_counts) / len(match_counts)
-            variance = sum((x - mean) ** 2 for x in match_counts) / len(match_counts)
-            fairness_score = max(0, 10 - variance)
-        else:
-            fairness_score = 10.0
-        
-        # Calculate session duration before setting ended_at
-        ended_at = datetime.utcnow()
-        session_duration = (ended_at - session.started_at).total_seconds() / 60
-        
-        # Save statistics snapshot
-        history = SessionHistory(
-            session_id=session.id,
-            session_name=session.name,
-            started_at=session.started_at,
-            ended_at=ended_at,
-            total_rounds=len(rounds),
-            total_players=len(player_ids),
-            total_matches=total_matches,
-            avg_matches_per_player=round(avg_matches, 2),
-            avg_waiting_time=round(avg_waiting, 1),
-            fairness_score=round(fairness_score, 2),
-            session_duration_minutes=round(session_duration, 1),
-            total_round_duration_minutes=round(total_round_duration, 1),
-            match_type_distribution=match_type_counts
-        )
-        db.add(history)
+        snapshot_job = enqueue_job(db, "session_snapshot", {
+            "session_id": session.id,
+            "started_at": session.started_at.isoformat(),
+            "ended_at": ended_at.isoformat()
+        }, club_id=session.club_id)
     
     # Update session status to ended and set ended timestamp
     session.status = SessionStatus.ENDED
-    session.ended_at = datetime.utcnow()
+    session.ended_at = ended_at
     
+    seq = bump_session_version(db, session.id)
     db.commit()
+    get_session_events().publish(session.id, seq, "session_ended", {"ended_at": ended_at})
+    get_session_events().close(session.id)
     db.refresh(session)
+    
+    if snapshot_job is not None:
+        response.headers["X-Job-Id"] = str(snapshot_job.id)
     return session
 
 
@@ -309,7 +504,7 @@ def set_attendance(
     session_id: int,
     attendance: AttendanceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Set present players for a session."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -350,112 +545,62 @@ def set_attendance(
                 CourtAssignment.round_id == active_round.id
             ).all()
             
-            # Get all players currently in courts
-            players_in_courts = set()
-            for court in courts:
-                for pid in [court.team_a_player1_id, court.team_a_player2_id, 
-                           court.team_b_player1_id, court.team_b_player2_id]:
-                    if pid and pid not in removed_player_ids:
-                        players_in_courts.add(pid)
-            
-            # Get waiting players (present but not in any court)
+            # Players staying on courts and waiting players (present but not in any court)
+            players_in_courts = {
+                getattr(court, slot) for court in courts for slot in COURT_SLOTS
+            } - removed_player_ids - {None}
             waiting_player_ids = new_player_ids - players_in_courts
-            waiting_players = db.query(Player).filter(Player.id.in_(waiting_player_ids)).all() if waiting_player_ids else []
             
+            # One query for everyone involved; the pool orders waiting players by auto-assign priority
+            player_map = {
+                p.id: p for p in db.query(Player).filter(Player.id.in_(players_in_courts | waiting_player_ids))
+            }
+            history = [r for r in session.rounds if r.id != active_round.id]
+            stats = {
+                ps.player_id: ps
+                for ps in session_player_stats(history, player_map.values(), active_round.round_index)
+            }
+            pool = ReplacementPool(
+                (stats[pid] for pid in waiting_player_ids if pid in stats),
+                active_round.round_index,
+                preferences_with(club_assignment_weights(db, session.club_id))
+            )
+            
+            # Courts with the fewest departures first; players of a court that
+            # cannot be completed go back to the pool for the others
+            affected = [
+                court for court in courts
+                if any(getattr(court, slot) in removed_player_ids for slot in COURT_SLOTS)
+            ]
+            affected.sort(key=lambda court: sum(getattr(court, slot) in removed_player_ids for slot in COURT_SLOTS))
+            
+            revert_court_ratings(db, affected)
             courts_to_update = []
-            for court in courts:
-                # Check if any removed player is in this court
-                court_player_slots = {
-                    'team_a_player1_id': court.team_a_player1_id,
-                    'team_a_player2_id': court.team_a_player2_id,
-                    'team_b_player1_id': court.team_b_player1_id,
-                    'team_b_player2_id': court.team_b_player2_id
-                }
+            for court in affected:
+                staying = [getattr(court, slot) for slot in COURT_SLOTS]
+                staying = [pid if pid in stats and pid not in removed_player_ids else None for pid in staying]
+                substitutes = fill_court(pool, [stats[pid].gender if pid else None for pid in staying])
                 
-                if any(pid in removed_player_ids for pid in court_player_slots.values() if pid):
-                    # Remove the players from the court
-                    removed_slots = []
-                    for slot, pid in court_player_slots.items():
-                        if pid in removed_player_ids:
-                            setattr(court, slot, None)
-                            removed_slots.append(slot)
-                    
-                    # Get remaining players in court
-                    remaining_players_data = []
-                    for slot in ['team_a_player1_id', 'team_a_player2_id', 'team_b_player1_id', 'team_b_player2_id']:
-                        pid = getattr(court, slot)
+                if substitutes is None:
+                    # Can't form a valid match, clear the court
+                    for pid in staying:
                         if pid:
-                            player = db.query(Player).filter(Player.id == pid).first()
-                            if player:
-                                remaining_players_data.append({'slot': slot, 'player': player})
-                    
-                    # Try to fill empty slots from waiting list
-                    for slot in removed_slots:
-                        if waiting_players:
-                            # Get current court player genders
-                            court_genders = [p['player'].gender for p in remaining_players_data]
-                            
-                            # Try to find a suitable replacement
-                            best_replacement = None
-                            for waiting_player in waiting_players:
-                                # Temporarily add this player to check if it forms a valid match
-                                test_genders = court_genders + [waiting_player.gender]
-                                
-                                if len(test_genders) == 4:
-                                    # Check if this creates a valid match type
-                                    male_count = sum(1 for g in test_genders if g == Gender.MALE)
-                                    female_count = sum(1 for g in test_genders if g == Gender.FEMALE)
-                                    
-                                    # Valid match types: MM (4M), FF (4F), or MF (2M+2F)
-                                    if (male_count == 4 or female_count == 4 or 
-                                        (male_count == 2 and female_count == 2)):
-                                        best_replacement = waiting_player
-                                        break
-                            
-                            if best_replacement:
-                                # Assign the replacement player
-                                setattr(court, slot, best_replacement.id)
-                                remaining_players_data.append({'slot': slot, 'player': best_replacement})
-                                waiting_players.remove(best_replacement)
-                    
-                    # Check final count
-                    final_player_ids = [
-                        court.team_a_player1_id,
-                        court.team_a_player2_id,
-                        court.team_b_player1_id,
-                        court.team_b_player2_id
-                    ]
-                    final_count = sum(1 for p in final_player_ids if p is not None)
-                    
-                    # If we don't have exactly 4 players or can't form valid match, clear the court
-                    if final_count != 4:
-                        court.team_a_player1_id = None
-                        court.team_a_player2_id = None
-                        court.team_b_player1_id = None
-                        court.team_b_player2_id = None
-                        court.match_type = MatchType.OTHER
-                    else:
-                        # Recalculate match type for the updated court
-                        players_in_court = db.query(Player).filter(
-                            Player.id.in_([p for p in final_player_ids if p])
-                        ).all()
-                        male_count = sum(1 for p in players_in_court if p.gender == Gender.MALE)
-                        female_count = sum(1 for p in players_in_court if p.gender == Gender.FEMALE)
-                        
-                        if male_count == 4:
-                            court.match_type = MatchType.MM
-                        elif female_count == 4:
-                            court.match_type = MatchType.FF
-                        elif male_count == 2 and female_count == 2:
-                            court.match_type = MatchType.MF
-                        else:
-                            court.match_type = MatchType.OTHER
-                    
-                    courts_to_update.append(court)
+                            pool.add(stats[pid])
+                    for slot in COURT_SLOTS:
+                        setattr(court, slot, None)
+                    court.match_type = MatchType.OTHER
+                else:
+                    for index, substitute in substitutes.items():
+                        staying[index] = substitute.player_id
+                    for slot, pid in zip(COURT_SLOTS, staying):
+                        setattr(court, slot, pid)
+                    court.match_type = resolve_match_type(staying[:2], staying[2:], player_map)
+                
+                courts_to_update.append(court)
             
-            # Commit court changes
+            # Flush court changes; they commit with the attendance update below
             if courts_to_update:
-                db.commit()
+                db.flush()
     
     # Update attendance - only remove players who are no longer present
     # and add new players, preserving check_in_time for existing players
@@ -492,7 +637,9 @@ def set_attendance(
         db.add(new_attendance)
         attendance_records.append(new_attendance)
     
+    seq = bump_session_version(db, session_id)
     db.commit()
+    get_session_events().publish(session_id, seq, "attendance_changed", {"player_ids": list(attendance.player_ids)})
     
     # Refresh records
     for record in attendance_records:
@@ -505,7 +652,7 @@ def set_attendance(
 def get_attendance(
     session_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get attendance for a session."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -532,8 +679,9 @@ def get_attendance(
 @router.get("/{session_id}/rounds", response_model=List[RoundResponse])
 def get_rounds(
     session_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get all rounds for a session."""
     query = db.query(SessionModel).filter(SessionModel.id == session_id)
@@ -549,66 +697,115 @@ def get_rounds(
             detail="Session not found"
         )
     
-    return session.rounds
+    etag, last_modified = session_cache_validators(session, "rounds")
+    return conditional_response(
+        request,
+        f"rounds:{session.id}",
+        etag,
+        lambda: rounds_adapter.dump_json(rounds_adapter.validate_python(session_rounds(session), from_attributes=True)),
+        last_modified=last_modified
+    )
 
 
-@router.post("/{session_id}/rounds/auto_assign", response_model=RoundResponse)
-def auto_assign_round(
+def authorize_event_stream(session_id: int, token: str) -> int:
+    """Check the caller may watch this session and return its current version."""
+    # Opened by hand so the connection goes back to the pool before streaming starts
+    db = SessionLocal()
+    try:
+        current_user = get_user_from_token(token, db)
+        query = db.query(SessionModel).filter(SessionModel.id == session_id)
+        
+        # Filter by club_id if user is not a super admin
+        if current_user.club_id is not None:
+            query = query.filter(SessionModel.club_id == current_user.club_id)
+        
+        session = query.first()
+        if not session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+        return session.version
+    finally:
+        db.close()
+
+
+@router.get("/{session_id}/events")
+async def stream_session_events(
     session_id: int,
-    request: AutoAssignmentRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Resume after this sequence number"),
+    access_token: Optional[str] = Query(None, description="For EventSource clients, which cannot send headers")
 ):
-    """Auto-assign players to courts for the next round."""
-    query = db.query(SessionModel).filter(SessionModel.id == session_id)
-    
-    # Filter by club_id if user is not a super admin
-    if current_user.club_id is not None:
-        query = query.filter(SessionModel.club_id == current_user.club_id)
-    
-    session = query.first()
-    if not session:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found"
-        )
-    
-    # Get present players
-    present_players = db.query(Player).join(Attendance).filter(
-        Attendance.session_id == session_id,
-        Attendance.status == AttendanceStatus.PRESENT
-    ).all()
-    
-    if len(present_players) < 4:
+    """
+    Server-Sent Events feed of changes to a session.
+    
+    Each event's id is the session version it produced. Reconnecting clients
+    resume via the Last-Event-ID header (or ``since``); if the gap can no
+    longer be replayed a ``resync`` event tells them to reload.
+    """
+    token = access_token
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Not enough players (minimum 4 required)"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated"
         )
     
-    # Auto-end any active round (started but not ended) before creating a new round
-    active_round = db.query(Round).filter(
-        Round.session_id == session_id,
-        Round.started_at.isnot(None),
-        Round.ended_at.is_(None)
-    ).first()
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
     
-    if active_round:
-        active_round.ended_at = datetime.utcnow()
-        db.commit()
+    current_version = await run_in_threadpool(authorize_event_stream, session_id, token)
+    subscriber, backlog = get_session_events().subscribe(session_id, since, current_version)
     
-    # Check if there's already an unstarted round
-    existing_unstarted_round = db.query(Round).filter(
-        Round.session_id == session_id,
-        Round.started_at == None
-    ).order_by(Round.round_index.desc()).first()
+    async def event_stream():
+        last_seq = since if since is not None else current_version
+        try:
+            yield "retry: 3000\n\n"
+            for event in backlog:
+                last_seq = event.seq
+                yield event.to_sse()
+            
+            while True:
+                if subscriber.overflowed:
+                    # Client fell too far behind; it reloads and reconnects
+                    yield SessionEvent(seq=last_seq, type=RESYNC, data={"version": last_seq}).to_sse()
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=settings.EVENT_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": ping\n\n"
+                    continue
+                last_seq = event.seq
+                yield event.to_sse()
+        finally:
+            get_session_events().unsubscribe(session_id, subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    # Determine round index (reuse unstarted round index if present)
-    current_round_index = existing_unstarted_round.round_index if existing_unstarted_round else len(session.rounds)
 
-    # Calculate player stats
+def session_player_stats(rounds, players, current_round_index: int, use_rating: bool = False) -> List[PlayerStats]:
+    """Per-player history over ``rounds`` for the assignment algorithm.
+
+    With ``use_rating`` the skill is the results-based rating (mapped onto the
+    numeric_rank scale) for players who have one.
+    """
     player_stats = []
     
-    for player in present_players:
+    for player in players:
         # Get matches played in this session
         matches_played = 0
         last_played_round = -1
@@ -616,8 +813,7 @@ def auto_assign_round(
         recent_opponents = set()
         courts_played = set()  # Track which courts this player has used
         
-        for round_obj in session.rounds:
-            played_in_round = False
+        for round_obj in rounds:
             for court in round_obj.court_assignments:
                 player_ids_in_court = [
                     court.team_a_player1_id, court.team_a_player2_id,
@@ -625,7 +821,6 @@ def auto_assign_round(
                 ]
                 
                 if player.id in player_ids_in_court:
-                    played_in_round = True
                     matches_played += 1
                     last_played_round = round_obj.round_index
                     courts_played.add(court.court_number)  # Track court number
@@ -658,7 +853,10 @@ def auto_assign_round(
             player_id=player.id,
             name=player.full_name,
             gender=player.gender,
-            numeric_rank=player.numeric_rank or 5.0,
+            numeric_rank=(
+                rank_from_rating(player.rating) if use_rating and player.rating is not None
+                else player.numeric_rank or 5.0
+            ),
             matches_played=matches_played,
             rounds_sitting_out=rounds_sitting_out,
             last_played_round=last_played_round,
@@ -666,32 +864,152 @@ def auto_assign_round(
             recent_opponents=recent_opponents,
             courts_played=courts_played  # Include courts played
         ))
-    
-    # Get locked courts from the most recent round (if any)
-    locked_courts_dict = {}
+    return player_stats
+
+
+def assignment_preferences(preferences: AutoAssignmentPreferences,
+                           club_weights: Optional[dict] = None) -> AssignmentPreferences:
+    """Algorithm preferences for a request.
+
+    Weights the request leaves unset come from the club's tuned defaults
+    (``club_weights``, see app/tuning.py), then from the algorithm's defaults.
+    """
+    weights = {
+        name: value for name, value in (club_weights or {}).items()
+        if name not in preferences.model_fields_set
+    }
+    return AssignmentPreferences(**{
+        name: weights.get(name, getattr(preferences, name))
+        for name in (
+            "desired_mm", "desired_mf", "desired_ff",
+            "prioritize_waiting", "prioritize_equal_matches",
+            "avoid_repeat_partners", "avoid_repeat_opponents",
+            "balance_skill", "court_variety",
+            "show_court_weight", "beginner_court_weight", "poor_lighting_rotation"
+        )
+    })
+
+
+def latest_locked_courts(session: SessionModel) -> dict:
+    """Locked courts of the most recent round (if any): court number -> 4 player ids."""
+    locked_courts = {}
     if session.rounds:
         latest_round = session.rounds[-1]
         for court in latest_round.court_assignments:
             if court.locked:
-                locked_courts_dict[court.court_number] = [
+                locked_courts[court.court_number] = [
                     court.team_a_player1_id,
                     court.team_a_player2_id,
                     court.team_b_player1_id,
                     court.team_b_player2_id
                 ]
+    return locked_courts
+
+
+def session_court_info(session: SessionModel) -> dict:
+    return {
+        court.court_number: CourtInfo(
+            court_number=court.court_number,
+            name=court.name,
+            show_court=court.show_court,
+            poor_lighting=court.poor_lighting,
+            beginners_only=court.beginners_only
+        )
+        for court in session.courts
+    }
+
+
+@router.post("/{session_id}/rounds/auto_assign", response_model=RoundResponse)
+def auto_assign_round(
+    session_id: int,
+    request: AutoAssignmentRequest,
+    response: Response,
+    profile: bool = Query(False, description="Return phase timings and counters in X-Assignment-Profile"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Auto-assign players to courts for the next round."""
+    with profiling(profile or settings.ASSIGNMENT_PROFILING) as assign_profile:
+        new_round = create_auto_assigned_round(session_id, request, db, current_user)
+    
+    if profile:
+        response.headers["X-Assignment-Profile"] = assign_profile.header_value()
+        response.headers.append("Server-Timing", assign_profile.server_timing())
+    return new_round
+
+
+def create_auto_assigned_round(
+    session_id: int,
+    request: AutoAssignmentRequest,
+    db: Session,
+    current_user: Principal
+) -> Round:
+    query = db.query(SessionModel).filter(SessionModel.id == session_id)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
+    
+    session = query.first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    # Get present players
+    present_players = db.query(Player).join(Attendance).filter(
+        Attendance.session_id == session_id,
+        Attendance.status == AttendanceStatus.PRESENT
+    ).all()
+    
+    if len(present_players) < 4:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough players (minimum 4 required)"
+        )
+    
+    # Auto-end any active round (started but not ended) before creating a new round
+    active_round = db.query(Round).filter(
+        Round.session_id == session_id,
+        Round.started_at.isnot(None),
+        Round.ended_at.is_(None)
+    ).first()
+    
+    if active_round:
+        active_round.ended_at = datetime.utcnow()
+        rate_round(db, active_round)
+        seq = bump_session_version(db, session_id)
+        db.commit()
+        get_session_events().publish(session_id, seq, "round_ended", {
+            "round_id": active_round.id,
+            "ended_at": active_round.ended_at
+        })
     
-    # Convert preferences
-    algo_prefs = AssignmentPreferences(
-        desired_mm=request.preferences.desired_mm,
-        desired_mf=request.preferences.desired_mf,
-        desired_ff=request.preferences.desired_ff,
-        prioritize_waiting=request.preferences.prioritize_waiting,
-        prioritize_equal_matches=request.preferences.prioritize_equal_matches,
-        avoid_repeat_partners=request.preferences.avoid_repeat_partners,
-        avoid_repeat_opponents=request.preferences.avoid_repeat_opponents,
-        balance_skill=request.preferences.balance_skill
+    # Check if there's already an unstarted round
+    existing_unstarted_round = db.query(Round).filter(
+        Round.session_id == session_id,
+        Round.started_at == None
+    ).order_by(Round.round_index.desc()).first()
+
+    # Determine round index (reuse unstarted round index if present)
+    current_round_index = existing_unstarted_round.round_index if existing_unstarted_round else len(session.rounds)
+
+    player_stats = session_player_stats(
+        session.rounds, present_players, current_round_index, request.preferences.balance_on_rating
     )
     
+    locked_courts_dict = latest_locked_courts(session)
+    
+    algo_prefs = assignment_preferences(request.preferences, club_assignment_weights(db, session.club_id))
+    court_info = session_court_info(session)
+    
+    assign_profile = current_profile()
+    if assign_profile is not None:
+        assign_profile.lap("load_stats")
+        assign_profile.count("players_present", len(present_players))
+        assign_profile.count("rounds_scanned", len(session.rounds))
+    
     # If manual court assignments are provided, handle them
     assignments = None
     if request.court_assignments and len(request.court_assignments) > 0:
@@ -741,7 +1059,8 @@ def auto_assign_round(
                     session.number_of_courts,
                     current_round_index,
                     algo_prefs,
-                    manual_locked_courts if manual_locked_courts else None
+                    manual_locked_courts if manual_locked_courts else None,
+                    court_info
                 )
                 # Combine manual and auto assignments
                 assignments = list(request.court_assignments) + auto_assignments
@@ -757,7 +1076,8 @@ def auto_assign_round(
             session.number_of_courts,
             current_round_index,
             algo_prefs,
-            locked_courts_dict if locked_courts_dict else None
+            locked_courts_dict if locked_courts_dict else None,
+            court_info
         )
 
     # Delete any existing unstarted round and its assignments
@@ -777,39 +1097,13 @@ def auto_assign_round(
     if request.court_assignments and len(request.court_assignments) > 0:
         player_map = {p.id: p for p in present_players}
 
-        def resolve_match_type(team_a_ids, team_b_ids):
-            if len(team_a_ids) < 2 or len(team_b_ids) < 2:
-                return MatchType.OTHER
-
-            team_a_genders = [player_map[pid].gender for pid in team_a_ids if pid in player_map]
-            team_b_genders = [player_map[pid].gender for pid in team_b_ids if pid in player_map]
-            genders = team_a_genders + team_b_genders
-
-            male_count = sum(1 for g in genders if g == Gender.MALE)
-            female_count = sum(1 for g in genders if g == Gender.FEMALE)
-
-            if male_count == 4:
-                return MatchType.MM
-            if female_count == 4:
-                return MatchType.FF
-
-            team_a_male = sum(1 for g in team_a_genders if g == Gender.MALE)
-            team_a_female = sum(1 for g in team_a_genders if g == Gender.FEMALE)
-            team_b_male = sum(1 for g in team_b_genders if g == Gender.MALE)
-            team_b_female = sum(1 for g in team_b_genders if g == Gender.FEMALE)
-
-            if team_a_male == 1 and team_a_female == 1 and team_b_male == 1 and team_b_female == 1:
-                return MatchType.MF
-
-            return MatchType.OTHER
-
     for assignment in assignments:
         # Check if this is a manual assignment (has team_a_player1_id) or auto assignment (has team_a tuple)
         if hasattr(assignment, 'team_a_player1_id'):
             # Manual assignment
             team_a_ids = [pid for pid in [assignment.team_a_player1_id, assignment.team_a_player2_id] if pid is not None]
             team_b_ids = [pid for pid in [assignment.team_b_player1_id, assignment.team_b_player2_id] if pid is not None]
-            match_type = resolve_match_type(team_a_ids, team_b_ids)
+            match_type = resolve_match_type(team_a_ids, team_b_ids, player_map)
 
             court = CourtAssignment(
                 round_id=new_round.id,
@@ -835,17 +1129,246 @@ def auto_assign_round(
             )
         db.add(court)
     
+    seq = bump_session_version(db, session_id)
     db.commit()
+    get_session_events().publish(session_id, seq, "round_created", {
+        "round_id": new_round.id,
+        "round_index": new_round.round_index
+    })
     db.refresh(new_round)
     
+    if assign_profile is not None:
+        assign_profile.lap("persist")
     return new_round
 
 
+@router.post("/{session_id}/rounds/preview", response_model=RoundPreviewResponse)
+def preview_round(
+    session_id: int,
+    request: RoundPreviewRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Compare the next round under several preference variants without saving anything.
+
+    The variants are evaluated in parallel from one snapshot of the session
+    (see app/preview.py); auto-assigning with a variant's preferences
+    produces the round it previewed.
+    """
+    if len(request.variants) > settings.PREVIEW_MAX_VARIANTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PREVIEW_MAX_VARIANTS} variants can be compared"
+        )
+    
+    query = db.query(SessionModel).filter(SessionModel.id == session_id)
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
+    
+    session = query.first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    present_players = db.query(Player).join(Attendance).filter(
+        Attendance.session_id == session_id,
+        Attendance.status == AttendanceStatus.PRESENT
+    ).all()
+    if len(present_players) < 4:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough players (minimum 4 required)"
+        )
+    
+    # Same inputs as create_auto_assigned_round; the unstarted round (if any) is what gets replaced
+    unstarted_round = db.query(Round).filter(
+        Round.session_id == session_id,
+        Round.started_at == None
+    ).order_by(Round.round_index.desc()).first()
+    round_index = unstarted_round.round_index if unstarted_round else len(session.rounds)
+    history = sorted(
+        (r for r in session.rounds if unstarted_round is None or r.id != unstarted_round.id),
+        key=lambda r: r.round_index
+    )
+    check_in_times = dict(db.query(Attendance.player_id, Attendance.check_in_time).filter(
+        Attendance.session_id == session_id,
+        Attendance.status == AttendanceStatus.PRESENT
+    ).all())
+    
+    snapshot = SessionSnapshot(
+        player_stats=session_player_stats(session.rounds, present_players, round_index),
+        rated_ranks={p.id: rank_from_rating(p.rating) for p in present_players if p.rating is not None},
+        history=[
+            RoundView(r.created_at, [
+                CourtView(c.team_a_player1_id, c.team_a_player2_id, c.team_b_player1_id, c.team_b_player2_id)
+                for c in r.court_assignments
+            ])
+            for r in history
+        ],
+        player_ranks={p.id: p.numeric_rank or 5.0 for p in present_players},
+        check_in_times=check_in_times,
+        number_of_courts=session.number_of_courts,
+        round_index=round_index,
+        locked_courts=latest_locked_courts(session),
+        courts=session_court_info(session)
+    )
+    club_weights = club_assignment_weights(db, session.club_id)
+    results = preview_variants(snapshot, [
+        (assignment_preferences(variant.preferences, club_weights), variant.preferences.balance_on_rating)
+        for variant in request.variants
+    ])
+    
+    return {
+        "session_id": session_id,
+        "round_index": round_index,
+        "candidates": [dict(result, name=variant.name) for variant, result in zip(request.variants, results)],
+    }
+
+
+@router.post("/{session_id}/rounds/replan", response_model=RoundReplanResponse)
+def replan_unstarted_round(
+    session_id: int,
+    request: RoundReplanRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Re-plan the unstarted round in place after players arrived or left.
+
+    Players stay on their court where possible and only the changed courts
+    are returned (see app/replan.py). When restoring the round would take
+    more than ``max_moves`` slot changes, a full auto-assignment is applied
+    to the same round instead.
+    """
+    query = db.query(SessionModel).filter(SessionModel.id == session_id)
+
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
+
+    session = query.first()
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    round_obj = db.query(Round).filter(
+        Round.session_id == session_id,
+        Round.started_at == None
+    ).order_by(Round.round_index.desc()).first()
+    if not round_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No unstarted round to re-plan"
+        )
+
+    present_players = db.query(Player).join(Attendance).filter(
+        Attendance.session_id == session_id,
+        Attendance.status == AttendanceStatus.PRESENT
+    ).all()
+    if len(present_players) < 4:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough players (minimum 4 required)"
+        )
+
+    # History without the round being re-planned
+    history = [r for r in session.rounds if r.id != round_obj.id]
+    player_stats = session_player_stats(
+        history, present_players, round_obj.round_index, request.preferences.balance_on_rating
+    )
+    algo_prefs = assignment_preferences(request.preferences, club_assignment_weights(db, session.club_id))
+    court_info = session_court_info(session)
+
+    courts = {court.court_number: court for court in round_obj.court_assignments}
+    current = [
+        AlgoCourtAssignment(
+            court_number=court.court_number,
+            team_a=(court.team_a_player1_id, court.team_a_player2_id),
+            team_b=(court.team_b_player1_id, court.team_b_player2_id),
+            match_type=court.match_type
+        )
+        for court in courts.values()
+    ]
+    locked = {number for number, court in courts.items() if court.locked}
+    result = replan_round(
+        current, player_stats, session.number_of_courts, round_obj.round_index,
+        algo_prefs, request.max_moves, locked, court_info
+    )
+    present_ids = {p.id for p in present_players}
+    if result is not None:
+        plan, waiting_ids = result.assignments, result.waiting_ids
+    else:
+        # Too many moves: full run, keeping complete locked courts
+        locked_courts = {}
+        for assignment in current:
+            slots = court_slots(assignment)
+            if (assignment.court_number in locked and assignment.court_number < session.number_of_courts
+                    and all(pid in present_ids for pid in slots)):
+                locked_courts[assignment.court_number] = slots
+        plan, waiting_ids = auto_assign_courts(
+            player_stats,
+            session.number_of_courts,
+            round_obj.round_index,
+            algo_prefs,
+            locked_courts if locked_courts else None,
+            court_info
+        )
+
+    # Apply the plan to the round's rows, counting slots that changed hands
+    moves = 0
+    changed = []
+    for assignment in plan:
+        slots = court_slots(assignment)
+        court = courts.pop(assignment.court_number, None)
+        if court is None:
+            court = CourtAssignment(round_id=round_obj.id, court_number=assignment.court_number, locked=False)
+            db.add(court)
+        else:
+            before = [court.team_a_player1_id, court.team_a_player2_id,
+                      court.team_b_player1_id, court.team_b_player2_id]
+            if before == slots:
+                continue
+            moves += sum(1 for old, new in zip(before, slots) if old != new)
+        court.team_a_player1_id, court.team_a_player2_id = assignment.team_a
+        court.team_b_player1_id, court.team_b_player2_id = assignment.team_b
+        court.match_type = assignment.match_type
+        changed.append(court)
+
+    removed_courts = sorted(courts)
+    for court in courts.values():
+        moves += sum(1 for pid in (court.team_a_player1_id, court.team_a_player2_id,
+                                   court.team_b_player1_id, court.team_b_player2_id)
+                     if pid in present_ids)
+        db.delete(court)
+
+    seq = bump_session_version(db, session_id)
+    db.commit()
+    get_session_events().publish(session_id, seq, "courts_updated", {
+        "round_id": round_obj.id,
+        "courts": [court_event_data(court) for court in changed],
+        "removed_courts": removed_courts,
+    })
+
+    return {
+        "round_id": round_obj.id,
+        "warm_start": result is not None,
+        "moves": moves,
+        "changed_courts": sorted(changed, key=lambda court: court.court_number),
+        "removed_courts": removed_courts,
+        "waiting_player_ids": waiting_ids,
+    }
+
+
 @router.post("/rounds/{round_id}/start", response_model=RoundResponse)
 def start_round(
     round_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Start a round."""
     round_obj = db.query(Round).filter(Round.id == round_id).first()
@@ -857,7 +1380,12 @@ def start_round(
     
     round_obj.started_at = datetime.utcnow()
     round_obj.ended_at = None  # Clear ended_at to allow restarting a previously ended round
+    seq = bump_session_version(db, round_obj.session_id)
     db.commit()
+    get_session_events().publish(round_obj.session_id, seq, "round_started", {
+        "round_id": round_obj.id,
+        "started_at": round_obj.started_at
+    })
     db.refresh(round_obj)
     return round_obj
 
@@ -866,7 +1394,7 @@ def start_round(
 def end_round(
     round_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """End a round."""
     round_obj = db.query(Round).filter(Round.id == round_id).first()
@@ -877,7 +1405,13 @@ def end_round(
         )
     
     round_obj.ended_at = datetime.utcnow()
+    rate_round(db, round_obj)
+    seq = bump_session_version(db, round_obj.session_id)
     db.commit()
+    get_session_events().publish(round_obj.session_id, seq, "round_ended", {
+        "round_id": round_obj.id,
+        "ended_at": round_obj.ended_at
+    })
     db.refresh(round_obj)
     return round_obj
 
@@ -886,7 +1420,7 @@ def end_round(
 def cancel_round(
     round_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Cancel/delete a round and its court assignments."""
     round_obj = db.query(Round).filter(Round.id == round_id).first()
@@ -896,12 +1430,16 @@ def cancel_round(
             detail="Round not found"
         )
     
-    # Delete court assignments first
+    # Delete court assignments first, taking back the ratings of scored ones
+    revert_court_ratings(db, round_obj.court_assignments)
     db.query(CourtAssignment).filter(CourtAssignment.round_id == round_id).delete()
     
     # Delete the round
+    session_id = round_obj.session_id
+    seq = bump_session_version(db, session_id)
     db.delete(round_obj)
     db.commit()
+    get_session_events().publish(session_id, seq, "round_cancelled", {"round_id": round_id})
     return None
 
 
@@ -911,7 +1449,7 @@ def update_court_assignment(
     court_number: int,
     update: CourtAssignmentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Update a court assignment (manual edit)."""
     # First check if the round belongs to user's club
@@ -937,21 +1475,109 @@ def update_court_assignment(
             detail="Court assignment not found"
         )
     
-    update_data = update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(court, field, value)
+    if edit_court(db, court, update.dict(exclude_unset=True)) and court.round.ended_at is not None:
+        rate_round(db, court.round)
     
+    session_id = court.round.session_id
+    seq = bump_session_version(db, session_id)
     db.commit()
     db.refresh(court)
+    get_session_events().publish(session_id, seq, "court_updated", court_event_data(court))
     return court
 
 
+@router.patch("/rounds/{round_id}/courts", response_model=RoundResponse)
+def update_court_assignments(
+    round_id: int,
+    batch: CourtAssignmentBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Apply several court edits (e.g. a drag-and-drop swap) in one transaction."""
+    round_query = db.query(Round).options(selectinload(Round.court_assignments)).filter(Round.id == round_id)
+    if current_user.club_id is not None:
+        round_query = round_query.join(SessionModel).filter(SessionModel.club_id == current_user.club_id)
+
+    round_obj = round_query.first()
+    if not round_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Round not found"
+        )
+
+    courts = {court.court_number: court for court in round_obj.court_assignments}
+    edited = []
+    relineup = False
+    for item in batch.courts:
+        court = courts.get(item.court_number)
+        if court is None:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Court assignment not found: court {item.court_number}"
+            )
+        if court in edited:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Court {item.court_number} is listed more than once"
+            )
+        update_data = item.dict(exclude_unset=True, exclude={"court_number", "match_type"})
+        relineup = edit_court(db, court, update_data) or relineup
+        edited.append(court)
+
+    # Validate the round as it will be saved, not just the edited courts
+    player_courts = {}
+    for court in round_obj.court_assignments:
+        for player_id in (court.team_a_player1_id, court.team_a_player2_id,
+                          court.team_b_player1_id, court.team_b_player2_id):
+            if player_id is None:
+                continue
+            if player_id in player_courts:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Player {player_id} is assigned to courts "
+                           f"{player_courts[player_id]} and {court.court_number}"
+                )
+            player_courts[player_id] = court.court_number
+
+    player_query = db.query(Player).filter(Player.id.in_(player_courts))
+    if round_obj.session.club_id is not None:
+        player_query = player_query.filter(Player.club_id == round_obj.session.club_id)
+    player_map = {p.id: p for p in player_query}
+    unknown = sorted(set(player_courts) - set(player_map))
+    if unknown:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Players not found: {unknown}"
+        )
+
+    for court in edited:
+        team_a_ids = [pid for pid in [court.team_a_player1_id, court.team_a_player2_id] if pid is not None]
+        team_b_ids = [pid for pid in [court.team_b_player1_id, court.team_b_player2_id] if pid is not None]
+        court.match_type = resolve_match_type(team_a_ids, team_b_ids, player_map)
+    if relineup and round_obj.ended_at is not None:
+        rate_round(db, round_obj)
+
+    session_id = round_obj.session_id
+    seq = bump_session_version(db, session_id)
+    db.commit()
+    db.refresh(round_obj)
+    get_session_events().publish(session_id, seq, "courts_updated", {
+        "round_id": round_id,
+        "courts": [court_event_data(court) for court in edited],
+    })
+    return round_obj
+
+
 @router.patch("/court-assignments/{court_assignment_id}", response_model=CourtAssignmentResponse)
 def update_court_assignment_by_id(
     court_assignment_id: int,
     update: CourtAssignmentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin)
+    current_user: Principal = Depends(get_current_admin)
 ):
     """Update a court assignment by its ID."""
     court = db.query(CourtAssignment).filter(
@@ -964,20 +1590,69 @@ def update_court_assignment_by_id(
             detail="Court assignment not found"
         )
     
-    update_data = update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(court, field, value)
+    if edit_court(db, court, update.dict(exclude_unset=True)) and court.round.ended_at is not None:
+        rate_round(db, court.round)
+    
+    session_id = court.round.session_id
+    seq = bump_session_version(db, session_id)
+    db.commit()
+    db.refresh(court)
+    get_session_events().publish(session_id, seq, "court_updated", court_event_data(court))
+    return court
+
+
+@router.put("/court-assignments/{court_assignment_id}/score", response_model=CourtAssignmentResponse)
+def set_court_score(
+    court_assignment_id: int,
+    score: CourtScoreUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_admin)
+):
+    """Enter, correct or clear a court's result.
+
+    Ratings are updated when the round ends; for a round that has already
+    ended the court is re-rated right away (see app/ratings.py).
+    """
+    query = db.query(CourtAssignment).join(Round).join(SessionModel).filter(
+        CourtAssignment.id == court_assignment_id
+    )
+    
+    # Filter by club_id if user is not a super admin
+    if current_user.club_id is not None:
+        query = query.filter(SessionModel.club_id == current_user.club_id)
     
+    court = query.first()
+    if not court:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Court assignment not found"
+        )
+    if (score.team_a_score is None) != (score.team_b_score is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Enter both scores, or neither to clear the result"
+        )
+    
+    court.team_a_score = score.team_a_score
+    court.team_b_score = score.team_b_score
+    if court.round.ended_at is not None or court.rating_delta is not None:
+        players = {p.id: p for p in db.query(Player).filter(Player.id.in_(court_player_ids(court)))}
+        rate_court(court, players, ended=court.round.ended_at is not None)
+    
+    session_id = court.round.session_id
+    seq = bump_session_version(db, session_id)
     db.commit()
     db.refresh(court)
+    get_session_events().publish(session_id, seq, "court_updated", court_event_data(court))
     return court
 
 
 @router.get("/{session_id}/stats", response_model=SessionStats)
 def get_session_stats(
     session_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get fairness stats for a session."""
     session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
@@ -987,14 +1662,29 @@ def get_session_stats(
             detail="Session not found"
         )
     
+    etag, last_modified = session_cache_validators(session, "stats")
+    return conditional_response(
+        request,
+        f"stats:{session.id}",
+        etag,
+        lambda: compute_session_stats(db, session).model_dump_json().encode("utf-8"),
+        last_modified=last_modified
+    )
+
+
+def compute_session_stats(db: Session, session: SessionModel) -> SessionStats:
+    """Build the per-player fairness stats for a session."""
+    session_id = session.id
+
     # Get present players
     present_players = db.query(Player).join(Attendance).filter(
         Attendance.session_id == session_id,
         Attendance.status == AttendanceStatus.PRESENT
     ).all()
     
+    rounds = session_rounds(session)
     player_stats = []
-    total_rounds = len(session.rounds)
+    total_rounds = len(rounds)
     
     for player in present_players:
         # Get player's attendance record to check when they joined
@@ -1011,7 +1701,7 @@ def get_session_stats(
         match_types = {"MM": 0, "MF": 0, "FF": 0, "OTHER": 0}
         courts_played = set()  # Track court numbers
         
-        for round_obj in session.rounds:
+        for round_obj in rounds:
             # Only count rounds that were created after player joined
             # Use <= to skip rounds created strictly before check-in (not equal)
             if attendance and attendance.check_in_time > round_obj.created_at:
@@ -1080,20 +1770,28 @@ def get_session_stats(
     if player_stats:
         avg_matches = sum(p.matches_played for p in player_stats) / len(player_stats)
         avg_waiting = sum(p.waiting_time_minutes for p in player_stats) / len(player_stats)
-        
-        # Fairness score: lower variance = better
-        match_variance = sum((p.matches_played - avg_matches) ** 2 for p in player_stats) / len(player_stats)
-        fairness_score = max(0, 100 - (match_variance * 10))
     else:
         avg_matches = 0
         avg_waiting = 0
-        fairness_score = 100
+    
+    check_in_times = dict(db.query(Attendance.player_id, Attendance.check_in_time).filter(
+        Attendance.session_id == session_id,
+        Attendance.status == AttendanceStatus.PRESENT
+    ).all())
+    # Same rounds as the end-of-session snapshot (app/snapshots.py)
+    matrix = build_assignment_matrix(
+        played_rounds(rounds),
+        {p.id: p.numeric_rank or 5.0 for p in present_players},
+        session.number_of_courts,
+        check_in_times
+    )
     
     return SessionStats(
         session_id=session_id,
         total_rounds=total_rounds,
         player_stats=player_stats,
-        fairness_score=fairness_score,
+        fairness_score=fairness_score(matrix),
+        fairness_metrics=compute_metrics(matrix),
         avg_matches_per_player=avg_matches,
         avg_waiting_time=avg_waiting
     )
@@ -1,14 +1,15 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from ..cache import conditional_response, make_etag
 from ..database import get_db
 from ..dependencies import get_current_club_admin
-from ..models import (Attendance, AttendanceStatus, CourtAssignment, Player,
-                      Round)
+from ..models import (Attendance, AttendanceStatus, Club, CourtAssignment,
+                      Player, Round)
 from ..models import Session as SessionModel
 from ..models import SessionHistory
 
@@ -31,6 +32,7 @@ class SessionStatsResponse(BaseModel):
     avg_matches_per_player: float
     avg_waiting_time: float
     fairness_score: float
+    fairness_metrics: Optional[Dict[str, float]] = None
     match_type_distribution: MatchTypeDistribution
     session_duration_minutes: float  # Time from Start to End Session button clicks
     total_round_duration_minutes: float  # Total time of all rounds
@@ -46,11 +48,29 @@ class GlobalStatsResponse(BaseModel):
 
 @router.get("/global", response_model=GlobalStatsResponse)
 def get_global_statistics(
+    request: Request,
     db: Session = Depends(get_db),
     current_user = Depends(get_current_club_admin)
 ):
     """Get global statistics across all sessions for the current user's club including historical runs."""
-    
+    # Club version counters change whenever a session ends or is deleted
+    version_query = db.query(func.coalesce(func.sum(Club.version), 0), func.count(Club.id), func.max(Club.updated_at))
+    if current_user.club_id is not None:
+        version_query = version_query.filter(Club.id == current_user.club_id)
+    version, club_count, last_modified = version_query.one()
+
+    scope = current_user.club_id if current_user.club_id is not None else "all"
+    return conditional_response(
+        request,
+        f"global-stats:{scope}",
+        make_etag("global-stats", scope, version, club_count),
+        lambda: build_global_statistics(db, current_user).model_dump_json().encode("utf-8"),
+        last_modified=last_modified
+    )
+
+
+def build_global_statistics(db: Session, current_user) -> GlobalStatsResponse:
+    """Aggregate the session history rows visible to the current user."""
     # Build query for session history
     query = db.query(SessionHistory)
     
@@ -83,6 +103,7 @@ def get_global_statistics(
             avg_matches_per_player=history.avg_matches_per_player,
             avg_waiting_time=history.avg_waiting_time,
             fairness_score=history.fairness_score,
+            fairness_metrics=history.fairness_metrics,
             match_type_distribution=MatchTypeDistribution(
                 MM=history.match_type_distribution.get("MM", 0),
                 MF=history.match_type_distribution.get("MF", 0),
@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, List, Optional
 
-from app.auth import get_password_hash
+from app.auth import get_password_hash_pooled
 from app.database import get_db
 from app.dependencies import get_current_super_admin
 from app.models import (Club, ClubSettings, Player, RankingSystemType, Session,
                         SessionHistory, SubscriptionStatus, User, UserRole)
+from app.principals import Principal, get_principal_cache
 from app.schemas import (ClubCreate, ClubResponse, ClubUpdate, UserCreate,
                          UserResponse, UserUpdate)
+from app.slow_queries import get_slow_query_recorder
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy import func
@@ -21,7 +23,7 @@ def get_all_clubs(
     skip: int = 0,
     limit: int = 100,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get all clubs (super admin only)."""
     clubs = db.query(Club).offset(skip).limit(limit).all()
@@ -32,7 +34,7 @@ def get_all_clubs(
 def get_club(
     club_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get a specific club by ID."""
     club = db.query(Club).filter(Club.id == club_id).first()
@@ -48,7 +50,7 @@ def get_club(
 def create_club(
     club: ClubCreate,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Create a new club."""
     # Check if club name already exists
@@ -90,7 +92,7 @@ def update_club(
     club_id: int,
     club_update: ClubUpdate,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Update a club."""
     club = db.query(Club).filter(Club.id == club_id).first()
@@ -140,7 +142,7 @@ def update_club(
 def delete_club(
     club_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Permanently delete a club and all related data."""
     club = db.query(Club).filter(Club.id == club_id).first()
@@ -153,6 +155,7 @@ def delete_club(
     # Hard delete
     db.delete(club)
     db.commit()
+    get_principal_cache().invalidate_club(club_id)
     return None
 
 
@@ -160,7 +163,7 @@ def delete_club(
 def toggle_club_active(
     club_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Toggle club active status (deactivate/reactivate)."""
     club = db.query(Club).filter(Club.id == club_id).first()
@@ -181,7 +184,7 @@ def toggle_club_active(
 def get_club_stats(
     club_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get statistics for a specific club."""
     club = db.query(Club).filter(Club.id == club_id).first()
@@ -227,7 +230,7 @@ def get_club_stats(
 def get_club_admins(
     club_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get all admins for a specific club."""
     club = db.query(Club).filter(Club.id == club_id).first()
@@ -248,7 +251,7 @@ def get_club_admins(
 @router.get("/dashboard")
 def get_super_admin_dashboard(
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get super admin dashboard overview."""
     total_clubs = db.query(func.count(Club.id)).filter(Club.is_active == True).scalar()
@@ -291,7 +294,7 @@ def get_super_admin_dashboard(
 def get_club_admins(
     club_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get all club admins for a specific club."""
     # Verify club exists
@@ -314,7 +317,7 @@ def create_club_admin(
     club_id: int,
     user_data: UserCreate,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Create a new club admin for a specific club."""
     # Verify club exists
@@ -343,7 +346,7 @@ def create_club_admin(
             )
     
     # Force role to be CLUB_ADMIN
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = get_password_hash_pooled(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -369,7 +372,7 @@ def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Update a user's information (super admin can edit club admins)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -378,6 +381,7 @@ def update_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    old_username = user.username
     
     # Super admin can only edit club admins and session managers, not other super admins
     if user.role == UserRole.SUPER_ADMIN:
@@ -415,7 +419,7 @@ def update_user(
         user.is_email_verified = False  # Reset verification when email changes
     
     if user_update.password is not None:
-        user.hashed_password = get_password_hash(user_update.password)
+        user.hashed_password = get_password_hash_pooled(user_update.password)
     
     if user_update.full_name is not None:
         user.full_name = user_update.full_name
@@ -435,6 +439,7 @@ def update_user(
         user.is_active = user_update.is_active
     
     db.commit()
+    get_principal_cache().invalidate(old_username, user.username)
     db.refresh(user)
     return user
 
@@ -443,7 +448,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Delete a user (super admin can delete club admins and session managers)."""
     user = db.query(User).filter(User.id == user_id).first()
@@ -467,8 +472,10 @@ def delete_user(
             detail="Cannot delete yourself"
         )
     
+    username = user.username
     db.delete(user)
     db.commit()
+    get_principal_cache().invalidate(username)
     return None
 
 
@@ -517,7 +524,7 @@ class SuperAdminGlobalStatsResponse(BaseModel):
 def get_super_admin_statistics(
     search: Optional[str] = Query(None, description="Search clubs by name"),
     db: DBSession = Depends(get_db),
-    current_user: User = Depends(get_current_super_admin)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Get global statistics for all clubs (super admin only)."""
     
@@ -606,3 +613,28 @@ def get_super_admin_statistics(
         avg_session_duration_minutes=round(avg_session_duration, 1),
         club_stats=club_stats_list
     )
+
+
+class SlowQueryResponse(BaseModel):
+    at: datetime
+    duration_ms: float
+    route: Optional[str] = None
+    statement: str
+    parameters: Any = None
+    explain: Any = None  # EXPLAIN output for sampled SELECTs, filled in shortly after the query
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryResponse])
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    min_duration_ms: float = Query(0, ge=0),
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    """Most recent slow queries recorded by this process (requires SLOW_QUERY_MS)."""
+    recorder = get_slow_query_recorder()
+    if recorder is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow-query log is disabled (set SLOW_QUERY_MS)"
+        )
+    return recorder.recent(limit, min_duration_ms)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -50,6 +50,13 @@ class UserRole(str, Enum):
     SESSION_MANAGER = "session_manager"
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 # Club Schemas
 class ClubBase(BaseModel):
     name: str
@@ -183,12 +190,27 @@ class PlayerResponse(PlayerBase):
     id: int
     user_id: Optional[int] = None
     is_temp: bool
+    rating: Optional[float] = None
+    rating_matches: int = 0
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class PlayerImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class PlayerImportResponse(BaseModel):
+    total_rows: int
+    created: int
+    duplicates: int
+    dry_run: bool
+    errors: List[PlayerImportRowError]
+
+
 # Session Schemas
 class SessionBase(BaseModel):
     name: str
@@ -219,6 +241,27 @@ class SessionResponse(SessionBase):
         from_attributes = True
 
 
+# Session court attributes
+class SessionCourtBase(BaseModel):
+    court_number: int
+    name: Optional[str] = None
+    show_court: bool = False
+    poor_lighting: bool = False
+    beginners_only: bool = False
+
+
+class SessionCourtResponse(SessionCourtBase):
+    id: int
+    session_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class SessionCourtsUpdate(BaseModel):
+    courts: List[SessionCourtBase]  # Replaces all of the session's court attributes
+
+
 # Attendance Schemas
 class AttendanceCreate(BaseModel):
     player_ids: List[int]
@@ -259,14 +302,30 @@ class CourtAssignmentUpdate(BaseModel):
     locked: Optional[bool] = None
 
 
+class CourtAssignmentBatchItem(CourtAssignmentUpdate):
+    court_number: int
+
+
+class CourtAssignmentBatchUpdate(BaseModel):
+    courts: List[CourtAssignmentBatchItem]
+
+
 class CourtAssignmentResponse(CourtAssignmentBase):
     id: int
     round_id: int
+    team_a_score: Optional[int] = None
+    team_b_score: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class CourtScoreUpdate(BaseModel):
+    """Both scores, or neither to clear the result."""
+    team_a_score: Optional[int] = Field(None, ge=0)
+    team_b_score: Optional[int] = Field(None, ge=0)
+
+
 class RoundCreate(BaseModel):
     session_id: int
     court_assignments: List[CourtAssignmentCreate]
@@ -285,6 +344,21 @@ class RoundResponse(BaseModel):
         from_attributes = True
 
 
+# Dashboard Schemas
+class SessionDashboard(BaseModel):
+    """Everything the session page needs. With ``since_version`` only changed rows are included."""
+    version: int
+    since_version: Optional[int] = None
+    is_delta: bool = False
+    session: SessionResponse
+    players: List[PlayerResponse]
+    rounds: List[RoundResponse]
+    attendance: List[AttendanceResponse]
+    # Complete id lists so delta clients can drop deleted rows
+    round_ids: List[int]
+    attendance_ids: List[int]
+
+
 # Auto-assignment Schemas
 class AutoAssignmentPreferences(BaseModel):
     desired_mm: int = 0
@@ -295,6 +369,11 @@ class AutoAssignmentPreferences(BaseModel):
     avoid_repeat_partners: float = 0.5
     avoid_repeat_opponents: float = 0.3
     balance_skill: float = 0.5
+    court_variety: float = 0.3
+    show_court_weight: float = 1.0
+    beginner_court_weight: float = 1.0
+    poor_lighting_rotation: float = 1.0
+    balance_on_rating: bool = False  # Balance teams on the results-based rating instead of numeric_rank
 
 
 class AutoAssignmentRequest(BaseModel):
@@ -303,6 +382,46 @@ class AutoAssignmentRequest(BaseModel):
     court_assignments: Optional[List[CourtAssignmentCreate]] = None
 
 
+class RoundPreviewVariant(BaseModel):
+    name: str
+    preferences: AutoAssignmentPreferences = AutoAssignmentPreferences()
+
+
+class RoundPreviewRequest(BaseModel):
+    variants: List[RoundPreviewVariant] = Field(..., min_length=1)
+
+
+class RoundPreviewCandidate(BaseModel):
+    name: str
+    court_assignments: List[CourtAssignmentCreate]
+    waiting_player_ids: List[int]
+    match_type_counts: Dict[str, int]
+    round_skill_gap: float  # Average team rank gap of this round's matches
+    fairness_score: float  # Session fairness if this round is played
+    fairness_metrics: Dict[str, float]
+    elapsed_ms: float
+
+
+class RoundPreviewResponse(BaseModel):
+    session_id: int
+    round_index: int
+    candidates: List[RoundPreviewCandidate]
+
+
+class RoundReplanRequest(BaseModel):
+    preferences: AutoAssignmentPreferences = AutoAssignmentPreferences()
+    max_moves: int = Field(8, ge=0)  # slot changes allowed before falling back to a full run
+
+
+class RoundReplanResponse(BaseModel):
+    round_id: int
+    warm_start: bool  # False when the move cap forced a full run
+    moves: int
+    changed_courts: List[CourtAssignmentResponse]
+    removed_courts: List[int]
+    waiting_player_ids: List[int]
+
+
 # Stats Schemas
 class PlayerSessionStats(BaseModel):
     player_id: int
@@ -322,6 +441,7 @@ class SessionStats(BaseModel):
     total_rounds: int
     player_stats: List[PlayerSessionStats]
     fairness_score: float
+    fairness_metrics: dict = {}
     avg_matches_per_player: float
     avg_waiting_time: float
 
@@ -345,6 +465,7 @@ class ClubSettingsBase(BaseModel):
     letter_range_end: Optional[str] = None
     custom_levels: Optional[List[str]] = None
     auto_choose_match_types: bool = False
+    assignment_weights: Optional[Dict[str, float]] = None  # Default weights for auto-assignment
 
 
 class ClubSettingsCreate(ClubSettingsBase):
@@ -359,6 +480,7 @@ class ClubSettingsUpdate(BaseModel):
     letter_range_end: Optional[str] = None
     custom_levels: Optional[List[str]] = None
     auto_choose_match_types: Optional[bool] = None
+    assignment_weights: Optional[Dict[str, float]] = None
 
 
 class ClubSettingsResponse(ClubSettingsBase):
@@ -373,3 +495,22 @@ class ClubSettingsResponse(ClubSettingsBase):
 class AvailableLevelsResponse(BaseModel):
     levels: List[str]
     recent_sessions: List[dict]
+
+
+# Background Job Schemas
+class JobResponse(BaseModel):
+    id: int
+    job_type: str
+    club_id: Optional[int] = None
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,216 @@
+"""
+Opt-in slow-query log with sampled EXPLAIN plans.
+
+With ``SLOW_QUERY_MS`` > 0, cursor-execute hooks on the application engine
+time every statement. Statements over the threshold are recorded with their
+(truncated) bound parameters and the route that issued them. A fraction
+(``SLOW_QUERY_EXPLAIN_SAMPLE_RATE``) of slow SELECTs is re-run under
+``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` on a separate connection
+(``EXPLAIN QUERY PLAN`` on SQLite) in a background thread, inside a
+transaction that is always rolled back, so the request never waits for it.
+
+Records go to a rotating JSON-lines file (``SLOW_QUERY_LOG_FILE``) and to an
+in-memory ring buffer served by ``GET /super-admin/slow-queries``.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional, Tuple
+
+from app.metrics import current_route
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MAX_PARAMETERS = 20
+MAX_PARAMETER_LENGTH = 200
+MAX_PENDING_EXPLAINS = 8
+_START_KEY = "slow_query_start"
+
+
+def _safe_value(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    if len(text) > MAX_PARAMETER_LENGTH:
+        text = text[:MAX_PARAMETER_LENGTH] + "..."
+    return text
+
+
+def summarise_parameters(parameters, executemany: bool):
+    """JSON-safe, truncated copy of a statement's bound parameters."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {"executemany": len(parameters), "first": summarise_parameters(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {str(k): _safe_value(v) for k, v in list(parameters.items())[:MAX_PARAMETERS]}
+    if isinstance(parameters, (list, tuple)):
+        return [_safe_value(v) for v in list(parameters)[:MAX_PARAMETERS]]
+    return _safe_value(parameters)
+
+
+def is_explainable(statement: str) -> bool:
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head in ("SELECT", "WITH")
+
+
+def explain_prefix(dialect_name: str) -> Optional[str]:
+    if dialect_name == "postgresql":
+        return "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) "
+    if dialect_name == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return None
+
+
+class SlowQueryRecorder:
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain_sample_rate: float = 0.0,
+        log_file: Optional[str] = None,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        buffer_size: int = 200
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.records = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._pending_explains = 0
+        self._file_logger = None
+        if log_file:
+            directory = os.path.dirname(log_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._file_logger = logging.getLogger(f"{__name__}.file")
+            self._file_logger.handlers = [handler]
+            self._file_logger.setLevel(logging.INFO)
+            self._file_logger.propagate = False
+
+    def install(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def uninstall(self, engine: Engine) -> None:
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get("slow_query_explain"):
+            return
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_START_KEY)
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        record = {
+            "at": datetime.utcnow().isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "route": current_route(),
+            "statement": statement,
+            "parameters": summarise_parameters(parameters, executemany),
+            "explain": None,
+        }
+        with self._lock:
+            self.records.append(record)
+
+        if (not executemany and is_explainable(statement)
+                and explain_prefix(conn.dialect.name) is not None
+                and random.random() < self.explain_sample_rate
+                and self._reserve_explain()):
+            self._explain_executor.submit(self._explain, conn.engine, statement, parameters, record)
+        else:
+            self._write(record)
+
+    def _reserve_explain(self) -> bool:
+        with self._lock:
+            if self._pending_explains >= MAX_PENDING_EXPLAINS:
+                return False
+            self._pending_explains += 1
+            return True
+
+    def _explain(self, engine: Engine, statement: str, parameters, record: dict) -> None:
+        try:
+            record["explain"] = run_explain(engine, statement, parameters)
+        except Exception as exc:
+            record["explain"] = {"error": str(exc)}
+        finally:
+            with self._lock:
+                self._pending_explains -= 1
+        self._write(record)
+
+    def _write(self, record: dict) -> None:
+        if self._file_logger is not None:
+            self._file_logger.info(json.dumps(record, default=str))
+        logger.warning("Slow query (%.1f ms) in %s", record["duration_ms"], record["route"] or "background")
+
+    def explain_queue_usage(self) -> Tuple[int, int]:
+        """(EXPLAINs pending, capacity)."""
+        return self._pending_explains, MAX_PENDING_EXPLAINS
+
+    def recent(self, limit: int = 50, min_duration_ms: float = 0.0) -> List[dict]:
+        """Most recent slow queries first."""
+        with self._lock:
+            records = list(self.records)
+        records.reverse()
+        return [r for r in records if r["duration_ms"] >= min_duration_ms][:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+
+def run_explain(engine: Engine, statement: str, parameters):
+    """Plan of ``statement`` from a side connection; the transaction is always rolled back."""
+    prefix = explain_prefix(engine.dialect.name)
+    with engine.connect() as conn:
+        conn.info["slow_query_explain"] = True
+        try:
+            rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+        finally:
+            conn.info.pop("slow_query_explain", None)
+            conn.rollback()
+    if engine.dialect.name == "postgresql":
+        plan = rows[0][0]
+        return json.loads(plan) if isinstance(plan, str) else plan
+    return [" | ".join(str(column) for column in row) for row in rows]
+
+
+slow_query_recorder: Optional[SlowQueryRecorder] = None
+
+
+def get_slow_query_recorder() -> Optional[SlowQueryRecorder]:
+    return slow_query_recorder
+
+
+def install_slow_query_log(engine: Engine, settings) -> Optional[SlowQueryRecorder]:
+    """Create the global recorder and hook it into ``engine`` if SLOW_QUERY_MS is set."""
+    global slow_query_recorder
+    if settings.SLOW_QUERY_MS <= 0 or slow_query_recorder is not None:
+        return slow_query_recorder
+    slow_query_recorder = SlowQueryRecorder(
+        threshold_ms=settings.SLOW_QUERY_MS,
+        explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+        log_file=settings.SLOW_QUERY_LOG_FILE or None,
+        max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backup_count=settings.SLOW_QUERY_LOG_BACKUPS,
+        buffer_size=settings.SLOW_QUERY_BUFFER_SIZE
+    )
+    slow_query_recorder.install(engine)
+    return slow_query_recorder
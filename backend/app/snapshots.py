@@ -0,0 +1,108 @@
+"""
+End-of-session statistics snapshot.
+
+Builds the SessionHistory row for one run of a session. This used to run
+inside the end_session request; it is now executed by the background job
+runner (see app/jobs.py) so ending a session returns immediately.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from app.archive import session_rounds
+from app.fairness import (build_assignment_matrix, compute_metrics,
+                          fairness_score, played_rounds)
+from app.models import Attendance, AttendanceStatus, Player
+from app.models import Session as SessionModel
+from app.models import SessionHistory
+from sqlalchemy.orm import Session
+
+
+def create_session_history(
+    db: Session,
+    session: SessionModel,
+    started_at: datetime,
+    ended_at: datetime
+) -> Optional[SessionHistory]:
+    """Compute and add (not commit) the statistics snapshot for a finished session run."""
+    rounds = session_rounds(session)
+    attendance_records = db.query(Attendance).filter(
+        Attendance.session_id == session.id,
+        Attendance.status == AttendanceStatus.PRESENT
+    ).all()
+
+    player_ids = {att.player_id for att in attendance_records}
+    matches_per_player = {}
+    waiting_times = {}
+    match_type_counts = {"MM": 0, "MF": 0, "FF": 0}
+    total_matches = 0
+    total_round_duration = 0
+
+    for round_obj in rounds:
+        if round_obj.started_at is None:
+            continue
+
+        # Count matches
+        for court in round_obj.court_assignments:
+            if (court.team_a_player1_id and court.team_a_player2_id and
+                court.team_b_player1_id and court.team_b_player2_id):
+                total_matches += 1
+                if court.match_type.value in match_type_counts:
+                    match_type_counts[court.match_type.value] += 1
+
+                for player_id in [court.team_a_player1_id, court.team_a_player2_id,
+                                 court.team_b_player1_id, court.team_b_player2_id]:
+                    matches_per_player[player_id] = matches_per_player.get(player_id, 0) + 1
+
+        # Calculate round duration and waiting time
+        if round_obj.started_at and round_obj.ended_at:
+            round_duration = (round_obj.ended_at - round_obj.started_at).total_seconds() / 60
+            total_round_duration += round_duration
+
+            playing_players = set()
+            for court in round_obj.court_assignments:
+                if court.team_a_player1_id:
+                    playing_players.add(court.team_a_player1_id)
+                if court.team_a_player2_id:
+                    playing_players.add(court.team_a_player2_id)
+                if court.team_b_player1_id:
+                    playing_players.add(court.team_b_player1_id)
+                if court.team_b_player2_id:
+                    playing_players.add(court.team_b_player2_id)
+
+            waiting_players = player_ids - playing_players
+            for player_id in waiting_players:
+                waiting_times[player_id] = waiting_times.get(player_id, 0) + round_duration
+
+    avg_matches = sum(matches_per_player.values()) / len(player_ids) if player_ids else 0
+    avg_waiting = sum(waiting_times.values()) / len(player_ids) if player_ids else 0
+
+    # Fairness metrics over the rounds that were actually played
+    players = db.query(Player).filter(Player.id.in_(player_ids)).all() if player_ids else []
+    matrix = build_assignment_matrix(
+        played_rounds(rounds),
+        {p.id: p.numeric_rank or 5.0 for p in players},
+        session.number_of_courts,
+        {att.player_id: att.check_in_time for att in attendance_records}
+    )
+
+    session_duration = (ended_at - started_at).total_seconds() / 60
+
+    history = SessionHistory(
+        session_id=session.id,
+        session_name=session.name,
+        started_at=started_at,
+        ended_at=ended_at,
+        total_rounds=len(rounds),
+        total_players=len(player_ids),
+        total_matches=total_matches,
+        avg_matches_per_player=round(avg_matches, 2),
+        avg_waiting_time=round(avg_waiting, 1),
+        fairness_score=round(fairness_score(matrix) / 10, 2),  # History keeps the 0-10 scale
+        fairness_metrics=compute_metrics(matrix),
+        session_duration_minutes=round(session_duration, 1),
+        total_round_duration_minutes=round(total_round_duration, 1),
+        match_type_distribution=match_type_counts
+    )
+    db.add(history)
+    return history
@@ -0,0 +1,574 @@
+"""
+Request tracing: nested timing spans across the router, dependencies,
+algorithm phases and SQL.
+
+With ``TRACING_ENABLED`` the TracingMiddleware opens a root span per
+(sampled) request and ``instrument_routes`` wraps every route handler in a
+span. Dependencies decorated with ``@traced`` (``get_current_user``,
+``get_db``), auto-assignment phases (the laps of app/profiling.py), each
+SQL statement and every session flush/commit become child spans of whatever
+span is current, so one trace of ``auto_assign_round`` shows stats loading,
+``auto_assign_courts`` and its phases, and the flush/commit underneath.
+
+The current span lives in a context variable. FastAPI's threadpool copies
+it into sync handlers; work handed to other executors should go through
+``submit``, which copies the context into thread pools and passes a small
+picklable carrier to process pools, where the worker continues the trace
+with its own exporter.
+
+Finished spans go to a pluggable exporter (``TRACING_EXPORTER``): ``jsonl``
+appends one JSON object per span to ``TRACING_FILE`` for offline analysis
+with ``trace_report.py``; ``memory`` keeps them in a list (tests); anything
+else is a ``package.module:factory`` called with the settings. Code outside
+a trace (job workers, scripts) pays one context variable read per hook.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from importlib import import_module
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MAX_STATEMENT_LENGTH = 500
+PHASE_NESTING_TOLERANCE_US = 100
+TRACE_ID_HEADER = "X-Trace-Id"
+
+
+class Span:
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "start", "duration_us",
+        "attributes", "status", "_parent", "_t0"
+    )
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent: Optional["Span"] = None,
+                 parent_id: Optional[str] = None, attributes: Optional[dict] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time()
+        self.duration_us: Optional[float] = None
+        self.attributes = attributes or {}
+        self.status = "ok"
+        self._parent = parent
+        self._t0 = time.perf_counter()
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def as_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start,
+            "duration_us": round(self.duration_us or 0.0, 1),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Receives every finished span. Implementations must be thread-safe."""
+
+    def export(self, span: dict) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonLinesExporter(SpanExporter):
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span: dict) -> None:
+        line = json.dumps(span, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class InMemoryExporter(SpanExporter):
+    def __init__(self):
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: dict) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+def load_exporter(spec: str, settings) -> SpanExporter:
+    if spec == "jsonl":
+        return JsonLinesExporter(settings.TRACING_FILE)
+    if spec == "memory":
+        return InMemoryExporter()
+    module_name, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"TRACING_EXPORTER must be 'jsonl', 'memory' or 'package.module:factory', got {spec!r}")
+    return getattr(import_module(module_name), attr)(settings)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def is_recording() -> bool:
+    return _current_span.get() is not None
+
+
+class Tracer:
+    def __init__(self):
+        self.exporter: Optional[SpanExporter] = None
+        self.sample_rate = 1.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: Optional[SpanExporter], sample_rate: float = 1.0) -> None:
+        if self.exporter is not None and self.exporter is not exporter:
+            self.exporter.shutdown()
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_span(self, name: str, kind: str = "internal", root: bool = False,
+                   attributes: Optional[dict] = None) -> Optional[Span]:
+        """Start a child of the current span and make it current.
+
+        Without a current span nothing is recorded unless ``root`` is set, in
+        which case a new trace is started (subject to sampling).
+        """
+        if self.exporter is None:
+            return None
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, kind, parent.trace_id, parent=parent, attributes=attributes)
+        elif root and random.random() < self.sample_rate:
+            span = Span(name, kind, os.urandom(16).hex(), attributes=attributes)
+        else:
+            return None
+        _current_span.set(span)
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        if span.duration_us is not None:
+            return
+        span.duration_us = (time.perf_counter() - span._t0) * 1e6
+        if error is not None:
+            span.status = "error"
+            span.attributes["error"] = f"{type(error).__name__}: {error}"
+        # Restore the parent even if spans are ended out of order (e.g. a
+        # flush span abandoned by an exception and closed on rollback)
+        if _current_span.get() is span:
+            _current_span.set(span._parent)
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.export(span.as_dict())
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", root: bool = False, **attributes) -> Iterator[Optional[Span]]:
+        span = self.start_span(name, kind, root, attributes)
+        if span is None:
+            yield None
+            return
+        try:
+            yield span
+        except BaseException as exc:
+            self.end_span(span, exc)
+            raise
+        self.end_span(span)
+
+    def record_span(self, name: str, kind: str, started_perf: float, ended_perf: float, **attributes) -> None:
+        """Export an already finished child of the current span from perf_counter timestamps.
+
+        The start is clipped to the parent's, so a lap that began before the
+        current span (e.g. in the router) does not stick out of it.
+        """
+        parent = _current_span.get()
+        if parent is None or self.exporter is None:
+            return
+        started_perf = max(started_perf, parent._t0)
+        span = Span(name, kind, parent.trace_id, parent=parent, attributes=attributes)
+        span.start = time.time() - (time.perf_counter() - started_perf)
+        span.duration_us = (ended_perf - started_perf) * 1e6
+        self.exporter.export(span.as_dict())
+
+
+tracer = Tracer()
+trace_span = tracer.span
+
+
+def configure_tracing(settings) -> None:
+    """Set up the global tracer from TRACING_* settings (no-op if tracing is disabled)."""
+    if settings.TRACING_ENABLED and not tracer.enabled:
+        tracer.configure(load_exporter(settings.TRACING_EXPORTER, settings), settings.TRACING_SAMPLE_RATE)
+
+
+def traced(name: Optional[str] = None, kind: str = "internal"):
+    """Decorator recording a span around each call of a sync or async function.
+
+    Signatures are preserved (``functools.wraps``), so FastAPI dependencies
+    and handlers keep working when decorated.
+    """
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        if inspect.isgeneratorfunction(fn):
+            # Generator dependencies (get_db): the span covers the setup up to the yield
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                generator = fn(*args, **kwargs)
+                with tracer.span(span_name, kind):
+                    value = next(generator)
+                try:
+                    yield value
+                except BaseException as exc:
+                    try:
+                        generator.throw(exc)
+                    except StopIteration:
+                        return
+                    raise
+                else:
+                    next(generator, None)
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await fn(*args, **kwargs)
+                with tracer.span(span_name, kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def instrument_routes(app) -> None:
+    """Wrap every route handler of ``app`` in a "handler" span. Call after the routers are included."""
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        if dependant is None or dependant.call is None or getattr(dependant.call, "_traced", False):
+            continue
+        dependant.call = traced(route.name, "handler")(dependant.call)
+        dependant.call._traced = True
+
+
+# --- Propagation into executors ---------------------------------------------
+
+def carrier() -> Optional[Dict[str, str]]:
+    """Picklable reference to the current span, for continuing the trace in another process."""
+    span = _current_span.get()
+    if span is None:
+        return None
+    return {"trace_id": span.trace_id, "span_id": span.span_id}
+
+
+@contextmanager
+def continue_trace(trace_carrier: Optional[Dict[str, str]], name: str, kind: str = "internal") -> Iterator[Optional[Span]]:
+    """Open ``name`` as a child of the span described by ``trace_carrier`` (from ``carrier()``)."""
+    if trace_carrier is None or tracer.exporter is None:
+        yield None
+        return
+    span = Span(name, kind, trace_carrier["trace_id"], parent_id=trace_carrier["span_id"])
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        tracer.end_span(span, exc)
+        raise
+    finally:
+        if span.duration_us is None:
+            tracer.end_span(span)
+        _current_span.reset(token)
+
+
+def _run_in_process(trace_carrier, name, fn, args, kwargs):
+    if trace_carrier is not None and not tracer.enabled:
+        from app.config import settings
+        configure_tracing(settings)
+    with continue_trace(trace_carrier, name, "offload"):
+        return fn(*args, **kwargs)
+
+
+def _run_in_thread(name, fn, args, kwargs):
+    with tracer.span(name, "offload"):
+        return fn(*args, **kwargs)
+
+
+def submit(executor: Executor, fn, *args, **kwargs) -> Future:
+    """``executor.submit`` that carries the current trace into the worker thread or process."""
+    name = getattr(fn, "__name__", "offload")
+    if isinstance(executor, ProcessPoolExecutor):
+        return executor.submit(_run_in_process, carrier(), name, fn, args, kwargs)
+    if _current_span.get() is None:
+        return executor.submit(fn, *args, **kwargs)
+    context = contextvars.copy_context()
+    return executor.submit(context.run, _run_in_thread, name, fn, args, kwargs)
+
+
+# --- SQL and ORM session hooks ----------------------------------------------
+
+def _statement_verb(statement: str) -> str:
+    parts = statement.lstrip().split(None, 1)
+    return parts[0].upper() if parts else "SQL"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is None:
+        return
+    span = tracer.start_span(_statement_verb(statement), "sql", attributes={
+        "db.system": conn.dialect.name,
+        "db.statement": statement[:MAX_STATEMENT_LENGTH],
+    })
+    if span is not None:
+        if executemany:
+            span.attributes["db.executemany"] = len(parameters)
+        conn.info.setdefault("trace_spans", []).append(span)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        span = spans.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.attributes["db.rowcount"] = cursor.rowcount
+        tracer.end_span(span)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans:
+        tracer.end_span(spans.pop(), exception_context.original_exception)
+
+
+def _open_session_span(session, key: str, name: str) -> None:
+    if _current_span.get() is None:
+        return
+    span = tracer.start_span(name, "db")
+    if span is not None:
+        session.info[key] = span
+
+
+def _close_session_span(session, key: str, error: Optional[BaseException] = None) -> None:
+    span = session.info.pop(key, None)
+    if span is not None:
+        tracer.end_span(span, error)
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session, flush_context, instances):
+    _open_session_span(session, "trace_flush_span", "flush")
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _after_flush_postexec(session, flush_context):
+    _close_session_span(session, "trace_flush_span")
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    _open_session_span(session, "trace_commit_span", "commit")
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    _close_session_span(session, "trace_commit_span")
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    rolled_back = RuntimeError("rolled back")
+    _close_session_span(session, "trace_flush_span", rolled_back)
+    _close_session_span(session, "trace_commit_span", rolled_back)
+
+
+# --- ASGI middleware --------------------------------------------------------
+
+class TracingMiddleware:
+    """Root span per sampled HTTP request, named "METHOD /route/template" once routing is done."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        # Imported here so app.database (and every CLI script) does not pull in starlette
+        from app.metrics import route_template
+        from starlette.datastructures import MutableHeaders
+
+        token = _current_span.set(None)
+        span = tracer.start_span(f"{scope['method']} {scope['path']}", "server", root=True)
+        if span is None:
+            _current_span.reset(token)
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_trace_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+                MutableHeaders(scope=message).append(TRACE_ID_HEADER, span.trace_id)
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            template = route_template(scope)
+            span.name = f"{scope['method']} {template}"
+            span.attributes["http.target"] = scope["path"]
+            tracer.end_span(span, error)
+            _current_span.reset(token)
+
+
+# --- Offline analysis (trace_report.py) -------------------------------------
+
+def load_spans(path: str) -> List[dict]:
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def span_label(span: dict) -> str:
+    return f"{span['kind']}:{span['name']}"
+
+
+def _nest_phases(siblings: List[dict]) -> List[dict]:
+    """Move spans that ran inside a sibling "phase" span under it.
+
+    Phase spans are recorded after the fact from profiling laps, so the SQL
+    and other spans of that phase were exported as its siblings.
+    """
+    phases = [s for s in siblings if s["kind"] == "phase"]
+    if not phases:
+        return siblings
+    tolerance = PHASE_NESTING_TOLERANCE_US / 1e6
+    remaining = []
+    for span in siblings:
+        end = span["start"] + span["duration_us"] / 1e6
+        container = None
+        if span["kind"] != "phase":
+            for phase in phases:
+                phase_end = phase["start"] + phase["duration_us"] / 1e6
+                if phase["start"] - tolerance <= span["start"] and end <= phase_end + tolerance:
+                    container = phase
+                    break
+        if container is None:
+            remaining.append(span)
+        else:
+            container.setdefault("_nested", []).append(span)
+    return remaining
+
+
+def flame_summary(spans: List[dict]) -> List[dict]:
+    """Aggregate spans by call path (root label > ... > span label).
+
+    Returns rows in depth-first order, siblings by descending total time,
+    each with ``path``, ``count``, ``total_us`` and ``self_us`` (time not
+    covered by child spans; children running in parallel can push it to 0).
+    """
+    spans = [dict(span) for span in spans]
+    by_id = {span["span_id"]: span for span in spans}
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        parent_id = span.get("parent_id")
+        if parent_id in by_id:
+            children[parent_id].append(span)
+        else:
+            roots.append(span)
+    for parent_id, siblings in list(children.items()):
+        children[parent_id] = _nest_phases(siblings)
+    for span in spans:
+        if "_nested" in span:
+            children[span["span_id"]].extend(span.pop("_nested"))
+
+    totals: Dict[tuple, dict] = {}
+
+    def visit(span: dict, prefix: tuple) -> None:
+        path = prefix + (span_label(span),)
+        row = totals.setdefault(path, {"path": path, "count": 0, "total_us": 0.0, "self_us": 0.0})
+        kids = children.get(span["span_id"], [])
+        row["count"] += 1
+        row["total_us"] += span["duration_us"]
+        row["self_us"] += max(0.0, span["duration_us"] - sum(k["duration_us"] for k in kids))
+        for kid in kids:
+            visit(kid, path)
+
+    for root in roots:
+        visit(root, ())
+
+    tree = defaultdict(list)
+    for path, row in totals.items():
+        tree[path[:-1]].append(row)
+
+    ordered = []
+
+    def walk(prefix: tuple) -> None:
+        for row in sorted(tree.get(prefix, []), key=lambda r: -r["total_us"]):
+            ordered.append(row)
+            walk(row["path"])
+
+    walk(())
+    return ordered
+
+
+def folded_stacks(rows: List[dict]) -> List[str]:
+    """``flame_summary`` rows as folded stacks ("a;b;c <self µs>") for flamegraph.pl or speedscope."""
+    return [f"{';'.join(row['path'])} {int(row['self_us'])}" for row in rows if row["self_us"] >= 1]
@@ -0,0 +1,349 @@
+"""
+Offline tuning of the assignment weights.
+
+A club's sessions (replayed from history) or simulated sessions are
+replayed round by round through ``auto_assign_courts`` under many
+candidate weightings of ``AssignmentPreferences``. Each candidate is
+scored on the fairness metrics of the rounds it produced (app/fairness.py)
+and on the algorithm's latency per round, and the non-dominated
+candidates form the fairness/latency Pareto front. The headline
+``fairness_score`` only looks at play time, which the weights hardly move
+once everyone rotates, so the front uses ``objective``: the mean of
+``OBJECTIVE_TERMS``, which also rewards new partners, varied opponents
+and close matches. The chosen weights are
+stored per club in ``ClubSettings.assignment_weights`` and used for every
+preference a request does not set itself. See tune_weights.py.
+
+Only the weights are searched. The algorithm's fixed multipliers (waiting
+x100, equal matches x10, partners x10, opponents x5, court penalties x3)
+only ever scale a weight, so a log-scale range of two decades around each
+default covers them as well.
+
+A replay keeps its own running per-player statistics, following
+``session_player_stats`` in the sessions router, so a round costs one
+algorithm call instead of a rescan of the session. Players join at their
+arrival round and stay to the end, which is what the check-in based
+fairness metrics assume.
+"""
+
+import itertools
+import math
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.algorithm import (AssignmentPreferences, PlayerStats,
+                           auto_assign_courts)
+from app.archive import session_rounds
+from app.court_allocation import CourtInfo
+from app.fairness import (build_assignment_matrix, compute_metrics,
+                          fairness_score)
+from app.models import (Attendance, AttendanceStatus, ClubSettings, Gender,
+                        Player)
+from app.models import Session as SessionModel
+from app.models import SessionStatus
+from app.preview import CourtView, RoundView
+from sqlalchemy.orm import Session
+
+# Searched weights and their (low, high) range
+TUNABLE_WEIGHTS: Dict[str, Tuple[float, float]] = {
+    "prioritize_waiting": (0.1, 10.0),
+    "prioritize_equal_matches": (0.1, 10.0),
+    "avoid_repeat_partners": (0.05, 5.0),
+    "avoid_repeat_opponents": (0.03, 3.0),
+    "balance_skill": (0.05, 5.0),
+    "court_variety": (0.03, 3.0),
+}
+
+# Weights a club may store (the match-type targets are per round, not defaults)
+WEIGHT_FIELDS = [f.name for f in fields(AssignmentPreferences) if not f.name.startswith("desired_")]
+
+# Fairness metric -> 0-1 term (1 = best) of the tuning objective
+OBJECTIVE_TERMS: Dict[str, Callable[[float], float]] = {
+    "gini_play_time": lambda value: 1.0 - value,
+    "partner_repeat_rate": lambda value: 1.0 - value,
+    "opponent_diversity": lambda value: value,
+    "avg_skill_gap": lambda value: 1.0 / (1.0 + value),
+}
+
+ROUND_MINUTES = 15
+SESSION_START = datetime(2000, 1, 1, 19, 0)
+
+
+@dataclass
+class ScenarioPlayer:
+    player_id: int
+    gender: Gender
+    numeric_rank: float
+    arrives: int = 0  # first round the player can be assigned
+
+
+@dataclass
+class Scenario:
+    """A session to replay: who comes when, on how many courts, for how many rounds."""
+    name: str
+    players: List[ScenarioPlayer]
+    number_of_courts: int
+    num_rounds: int
+    courts: Dict[int, CourtInfo] = field(default_factory=dict)
+
+
+@dataclass
+class TrialResult:
+    weights: Dict[str, float]
+    objective: float  # 0-100 over the mean metrics, higher is better
+    fairness_score: float  # mean headline play-time score over the scenarios
+    latency_ms: float  # median algorithm time per round
+    metrics: Dict[str, float]  # mean fairness metrics over the scenarios
+
+
+def default_weights() -> Dict[str, float]:
+    defaults = AssignmentPreferences()
+    return {name: getattr(defaults, name) for name in TUNABLE_WEIGHTS}
+
+
+def objective(metrics: Dict[str, float]) -> float:
+    return round(100.0 * statistics.fmean(term(metrics[name]) for name, term in OBJECTIVE_TERMS.items()), 4)
+
+
+def preferences_with(weights: Dict[str, float]) -> AssignmentPreferences:
+    return AssignmentPreferences(**{k: v for k, v in weights.items() if k in WEIGHT_FIELDS})
+
+
+def random_scenario(rng: random.Random, name: str, num_players: int = 20, number_of_courts: int = 4,
+                    num_rounds: int = 10, female_share: float = 0.4, late_share: float = 0.2) -> Scenario:
+    """A club night with a mixed field; ``late_share`` of the players arrive during the first half."""
+    players = []
+    for player_id in range(1, num_players + 1):
+        late = rng.random() < late_share
+        players.append(ScenarioPlayer(
+            player_id=player_id,
+            gender=Gender.FEMALE if rng.random() < female_share else Gender.MALE,
+            numeric_rank=round(rng.uniform(1.0, 9.0) * 2) / 2,
+            arrives=rng.randint(1, max(num_rounds // 2, 1)) if late else 0,
+        ))
+    return Scenario(name, players, number_of_courts, num_rounds)
+
+
+class _RunningStats:
+    """Per-player session history, updated once per round."""
+
+    def __init__(self, player: ScenarioPlayer):
+        self.player = player
+        self.matches_played = 0
+        self.last_played_round = -1
+        self.courts_played = set()
+        self.recent = []  # (round index, partners, opponents)
+
+    def stats(self, current_round: int) -> PlayerStats:
+        partners, opponents = set(), set()
+        for round_index, round_partners, round_opponents in self.recent:
+            if current_round - round_index <= 2:
+                partners |= round_partners
+                opponents |= round_opponents
+        return PlayerStats(
+            player_id=self.player.player_id,
+            name=str(self.player.player_id),
+            gender=self.player.gender,
+            numeric_rank=self.player.numeric_rank,
+            matches_played=self.matches_played,
+            rounds_sitting_out=current_round - self.matches_played,
+            last_played_round=self.last_played_round,
+            recent_partners=partners,
+            recent_opponents=opponents,
+            courts_played=set(self.courts_played),
+        )
+
+    def played(self, round_index: int, court_number: int, partners: set, opponents: set):
+        self.matches_played += 1
+        self.last_played_round = round_index
+        self.courts_played.add(court_number)
+        self.recent = [entry for entry in self.recent if round_index - entry[0] < 2]
+        self.recent.append((round_index, partners, opponents))
+
+
+def simulate(scenario: Scenario, preferences: AssignmentPreferences) -> Tuple[List[RoundView], List[float]]:
+    """Assign every round of the scenario; returns the rounds and the algorithm's time per round (ms)."""
+    running = {p.player_id: _RunningStats(p) for p in scenario.players}
+    rounds, timings = [], []
+    for round_index in range(scenario.num_rounds):
+        present = [r.stats(round_index) for r in running.values() if r.player.arrives <= round_index]
+        if len(present) < 4:
+            rounds.append(RoundView(SESSION_START + timedelta(minutes=ROUND_MINUTES * round_index), []))
+            continue
+        started = time.perf_counter()
+        assignments, _ = auto_assign_courts(
+            present, scenario.number_of_courts, round_index, preferences, None, scenario.courts
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+
+        for a in assignments:
+            for team, other in ((a.team_a, a.team_b), (a.team_b, a.team_a)):
+                for pid in team:
+                    running[pid].played(round_index, a.court_number, {p for p in team if p != pid}, set(other))
+        rounds.append(RoundView(SESSION_START + timedelta(minutes=ROUND_MINUTES * round_index), [
+            CourtView(a.team_a[0], a.team_a[1], a.team_b[0], a.team_b[1]) for a in assignments
+        ]))
+    return rounds, timings
+
+
+def evaluate_weights(scenarios: Sequence[Scenario], weights: Dict[str, float]) -> TrialResult:
+    preferences = preferences_with(weights)
+    scores, timings, metrics = [], [], []
+    for scenario in scenarios:
+        rounds, round_timings = simulate(scenario, preferences)
+        # Arrival one minute before the round the player joins
+        check_in_times = {
+            p.player_id: SESSION_START + timedelta(minutes=ROUND_MINUTES * p.arrives - 1) for p in scenario.players
+        }
+        matrix = build_assignment_matrix(
+            rounds, {p.player_id: p.numeric_rank for p in scenario.players}, scenario.number_of_courts, check_in_times
+        )
+        scores.append(fairness_score(matrix))
+        metrics.append(compute_metrics(matrix))
+        timings.extend(round_timings)
+    mean_metrics = {name: round(statistics.fmean(m[name] for m in metrics), 4) for name in metrics[0]} if metrics else {}
+    return TrialResult(
+        weights=dict(weights),
+        objective=objective(mean_metrics) if mean_metrics else 0.0,
+        fairness_score=round(statistics.fmean(scores), 4) if scores else 0.0,
+        latency_ms=round(statistics.median(timings), 4) if timings else 0.0,
+        metrics=mean_metrics,
+    )
+
+
+def grid_candidates(steps: int) -> List[Dict[str, float]]:
+    """``steps`` log-spaced values per weight, every combination (steps ** 6 candidates)."""
+    axes = []
+    for low, high in TUNABLE_WEIGHTS.values():
+        if steps == 1:
+            axes.append([math.sqrt(low * high)])
+        else:
+            ratio = (high / low) ** (1.0 / (steps - 1))
+            axes.append([round(low * ratio ** i, 4) for i in range(steps)])
+    return [dict(zip(TUNABLE_WEIGHTS, values)) for values in itertools.product(*axes)]
+
+
+def random_candidates(count: int, rng: random.Random) -> List[Dict[str, float]]:
+    """``count`` log-uniform samples of the weights."""
+    return [
+        {name: round(math.exp(rng.uniform(math.log(low), math.log(high))), 4)
+         for name, (low, high) in TUNABLE_WEIGHTS.items()}
+        for _ in range(count)
+    ]
+
+
+_worker_scenarios: List[Scenario] = []
+
+
+def _init_worker(scenarios: List[Scenario]):
+    global _worker_scenarios
+    _worker_scenarios = scenarios
+
+
+def _evaluate_in_worker(weights: Dict[str, float]) -> TrialResult:
+    return evaluate_weights(_worker_scenarios, weights)
+
+
+def run_trials(scenarios: List[Scenario], candidates: Iterable[Dict[str, float]],
+               workers: int = 0) -> List[TrialResult]:
+    """Evaluate every candidate, in order; ``workers = 0`` runs them in this process.
+
+    The scenarios are sent to each worker once, at start-up.
+    """
+    candidates = list(candidates)
+    if workers <= 0:
+        return [evaluate_weights(scenarios, weights) for weights in candidates]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scenarios,)) as executor:
+        chunksize = max(1, len(candidates) // (workers * 4))
+        return list(executor.map(_evaluate_in_worker, candidates, chunksize=chunksize))
+
+
+def pareto_front(results: Sequence[TrialResult]) -> List[TrialResult]:
+    """Results no other result beats on both objective (higher) and latency (lower), fastest first."""
+    front = []
+    best = -math.inf
+    for result in sorted(results, key=lambda r: (r.latency_ms, -r.objective)):
+        if result.objective > best:
+            front.append(result)
+            best = result.objective
+    return front
+
+
+def load_club_scenarios(db: Session, club_id: int, limit: int = 20) -> List[Scenario]:
+    """The club's most recent ended sessions (archived ones included) as scenarios.
+
+    Present players join at the first round created after their check-in
+    (or the first round they played, if earlier).
+    """
+    sessions = db.query(SessionModel).filter(
+        SessionModel.club_id == club_id,
+        SessionModel.status == SessionStatus.ENDED
+    ).order_by(SessionModel.id.desc()).limit(limit).all()
+
+    scenarios = []
+    for session in reversed(sessions):
+        rounds = sorted(session_rounds(session), key=lambda r: r.round_index)
+        attendees = db.query(Player, Attendance.check_in_time).join(
+            Attendance, Attendance.player_id == Player.id
+        ).filter(
+            Attendance.session_id == session.id,
+            Attendance.status == AttendanceStatus.PRESENT
+        ).all()
+        if not rounds or len(attendees) < 4:
+            continue
+
+        first_played = {}
+        for i, round_obj in enumerate(rounds):
+            for court in round_obj.court_assignments:
+                for pid in (court.team_a_player1_id, court.team_a_player2_id,
+                            court.team_b_player1_id, court.team_b_player2_id):
+                    if pid is not None:
+                        first_played.setdefault(pid, i)
+
+        players = []
+        for player, check_in in attendees:
+            arrives = next(
+                (i for i, r in enumerate(rounds) if check_in is None or r.created_at is None or r.created_at >= check_in),
+                len(rounds)
+            )
+            players.append(ScenarioPlayer(
+                player_id=player.id,
+                gender=player.gender,
+                numeric_rank=player.numeric_rank or 5.0,
+                arrives=min(arrives, first_played.get(player.id, arrives)),
+            ))
+        courts = {
+            court.court_number: CourtInfo(
+                court_number=court.court_number,
+                name=court.name,
+                show_court=court.show_court,
+                poor_lighting=court.poor_lighting,
+                beginners_only=court.beginners_only
+            )
+            for court in session.courts
+        }
+        scenarios.append(Scenario(session.name, players, session.number_of_courts, len(rounds), courts))
+    return scenarios
+
+
+def club_assignment_weights(db: Session, club_id: Optional[int]) -> Dict[str, float]:
+    """The club's saved default weights ({} if none)."""
+    if club_id is None:
+        return {}
+    weights = db.query(ClubSettings.assignment_weights).filter(ClubSettings.club_id == club_id).scalar()
+    return dict(weights or {})
+
+
+def save_club_weights(db: Session, club_id: int, weights: Dict[str, float]) -> ClubSettings:
+    """Store ``weights`` as the club's defaults. The caller commits."""
+    settings = db.query(ClubSettings).filter(ClubSettings.club_id == club_id).first()
+    if settings is None:
+        settings = ClubSettings(club_id=club_id)
+        db.add(settings)
+    settings.assignment_weights = {k: float(v) for k, v in weights.items() if k in WEIGHT_FIELDS}
+    return settings
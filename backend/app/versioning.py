@@ -0,0 +1,118 @@
+"""
+Version counters for sessions and clubs.
+
+Every write that changes what a session's read endpoints return bumps
+``Session.version``; writes that change a club's statistics bump
+``Club.version``. The counters are incremented in SQL inside the caller's
+transaction so concurrent writers never lose an increment.
+
+A session is bumped at most once per transaction, and rounds, court
+assignments and attendance rows written in that transaction are stamped
+with the new value. Clients can then ask for only the rows changed since
+the version they last saw (see the session dashboard endpoint).
+
+Bulk ``query(...).delete()`` / ``.update()`` statements bypass the flush
+hook. Bulk deletes are fine (deleted rows show up as ids missing from the
+dashboard's id lists, and the caller bumps the session), but a bulk update
+of a field clients display must set ``version`` itself.
+
+Player edits change names, genders and ranks shown by session rounds and
+statistics without touching session rows, so ``bump_player_versions`` bumps
+every session the player appears in (and the club).
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from app.models import Attendance, Club, CourtAssignment, Player, Round
+from app.models import Session as SessionModel
+from app.models import SessionArchive
+from sqlalchemy import event, or_, select, union, update
+from sqlalchemy.orm import Session
+
+_BUMPED_KEY = "bumped_session_versions"
+
+
+def bump_session_version(db: Session, session_id: int) -> int:
+    """Increment a session's version counter (once per transaction) and return the new value."""
+    bumped = db.info.setdefault(_BUMPED_KEY, {})
+    if session_id not in bumped:
+        bumped[session_id] = db.execute(
+            update(SessionModel)
+            .where(SessionModel.id == session_id)
+            .values(version=SessionModel.version + 1, updated_at=datetime.utcnow())
+            .returning(SessionModel.version)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    return bumped[session_id]
+
+
+def bump_club_version(db: Session, club_id: int) -> int:
+    """Increment a club's statistics version counter and return the new value."""
+    return db.execute(
+        update(Club)
+        .where(Club.id == club_id)
+        .values(version=Club.version + 1)
+        .returning(Club.version)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+
+def bump_player_versions(db: Session, player: Player) -> List[int]:
+    """Bump the sessions showing a player and its club after the player changed; returns the session ids.
+
+    Archived sessions of the club are always bumped, their courts are not queryable.
+    """
+    pid = player.id
+    shown_in = union(
+        select(Attendance.session_id).where(Attendance.player_id == pid),
+        select(Round.session_id).join(CourtAssignment, CourtAssignment.round_id == Round.id).where(or_(
+            CourtAssignment.team_a_player1_id == pid, CourtAssignment.team_a_player2_id == pid,
+            CourtAssignment.team_b_player1_id == pid, CourtAssignment.team_b_player2_id == pid,
+        )),
+        select(SessionArchive.session_id).join(SessionModel, SessionArchive.session_id == SessionModel.id).where(
+            SessionModel.club_id == player.club_id
+        ),
+    )
+    session_ids = sorted(db.scalars(select(shown_in.subquery().c.session_id)))
+    for session_id in session_ids:
+        bump_session_version(db, session_id)
+    if player.club_id is not None:
+        bump_club_version(db, player.club_id)
+    return session_ids
+
+
+def _owning_round(db: Session, court: CourtAssignment) -> Optional[Round]:
+    if court.round is not None:
+        return court.round
+    if court.round_id is not None:
+        return db.get(Round, court.round_id)
+    return None
+
+
+@event.listens_for(Session, "before_flush")
+def stamp_row_versions(db: Session, flush_context, instances) -> None:
+    """Stamp changed session rows with the session version of this transaction."""
+    changed = list(db.new) + [obj for obj in db.dirty if db.is_modified(obj)]
+    deleted = list(db.deleted)
+
+    for obj in changed + deleted:
+        is_deleted = obj in deleted
+        if isinstance(obj, (Attendance, Round)):
+            if is_deleted or obj.session_id is None:
+                continue  # Deletions show up as missing ids
+            obj.version = bump_session_version(db, obj.session_id)
+        elif isinstance(obj, CourtAssignment):
+            round_obj = _owning_round(db, obj)
+            if round_obj is None or round_obj in deleted:
+                continue
+            version = bump_session_version(db, round_obj.session_id)
+            round_obj.version = version
+            if not is_deleted:
+                obj.version = version
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def reset_bumped_versions(db: Session) -> None:
+    db.info.pop(_BUMPED_KEY, None)
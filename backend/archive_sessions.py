@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Move the rounds of long-ended sessions into cold storage, or bring them back.
+
+Usage:
+    python archive_sessions.py archive [--older-than-days 90] [--club-id 1] [--limit 500] [--dry-run]
+    python archive_sessions.py unarchive --session-id 42
+
+Archived sessions keep working in the API (rounds, stats, dashboard, player
+profiles and exports decode the archive). Starting an archived session again
+discards its archive like it discards the previous run's rounds.
+"""
+import argparse
+import sys
+
+sys.path.insert(0, '.')
+
+from app.archive import archivable_sessions, archive_session, unarchive_session
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Session as SessionModel
+
+
+def run_archive(db, args):
+    sessions = archivable_sessions(db, args.older_than_days, club_id=args.club_id, limit=args.limit)
+    if not sessions:
+        print(f"✅ No ended sessions older than {args.older_than_days} days left to archive")
+        return
+
+    total_raw = total_stored = rounds = 0
+    for session in sessions:
+        if args.dry_run:
+            print(f"   would archive session {session.id} ({session.name}, ended {session.ended_at:%Y-%m-%d})")
+            continue
+        try:
+            archive = archive_session(db, session)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Session {session.id}: {e}")
+            continue
+        rounds += archive.round_count
+        total_raw += archive.raw_size
+        total_stored += len(archive.payload)
+
+    if args.dry_run:
+        print(f"✅ {len(sessions)} sessions would be archived")
+    else:
+        ratio = total_raw / total_stored if total_stored else 0
+        print(f"✅ Archived {len(sessions)} sessions ({rounds} rounds), "
+              f"{total_stored / 1024:.1f} KiB stored ({ratio:.1f}x compression)")
+
+
+def run_unarchive(db, args):
+    session = db.query(SessionModel).filter(SessionModel.id == args.session_id).first()
+    if not session:
+        print(f"❌ Session {args.session_id} not found")
+        sys.exit(1)
+    try:
+        restored = unarchive_session(db, session)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ Restored {restored} rounds of session {session.id} ({session.name})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive or restore ended sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    archive = commands.add_parser("archive", help="Archive ended sessions")
+    archive.add_argument("--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    archive.add_argument("--club-id", type=int)
+    archive.add_argument("--limit", type=int)
+    archive.add_argument("--dry-run", action="store_true")
+
+    unarchive = commands.add_parser("unarchive", help="Restore an archived session's rounds")
+    unarchive.add_argument("--session-id", type=int, required=True)
+
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        if args.command == "archive":
+            run_archive(db, args)
+        else:
+            run_unarchive(db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark: how long it takes to import the backend and build the app.
+
+Each target runs in a fresh interpreter (so nothing is cached in
+sys.modules) several times and the median is reported:
+
+* ``import app.config`` / ``import app.models`` - what CLI scripts pay,
+* ``import app.main`` - should stay cheap, routers are imported by create_app,
+* ``create_app()`` for all router groups and for each group on its own,
+* ``create_app()`` + first request, i.e. how soon a new container can serve.
+
+One extra ``python -X importtime`` run of the full app lists the modules
+with the largest cumulative import time.
+
+Usage (from backend/):
+    python benchmarks/bench_import.py [--repeat 5] [--top 15] [--max-ms 2500] [--json]
+
+``--max-ms`` fails (exit 1) when the full ``create_app()`` median exceeds
+the budget, so CI can catch import-time regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+TARGETS = [
+    ("import app.config", "import app.config"),
+    ("import app.models", "import app.models"),
+    ("import app.main", "import app.main"),
+    ("create_app()", "from app.main import create_app; create_app()"),
+    ("create_app(auth only)", "from app.main import create_app; create_app([])"),
+    ("create_app(club)", "from app.main import create_app; create_app(['club'])"),
+    ("create_app(portal)", "from app.main import create_app; create_app(['portal'])"),
+    ("create_app(super_admin)", "from app.main import create_app; create_app(['super_admin'])"),
+    ("create_app() + GET /health", (
+        "from app.main import create_app; from fastapi.testclient import TestClient; "
+        "TestClient(create_app()).get('/health')"
+    )),
+]
+
+TIMER = "import time; _t = time.perf_counter()\n{code}\nprint((time.perf_counter() - _t) * 1000)"
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.setdefault("SECRET_KEY", "benchmark")
+    return env
+
+
+def time_target(code: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+        )
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def import_profile(code: str, top: int):
+    """Modules with the largest cumulative import time (µs) from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        if not self_us.isdigit():
+            continue
+        rows.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    # Top-level entries only would hide which app modules are heavy; keep
+    # app.* plus the first level of third-party packages
+    interesting = [r for r in rows if r["module"].startswith("app") or "." not in r["module"]]
+    interesting.sort(key=lambda r: -r["cumulative_us"])
+    return interesting[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list from -X importtime")
+    parser.add_argument("--max-ms", type=float, help="Fail if the full create_app() median exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {label: round(time_target(code, args.repeat), 1) for label, code in TARGETS}
+    profile = import_profile("from app.main import create_app; create_app()", args.top)
+
+    if args.json:
+        print(json.dumps({"targets_ms": results, "modules": profile}, indent=2))
+    else:
+        print(f"Median of {args.repeat} fresh interpreters (interpreter start excluded)\n")
+        for label, ms in results.items():
+            print(f"  {label:<28} {ms:>8.1f} ms")
+        print("\nLargest cumulative imports for create_app():\n")
+        print(f"  {'cumulative ms':>13} {'self ms':>8}  module")
+        for row in profile:
+            print(f"  {row['cumulative_us'] / 1000:>13.1f} {row['self_us'] / 1000:>8.1f}  {row['module']}")
+
+    if args.max_ms is not None and results["create_app()"] > args.max_ms:
+        print(f"\n❌ create_app() took {results['create_app()']:.0f} ms (budget {args.max_ms:.0f} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
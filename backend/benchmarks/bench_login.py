@@ -0,0 +1,114 @@
+"""
+Throughput benchmark for POST /auth/login.
+
+Starts the API with uvicorn against a throwaway SQLite database holding
+``--users`` accounts, then fires ``--requests`` logins at each concurrency
+level and reports requests/second and latency percentiles. Use it to pick
+BCRYPT_ROUNDS and PASSWORD_HASH_WORKERS for the hardware the club runs on.
+
+Usage (from backend/):
+    python benchmarks/bench_login.py [--rounds 12] [--workers 4] [--levels 1,5,10,20,40]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS")
+    parser.add_argument("--workers", type=int, default=4, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=80, help="Logins per concurrency level")
+    parser.add_argument("--levels", default="1,5,10,20,40")
+    parser.add_argument("--port", type=int, default=8799)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Settings are read at import time, so configure the environment first
+    db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_file.name}"
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_QUEUE"] = str(args.requests)
+    os.environ["JOB_WORKERS"] = "0"
+
+    import httpx
+    import uvicorn
+    from app.auth import get_password_hash
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models import Club, User, UserRole
+
+    Base.metadata.create_all(bind=engine, tables=[Club.__table__, User.__table__])
+    db = SessionLocal()
+    club = Club(name="Benchmark club")
+    db.add(club)
+    db.flush()
+    password_hash = get_password_hash("benchmark-password")
+    for i in range(args.users):
+        db.add(User(
+            username=f"member{i}",
+            hashed_password=password_hash,
+            full_name=f"Member {i}",
+            role=UserRole.SESSION_MANAGER,
+            club_id=club.id,
+            is_active=True
+        ))
+    db.commit()
+    db.close()
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    async def run_level(concurrency: int):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = {}
+
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120) as client:
+            async def one(i: int):
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post("/auth/login", json={
+                        "username_or_email": f"member{i % args.users}",
+                        "password": "benchmark-password"
+                    })
+                    latencies.append(time.perf_counter() - start)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+        print(f"{concurrency:>11}{args.requests / elapsed:>10.1f}{statistics.median(latencies) * 1000:>10.0f}"
+              f"{p95 * 1000:>10.0f}   {statuses}")
+
+    print(f"bcrypt rounds={args.rounds}, hash workers={args.workers}, cpus={os.cpu_count()}")
+    print(f"{'concurrency':>11}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}   status codes")
+    try:
+        for level in [int(x) for x in args.levels.split(",")]:
+            asyncio.run(run_level(level))
+    finally:
+        server.should_exit = True
+        os.unlink(db_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Serialization and compression benchmark for the largest JSON responses.
+
+Builds synthetic payloads shaped like GET /sessions/{id}/rounds for a long
+session and GET /statistics/global for a busy club, then compares:
+
+* encode time: the old default (response_model serialisation +
+  json.dumps in JSONResponse) against ORJSONResponse, and Pydantic's
+  dump_json used by the cached endpoints,
+* bytes on the wire: raw, gzip and Brotli (if installed) at the levels
+  configured for CompressionMiddleware.
+
+Usage (from backend/):
+    python benchmarks/bench_serialization.py [--rounds 60] [--courts 8] [--repeat 50]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import orjson
+from app.compression import brotli
+from app.config import settings
+from app.routers.statistics import GlobalStatsResponse
+from app.schemas import RoundResponse
+from pydantic import TypeAdapter
+
+START = datetime(2026, 1, 1, 19, 0)
+
+
+def build_rounds(num_rounds: int, num_courts: int) -> List[RoundResponse]:
+    rounds = []
+    for r in range(num_rounds):
+        courts = []
+        for c in range(num_courts):
+            base = r * 100 + c * 4
+            courts.append({
+                "id": r * num_courts + c + 1,
+                "round_id": r + 1,
+                "court_number": c + 1,
+                "team_a_player1_id": base + 1,
+                "team_a_player2_id": base + 2,
+                "team_b_player1_id": base + 3,
+                "team_b_player2_id": base + 4,
+                "match_type": ["MM", "MF", "FF"][c % 3],
+                "locked": False,
+            })
+        rounds.append(RoundResponse(
+            id=r + 1,
+            session_id=1,
+            round_index=r,
+            started_at=START + timedelta(minutes=15 * r),
+            ended_at=START + timedelta(minutes=15 * r + 14),
+            created_at=START + timedelta(minutes=15 * r - 1),
+            court_assignments=courts,
+        ))
+    return rounds
+
+
+def build_global_stats(num_sessions: int) -> GlobalStatsResponse:
+    session_stats = [{
+        "session_id": i,
+        "session_name": f"Club night {i}",
+        "session_date": (START + timedelta(days=7 * i)).isoformat(),
+        "total_rounds": 12,
+        "total_players": 32,
+        "total_matches": 96,
+        "avg_matches_per_player": 3.0,
+        "avg_waiting_time": 12.5,
+        "fairness_score": 8.7,
+        "fairness_metrics": {
+            "gini_play_time": 0.13,
+            "max_consecutive_sit_outs": 2.0,
+            "partner_repeat_rate": 0.04,
+            "opponent_diversity": 0.91,
+            "avg_skill_gap": 0.8,
+            "max_skill_gap": 2.5,
+            "court_utilisation": 0.97,
+        },
+        "match_type_distribution": {"MM": 30, "MF": 50, "FF": 16},
+        "session_duration_minutes": 180.0,
+        "total_round_duration_minutes": 168.0,
+    } for i in range(num_sessions)]
+    return GlobalStatsResponse(
+        total_sessions=num_sessions,
+        total_players=120,
+        total_matches_played=num_sessions * 96,
+        avg_session_duration_minutes=180.0,
+        session_stats=session_stats,
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def report(name: str, model, adapter, repeat: int) -> None:
+    def old_default():
+        return json.dumps(adapter.dump_python(model, mode="json"), ensure_ascii=False,
+                          allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+    def orjson_response():
+        return orjson.dumps(adapter.dump_python(model, mode="json"),
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    def pydantic_dump_json():
+        return adapter.dump_json(model)
+
+    body = orjson_response()
+    print(f"\n{name}")
+    print(f"  {'encoder':<38}{'ms/op':>10}")
+    for label, fn in [
+        ("JSONResponse / json.dumps (before)", old_default),
+        ("ORJSONResponse (after)", orjson_response),
+        ("TypeAdapter.dump_json (cached GETs)", pydantic_dump_json),
+    ]:
+        print(f"  {label:<38}{timed(fn, repeat):>10.2f}")
+
+    print(f"  {'encoding':<38}{'bytes':>10}{'ms/op':>10}")
+    print(f"  {'identity':<38}{len(body):>10}{0:>10.2f}")
+    gz = gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+    print(f"  {f'gzip (level {settings.GZIP_LEVEL})':<38}{len(gz):>10}"
+          f"{timed(lambda: gzip.compress(body, compresslevel=settings.GZIP_LEVEL), repeat):>10.2f}")
+    if brotli is not None:
+        br = brotli.compress(body, quality=settings.BROTLI_QUALITY)
+        print(f"  {f'br (quality {settings.BROTLI_QUALITY})':<38}{len(br):>10}"
+              f"{timed(lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY), repeat):>10.2f}")
+    else:
+        print("  br: skipped (pip install brotli)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=60)
+    parser.add_argument("--courts", type=int, default=8)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rounds_adapter = TypeAdapter(List[RoundResponse])
+    report(
+        f"GET /sessions/{{id}}/rounds ({args.rounds} rounds x {args.courts} courts)",
+        build_rounds(args.rounds, args.courts),
+        rounds_adapter,
+        args.repeat,
+    )
+    report(
+        f"GET /statistics/global ({args.sessions} session runs)",
+        build_global_stats(args.sessions),
+        TypeAdapter(GlobalStatsResponse),
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+End-to-end load test: simulated club nights against a real server.
+
+Starts the API with uvicorn against a throwaway SQLite database (or
+``--database-url``, e.g. a scratch PostgreSQL database) seeded with
+``--clubs`` clubs, then runs every club's night concurrently with async
+httpx virtual users:
+
+* one session manager per club: start the session, check players in over
+  a few bursts, then for each round auto-assign, swap two players between
+  courts, start the round, poll the dashboard while it runs and end it;
+  finally end the session,
+* ``--viewers`` players per club browsing the portal (/me, /me/stats,
+  /me/sessions) and the session's rounds and stats with random think time,
+* one club admin per club checking /statistics/global now and then.
+
+Time is compressed: a round lasts ``--round-seconds`` (the real 15 minutes).
+At the end it prints throughput, error rate and p50/p95/p99 latency per
+route. ``--json`` writes the same numbers for comparison between releases,
+and ``--max-error-rate`` / ``--max-p95-ms`` make the run fail (exit 1) when
+exceeded, so it can gate a release.
+
+SQLite serialises writers, so use PostgreSQL to size a deployment.
+
+Usage (from backend/):
+    python benchmarks/loadtest.py [--clubs 5] [--players 24] [--courts 4] [--rounds 4]
+                                  [--viewers 8] [--round-seconds 15] [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clubs", type=int, default=5)
+    parser.add_argument("--players", type=int, default=24, help="Players per club")
+    parser.add_argument("--courts", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=4, help="Rounds per club night")
+    parser.add_argument("--viewers", type=int, default=8, help="Portal users per club")
+    parser.add_argument("--round-seconds", type=float, default=15.0, help="Wall-clock length of a 15 minute round")
+    parser.add_argument("--database-url", help="Use this (empty) database instead of a temporary SQLite file")
+    parser.add_argument("--port", type=int, default=8798)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--max-error-rate", type=float, help="Fail if the overall error rate (0-1) is higher")
+    parser.add_argument("--max-p95-ms", type=float, help="Fail if any route's p95 latency is higher")
+    return parser.parse_args()
+
+
+class Recorder:
+    """Latencies and outcomes per route template."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def call(self, client, route: str, method: str, url: str, expect=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception as exc:  # Connection errors and timeouts count as failures
+            self.latencies[route].append(time.perf_counter() - start)
+            self.errors[route][type(exc).__name__] += 1
+            return None
+        self.latencies[route].append(time.perf_counter() - start)
+        if response.status_code not in expect:
+            self.errors[route][str(response.status_code)] += 1
+            return None
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            errors = sum(self.errors[route].values())
+            routes[route] = {
+                "requests": len(ordered),
+                "errors": errors,
+                "error_rate": errors / len(ordered),
+                "error_kinds": dict(self.errors[route]),
+                "p50_ms": percentile(ordered, 0.50) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "p99_ms": percentile(ordered, 0.99) * 1000,
+            }
+        total = sum(r["requests"] for r in routes.values())
+        errors = sum(r["errors"] for r in routes.values())
+        return {
+            "elapsed_seconds": elapsed,
+            "requests": total,
+            "throughput_rps": total / elapsed if elapsed else 0.0,
+            "error_rate": errors / total if total else 0.0,
+            "routes": routes,
+        }
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def seed_database(args) -> List[dict]:
+    """Create clubs, staff, players (some with portal accounts) and one draft session per club."""
+    from app.auth import create_access_token
+    from app.database import Base, SessionLocal, engine
+    from app.models import Club, Gender, Player
+    from app.models import Session as SessionModel
+    from app.models import SessionStatus, User, UserRole
+
+    tables = [t for name, t in Base.metadata.tables.items()
+              if not (engine.dialect.name == "sqlite" and name == "club_settings")]  # ARRAY is PostgreSQL only
+    Base.metadata.create_all(bind=engine, tables=tables)
+
+    rng = random.Random(args.seed)
+    clubs = []
+    db = SessionLocal()
+    try:
+        for c in range(args.clubs):
+            club = Club(name=f"Load test club {c}")
+            db.add(club)
+            db.flush()
+
+            admin = User(username=f"admin{c}", hashed_password="!", full_name=f"Admin {c}",
+                         role=UserRole.CLUB_ADMIN, club_id=club.id, is_active=True)
+            db.add(admin)
+
+            players = []
+            viewers = []
+            for p in range(args.players):
+                user = None
+                if p < args.viewers:
+                    user = User(username=f"club{c}-player{p}", hashed_password="!", full_name=f"Player {c}-{p}",
+                                role=UserRole.SESSION_MANAGER, club_id=club.id, is_active=True)
+                    db.add(user)
+                    db.flush()
+                    viewers.append(user.username)
+                player = Player(club_id=club.id, full_name=f"Player {c}-{p}", user_id=user.id if user else None,
+                                gender=Gender.MALE if p % 2 else Gender.FEMALE,
+                                numeric_rank=float(rng.randint(1, 10)), is_active=True)
+                db.add(player)
+                players.append(player)
+
+            session = SessionModel(club_id=club.id, name=f"Club night {c}", number_of_courts=args.courts,
+                                   match_duration_minutes=15, status=SessionStatus.DRAFT)
+            db.add(session)
+            db.flush()
+            clubs.append({
+                "session_id": session.id,
+                "player_ids": [p.id for p in players],
+                "admin_token": create_access_token({"sub": admin.username}),
+                "viewer_tokens": [create_access_token({"sub": username}) for username in viewers],
+            })
+        db.commit()
+    finally:
+        db.close()
+    return clubs
+
+
+async def session_manager(client, rec: Recorder, club: dict, args, rng: random.Random, done: asyncio.Event):
+    headers = {"Authorization": f"Bearer {club['admin_token']}"}
+    sid = club["session_id"]
+    beat = args.round_seconds / 15  # One simulated minute
+
+    await rec.call(client, "POST /sessions/{id}/start", "POST", f"/sessions/{sid}/start", headers=headers)
+
+    # Check-in bursts: most players arrive in the first few minutes, stragglers later
+    arrived = []
+    waiting = list(club["player_ids"])
+    rng.shuffle(waiting)
+    for share in (0.5, 0.3, 0.2):
+        burst = waiting[:max(1, int(len(club["player_ids"]) * share))]
+        waiting = waiting[len(burst):]
+        for player_id in burst:
+            arrived.append(player_id)
+            await rec.call(client, "POST /sessions/{id}/attendance", "POST", f"/sessions/{sid}/attendance",
+                           headers=headers, json={"player_ids": list(arrived)})
+            await asyncio.sleep(rng.uniform(0.02, 0.2) * beat)
+        await asyncio.sleep(2 * beat)
+
+    version = None
+    for _ in range(args.rounds):
+        response = await rec.call(client, "POST /sessions/{id}/rounds/auto_assign", "POST",
+                                  f"/sessions/{sid}/rounds/auto_assign", headers=headers, json={"session_id": sid})
+        if response is None:
+            await asyncio.sleep(beat)
+            continue
+        round_data = response.json()
+        courts = round_data["court_assignments"]
+
+        # The manager drags one player onto another court before starting
+        if len(courts) >= 2 and courts[0]["team_a_player1_id"] and courts[1]["team_a_player1_id"]:
+            a, b = rng.sample(courts, 2)
+            await rec.call(client, "PATCH /sessions/rounds/{id}/courts", "PATCH",
+                           f"/sessions/rounds/{round_data['id']}/courts", headers=headers, json={"courts": [
+                               {"court_number": a["court_number"], "team_a_player1_id": b["team_a_player1_id"]},
+                               {"court_number": b["court_number"], "team_a_player1_id": a["team_a_player1_id"]},
+                           ]})
+
+        await rec.call(client, "POST /sessions/rounds/{id}/start", "POST",
+                       f"/sessions/rounds/{round_data['id']}/start", headers=headers)
+
+        # The manager's screen keeps the dashboard in sync while the round runs
+        round_end = time.perf_counter() + args.round_seconds
+        while time.perf_counter() < round_end:
+            params = {"since_version": version} if version is not None else {}
+            response = await rec.call(client, "GET /sessions/{id}/dashboard", "GET", f"/sessions/{sid}/dashboard",
+                                      headers=headers, params=params)
+            if response is not None:
+                version = response.json()["version"]
+            await asyncio.sleep(rng.uniform(1, 3) * beat)
+
+        await rec.call(client, "POST /sessions/rounds/{id}/end", "POST",
+                       f"/sessions/rounds/{round_data['id']}/end", headers=headers)
+
+    await rec.call(client, "POST /sessions/{id}/end", "POST", f"/sessions/{sid}/end", headers=headers)
+    done.set()
+
+
+async def portal_viewer(client, rec: Recorder, club: dict, token: str, args, rng: random.Random, done: asyncio.Event):
+    headers = {"Authorization": f"Bearer {token}"}
+    sid = club["session_id"]
+    beat = args.round_seconds / 15
+    await asyncio.sleep(rng.uniform(0, 5) * beat)  # Players open the app at different times
+
+    pages = [
+        ("GET /me", "/me"),
+        ("GET /me/stats", "/me/stats"),
+        ("GET /me/sessions", "/me/sessions"),
+        ("GET /sessions/{id}/rounds", f"/sessions/{sid}/rounds"),
+        ("GET /sessions/{id}/stats", f"/sessions/{sid}/stats"),
+    ]
+    while not done.is_set():
+        route, url = rng.choice(pages)
+        # /me/stats is 404 until the player has played, which is expected
+        await rec.call(client, route, "GET", url, headers=headers, expect=(200, 304, 404))
+        await asyncio.sleep(rng.uniform(1, 5) * beat)
+
+
+async def club_admin(client, rec: Recorder, club: dict, args, rng: random.Random, done: asyncio.Event):
+    headers = {"Authorization": f"Bearer {club['admin_token']}"}
+    beat = args.round_seconds / 15
+    while not done.is_set():
+        await rec.call(client, "GET /statistics/global", "GET", "/statistics/global", headers=headers)
+        await rec.call(client, "GET /sessions", "GET", "/sessions", headers=headers)
+        await asyncio.sleep(rng.uniform(5, 10) * beat)
+
+
+async def run_load(args, clubs: List[dict], rec: Recorder) -> float:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.clubs * (args.viewers + 2) + 10)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60, limits=limits) as client:
+        tasks = []
+        for index, club in enumerate(clubs):
+            rng = random.Random(args.seed * 1000 + index)
+            done = asyncio.Event()
+            tasks.append(session_manager(client, rec, club, args, random.Random(rng.random()), done))
+            tasks.append(club_admin(client, rec, club, args, random.Random(rng.random()), done))
+            for token in club["viewer_tokens"]:
+                tasks.append(portal_viewer(client, rec, club, token, args, random.Random(rng.random()), done))
+
+        start = time.perf_counter()
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+
+def print_summary(summary: dict) -> None:
+    print(f"\n{summary['requests']} requests in {summary['elapsed_seconds']:.1f}s "
+          f"({summary['throughput_rps']:.1f} req/s), error rate {summary['error_rate']:.2%}\n")
+    print(f"{'route':<42}{'count':>7}{'err%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, r in summary["routes"].items():
+        print(f"{route:<42}{r['requests']:>7}{r['error_rate'] * 100:>7.1f}"
+              f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              + (f"   {r['error_kinds']}" if r["errors"] else ""))
+
+
+def check_thresholds(summary: dict, args) -> List[str]:
+    failures = []
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {summary['error_rate']:.2%} > {args.max_error_rate:.2%}")
+    if args.max_p95_ms is not None:
+        for route, r in summary["routes"].items():
+            if r["p95_ms"] > args.max_p95_ms:
+                failures.append(f"{route} p95 {r['p95_ms']:.0f} ms > {args.max_p95_ms:.0f} ms")
+    return failures
+
+
+def main():
+    args = parse_args()
+
+    # Settings are read at import time, so configure the environment first
+    db_file: Optional[str] = None
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_file}"
+    os.environ.setdefault("SECRET_KEY", "loadtest")
+    os.environ["JOB_WORKERS"] = "1"
+
+    import uvicorn
+    from app.main import app
+
+    clubs = seed_database(args)
+
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    rec = Recorder()
+    print(f"{args.clubs} clubs x ({args.players} players, {args.courts} courts, {args.rounds} rounds), "
+          f"{args.viewers} portal users per club, {args.round_seconds:g}s rounds")
+    try:
+        elapsed = asyncio.run(run_load(args, clubs, rec))
+    finally:
+        server.should_exit = True
+        if db_file:
+            os.unlink(db_file)
+
+    summary = rec.summary(elapsed)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(summary, fh, indent=2)
+
+    failures = check_thresholds(summary, args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Export a club's full match history to CSV, NDJSON, Parquet or Arrow.
+
+Usage:
+    python export_match_history.py --club-id 1 --format parquet --output history.parquet
+    python export_match_history.py --club-id 1 --format csv --output history.csv.gz
+
+Parquet/Arrow output requires pyarrow (pip install pyarrow). Rows are read
+through a server-side cursor and written batch by batch.
+"""
+import argparse
+import sys
+
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.export import (DEFAULT_BATCH_SIZE, gzip_stream, iter_csv,
+                        iter_match_history_rows, iter_ndjson,
+                        iter_record_batches)
+
+
+def write_text(rows, output, fmt, compress):
+    chunks = iter_csv(rows) if fmt == "csv" else iter_ndjson(rows)
+    if compress:
+        chunks = gzip_stream(chunks)
+    with open(output, "wb") as fh:
+        for chunk in chunks:
+            fh.write(chunk)
+
+
+def write_columnar(rows, output, fmt, batch_size):
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("❌ pyarrow is required for parquet/arrow output (pip install pyarrow)")
+        sys.exit(1)
+
+    writer = None
+    try:
+        for columns in iter_record_batches(rows, batch_size):
+            batch = pa.RecordBatch.from_pydict(columns)
+            if writer is None:
+                if fmt == "parquet":
+                    writer = pq.ParquetWriter(output, batch.schema, compression="zstd")
+                else:
+                    writer = ipc.new_file(output, batch.schema)
+            if fmt == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a club's match history")
+    parser.add_argument("--club-id", type=int, required=True)
+    parser.add_argument("--session-id", type=int, default=None)
+    parser.add_argument("--format", choices=["csv", "ndjson", "parquet", "arrow"], default="csv")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = iter_match_history_rows(db, args.club_id, args.session_id, args.batch_size)
+        if args.format in ("parquet", "arrow"):
+            write_columnar(rows, args.output, args.format, args.batch_size)
+        else:
+            write_text(rows, args.output, args.format, args.output.endswith(".gz"))
+        print(f"✅ Exported match history for club {args.club_id} to {args.output}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Bulk-import a club's players from a CSV or XLSX file.
+
+Usage:
+    python import_players.py --club-id 1 players.csv
+    python import_players.py --club-id 1 players.xlsx --dry-run --errors-out errors.csv
+
+The first row must be a header. Recognised columns are the PlayerCreate
+fields (full_name, gender, level, rank_system, rank_value, numeric_rank,
+skill_tier, contact_number, ...) plus a few common aliases such as
+"name" and "phone". Players whose name already exists in the club are
+skipped. XLSX input requires openpyxl (pip install openpyxl).
+"""
+import argparse
+import csv
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.player_import import (DEFAULT_IMPORT_BATCH_SIZE, import_players,
+                               iter_import_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import players for a club")
+    parser.add_argument("file")
+    parser.add_argument("--club-id", type=int, required=True)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_IMPORT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Validate only, do not save")
+    parser.add_argument("--errors-out", help="Write rejected rows to this CSV file")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        with open(args.file, "rb") as fh:
+            rows = iter_import_rows(fh, args.file)
+            report = import_players(db, args.club_id, rows, args.batch_size, dry_run=args.dry_run)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    action = "Would create" if args.dry_run else "Created"
+    print(f"✅ {action} {report.created} players from {report.total_rows} rows in {elapsed:.1f}s")
+    print(f"   Skipped {report.duplicates} duplicates, rejected {len(report.errors)} invalid rows")
+
+    for error in report.errors[:20]:
+        print(f"   line {error.row}: {'; '.join(error.errors)}")
+    if len(report.errors) > 20:
+        print(f"   ... {len(report.errors) - 20} more")
+
+    if args.errors_out and report.errors:
+        with open(args.errors_out, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["row", "errors"])
+            for error in report.errors:
+                writer.writerow([error.row, "; ".join(error.errors)])
+        print(f"   Error report written to {args.errors_out}")
+
+
+if __name__ == "__main__":
+    main()
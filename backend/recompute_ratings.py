@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Recompute player ratings from a club's full match history.
+
+Usage:
+    python recompute_ratings.py --club-id 1 [--dry-run] [--top 10]
+    python recompute_ratings.py --all [--dry-run]
+
+Ratings are normally updated as rounds end. Run this after correcting old
+scores, changing seed ranks, or importing history: it replays every scored
+match (archived sessions included) from the seed ratings and overwrites the
+players' ratings. See app/ratings.py.
+"""
+import argparse
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.models import Club
+from app.ratings import load_club_history, recompute_club_ratings, replay
+
+
+def recompute(db, club, args):
+    started = time.perf_counter()
+    if args.dry_run:
+        history = load_club_history(db, club.id)
+        ratings, _, _ = replay(history)
+    else:
+        history, ratings = recompute_club_ratings(db, club.id)
+        db.commit()
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {club.name}: {history.num_matches} matches in {len(history.round_starts)} rounds, "
+          f"{len(history.player_ids)} players, {elapsed:.2f}s" + (" (dry run)" if args.dry_run else ""))
+
+    if args.top and history.num_matches:
+        order = ratings.argsort()[::-1][:args.top]
+        for i in order:
+            print(f"   {history.player_ids[i]:>6}  {ratings[i]:7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute player ratings from match history")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--club-id", type=int)
+    target.add_argument("--all", action="store_true", help="Every club")
+    parser.add_argument("--dry-run", action="store_true", help="Compute without saving")
+    parser.add_argument("--top", type=int, default=0, help="Print the N highest-rated players")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        query = db.query(Club).order_by(Club.id)
+        if args.club_id is not None:
+            query = query.filter(Club.id == args.club_id)
+        clubs = query.all()
+        if not clubs:
+            print(f"❌ Club {args.club_id} not found")
+            sys.exit(1)
+        for club in clubs:
+            recompute(db, club, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Database fixtures for tests that go through the ORM or the API.
+
+Each test gets a fresh in-memory SQLite database shared by every session
+(StaticPool), with ``SessionLocal`` bound to it, so request handlers, the
+job runner and the test itself all see the same data. PostgreSQL ARRAY
+columns are stored as JSON on SQLite.
+"""
+
+import os
+import uuid
+from datetime import datetime
+
+import pytest
+from app.auth import create_access_token
+from app.database import Base, SessionLocal
+from app.models import (Club, Gender, Player, Session, SessionStatus, User,
+                        UserRole)
+from sqlalchemy import ARRAY, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+# Settings are read on first use; plain ``pytest`` needs no environment
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(element, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        SessionLocal.configure(bind=previous_bind)
+        engine.dispose()
+
+
+@pytest.fixture
+def club(db):
+    club = Club(name="Test club")
+    db.add(club)
+    db.commit()
+    return club
+
+
+@pytest.fixture
+def make_players(db, club):
+    def make(count, start_rank=1.0):
+        players = [
+            Player(club_id=club.id, full_name=f"Player {i}", gender=Gender.MALE if i % 2 else Gender.FEMALE,
+                   numeric_rank=start_rank + i % 5)
+            for i in range(count)
+        ]
+        db.add_all(players)
+        db.commit()
+        return players
+    return make
+
+
+@pytest.fixture
+def live_session(db, club):
+    session = Session(club_id=club.id, name="Club night", number_of_courts=2,
+                      status=SessionStatus.ACTIVE, started_at=datetime.utcnow())
+    db.add(session)
+    db.commit()
+    return session
+
+
+@pytest.fixture
+def client(db):
+    from app.cache import get_response_cache
+    from app.main import create_app
+    from fastapi.testclient import TestClient
+
+    # Ids and versions restart with every database, so cached bodies must not outlive it
+    get_response_cache().clear()
+    # Not used as a context manager: startup hooks (job runner threads) stay off
+    return TestClient(create_app())
+
+
+@pytest.fixture
+def auth_headers(db, club):
+    # Token-only login (no password). A fresh username per test, so principals
+    # cached by earlier tests never match
+    user = User(username=f"admin-{uuid.uuid4().hex[:8]}", hashed_password="!",
+                full_name="Admin", role=UserRole.CLUB_ADMIN, club_id=club.id, is_active=True)
+    db.add(user)
+    db.commit()
+    return {"Authorization": "Bearer " + create_access_token({"sub": user.username})}
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from app.main import create_app, router_modules
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def paths(app):
+    return {route.path for route in app.routes}
+
+
+def test_router_groups_select_routers():
+    assert router_modules([]) == ["auth"]
+    assert router_modules(["portal", "portal"]) == ["auth", "player_portal"]
+    with pytest.raises(ValueError):
+        router_modules(["reports"])
+
+
+def test_portal_only_app_serves_auth_and_portal():
+    routes = paths(create_app(["portal"]))
+    assert "/auth/login" in routes
+    assert "/me/sessions" in routes
+    assert "/health" in routes
+    assert not any(path.startswith(("/sessions", "/super-admin")) for path in routes)
+
+
+def test_full_app_serves_every_group():
+    routes = paths(create_app(["club", "portal", "super_admin"]))
+    assert {"/sessions/{session_id}/rounds/auto_assign", "/me/stats", "/super-admin/clubs"} <= routes
+
+
+def run_python(code, **env):
+    base = {k: v for k, v in os.environ.items() if k not in ("DATABASE_URL", "SECRET_KEY")}
+    return subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=dict(base, **env),
+                          capture_output=True, text=True)
+
+
+def test_modules_import_without_settings():
+    result = run_python(
+        "import app.routers.sessions, app.routers.club_settings, app.routers.super_admin, tests.conftest"
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_portal_only_app_skips_club_features():
+    result = run_python(
+        "import sys\n"
+        "from app.main import create_app\n"
+        "create_app(['portal'])\n"
+        "print(sorted(m for m in ('app.jobs', 'app.preview', 'app.health', 'app.slow_queries')"
+        " if m in sys.modules))",
+        DATABASE_URL="sqlite://", SECRET_KEY="x", METRICS_ENABLED="false",
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
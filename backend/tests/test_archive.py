@@ -0,0 +1,63 @@
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+from app.archive import (ARCHIVE_FORMAT, decode_archive, decode_rounds,
+                         encode_rounds)
+from app.models import CourtAssignment, MatchType, Round, SessionArchive
+
+START = datetime(2026, 3, 1, 19, 0)
+
+
+def make_rounds(count=3):
+    rounds = []
+    for r in range(count):
+        round_obj = Round(
+            id=10 + r, session_id=7, round_index=r,
+            started_at=START + timedelta(minutes=15 * r),
+            ended_at=None if r == 2 else START + timedelta(minutes=15 * r + 14),
+            created_at=START, version=r + 1,
+            court_assignments=[]
+        )
+        for c in range(2):
+            round_obj.court_assignments.append(CourtAssignment(
+                id=1000 + r * 2 + c, round_id=round_obj.id, court_number=c,
+                team_a_player1_id=1 + c, team_a_player2_id=2 + c,
+                team_b_player1_id=3 + c, team_b_player2_id=None if c else 5,
+                match_type=MatchType.MF if c else MatchType.OTHER,
+                locked=bool(c), version=r + 1
+            ))
+        rounds.append(round_obj)
+    return rounds
+
+
+def test_round_trip_preserves_rows():
+    rounds = make_rounds()
+    decoded = decode_rounds(encode_rounds(rounds), session_id=7)
+
+    assert [r.id for r in decoded] == [10, 11, 12]
+    for original, restored in zip(rounds, decoded):
+        assert restored.session_id == 7
+        for column in ("round_index", "started_at", "ended_at", "created_at", "version"):
+            assert getattr(restored, column) == getattr(original, column)
+        assert len(restored.court_assignments) == 2
+        for court, restored_court in zip(original.court_assignments, restored.court_assignments):
+            for column in ("id", "round_id", "court_number", "team_a_player1_id", "team_b_player2_id",
+                           "match_type", "locked", "version"):
+                assert getattr(restored_court, column) == getattr(court, column)
+
+
+def test_empty_session():
+    assert decode_rounds(encode_rounds([]), session_id=1) == []
+
+
+def test_archive_payload_is_compressed_and_versioned():
+    raw = encode_rounds(make_rounds(60))
+    archive = SessionArchive(session_id=7, format=ARCHIVE_FORMAT, payload=zlib.compress(raw, 9))
+
+    assert len(archive.payload) < len(raw) / 3
+    assert len(decode_archive(archive)) == 60
+
+    archive.format = "unknown/2"
+    with pytest.raises(ValueError):
+        decode_archive(archive)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from app import auth
+from app.auth import (PasswordHasherBusy, get_password_hash,
+                      get_password_hash_async, get_password_hash_pooled,
+                      password_needs_rehash, password_queue_usage,
+                      verify_password_async)
+from app.config import settings
+
+
+@pytest.fixture
+def low_cost(monkeypatch):
+    """Keep bcrypt fast in tests."""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+
+def test_hash_uses_configured_cost(low_cost):
+    hashed = get_password_hash("secret")
+
+    assert hashed.startswith("$2b$04$")
+    assert not password_needs_rehash(hashed)
+
+
+def test_cost_change_triggers_rehash(low_cost, monkeypatch):
+    hashed = get_password_hash("secret")
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+    assert password_needs_rehash(hashed)
+    assert password_needs_rehash("not-a-bcrypt-hash")
+
+
+def test_async_hash_and_verify(low_cost):
+    async def scenario():
+        hashed = await get_password_hash_async("secret")
+        return (
+            await verify_password_async("secret", hashed),
+            await verify_password_async("wrong", hashed),
+        )
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_full_queue_is_rejected(low_cost, monkeypatch):
+    """Submissions beyond the pool's capacity fail fast instead of queueing."""
+    monkeypatch.setattr(auth, "_in_flight", password_queue_usage()[1])
+
+    with pytest.raises(PasswordHasherBusy):
+        asyncio.run(get_password_hash_async("secret"))
+    with pytest.raises(PasswordHasherBusy):
+        get_password_hash_pooled("secret")
+
+
+def test_finished_hashes_free_their_slot(low_cost):
+    hashed = get_password_hash_pooled("secret")
+
+    assert asyncio.run(verify_password_async("secret", hashed))
+    assert password_queue_usage()[0] == 0
+
+
+def test_busy_hasher_answers_503(client, auth_headers, low_cost, monkeypatch):
+    monkeypatch.setattr(auth, "_in_flight", password_queue_usage()[1])
+
+    response = client.post("/club-settings/session-managers", headers=auth_headers, json={
+        "username": "manager", "password": "secret", "full_name": "Manager"
+    })
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
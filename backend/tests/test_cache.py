@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from app.cache import ResponseCache, _etag_matches, cache_headers, make_etag
+
+
+def test_lru_evicts_least_recently_used():
+    """Reading an entry keeps it alive when the cache overflows."""
+    cache = ResponseCache(max_entries=2, max_bytes=1024)
+    cache.set("a", '"1"', b"aaa")
+    cache.set("b", '"1"', b"bbb")
+    assert cache.get("a", '"1"') == b"aaa"
+
+    cache.set("c", '"1"', b"ccc")
+
+    assert cache.get("b", '"1"') is None
+    assert cache.get("a", '"1"') == b"aaa"
+    assert cache.get("c", '"1"') == b"ccc"
+
+
+def test_byte_budget_is_enforced():
+    """Total cached bytes never exceed max_bytes."""
+    cache = ResponseCache(max_entries=100, max_bytes=10)
+    cache.set("a", '"1"', b"12345")
+    cache.set("b", '"1"', b"12345")
+    cache.set("c", '"1"', b"12345")
+
+    assert cache.size_bytes <= 10
+    assert len(cache) == 2
+    assert cache.get("a", '"1"') is None
+
+
+def test_stale_etag_is_a_miss():
+    """A body stored under an old version is not served for a new ETag."""
+    cache = ResponseCache(max_entries=10, max_bytes=1024)
+    cache.set("rounds:1", make_etag("rounds", 1, 3), b"old")
+
+    assert cache.get("rounds:1", make_etag("rounds", 1, 4)) is None
+
+
+def test_etag_matching():
+    """If-None-Match handles lists, weak validators and wildcards."""
+    etag = make_etag("stats", 7, 2)
+
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f'"other", W/{etag}', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+    assert make_etag("stats", 7, 2) != make_etag("stats", 7, 3)
+
+
+def test_responses_are_always_revalidated():
+    """No long max-age: an ended session can be restarted and its rounds reset."""
+    headers = cache_headers(make_etag("rounds", 1, 5), datetime(2024, 1, 1, 21, 0))
+
+    assert headers["Cache-Control"] == "private, no-cache"
+    assert headers["Last-Modified"] == "Mon, 01 Jan 2024 21:00:00 GMT"
+
+
+def test_player_edits_invalidate_session_responses(client, auth_headers, live_session, make_players):
+    players = make_players(4)
+    client.post(f"/sessions/{live_session.id}/attendance",
+                json={"player_ids": [p.id for p in players]}, headers=auth_headers)
+    stats_url = f"/sessions/{live_session.id}/stats"
+    first = client.get(stats_url, headers=auth_headers)
+    assert client.get(stats_url, headers=dict(auth_headers, **{"If-None-Match": first.headers["etag"]})).status_code == 304
+
+    client.patch(f"/players/{players[0].id}", json={"full_name": "Renamed"}, headers=auth_headers)
+    after = client.get(stats_url, headers=dict(auth_headers, **{"If-None-Match": first.headers["etag"]}))
+
+    assert after.status_code == 200
+    assert "Renamed" in {s["player_name"] for s in after.json()["player_stats"]}
@@ -0,0 +1,74 @@
+import gzip
+
+from app.compression import CompressionMiddleware, accepted_encodings
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+BIG = "x" * 5000
+
+
+def make_client():
+    async def big(request):
+        return PlainTextResponse(BIG)
+
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def events(request):
+        async def stream():
+            yield "data: " + BIG + "\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def pre_compressed(request):
+        return Response(gzip.compress(BIG.encode()), media_type="application/gzip")
+
+    async def chunks(request):
+        async def stream():
+            for _ in range(3):
+                yield BIG
+        return StreamingResponse(stream(), media_type="text/csv")
+
+    app = Starlette(routes=[
+        Route("/big", big), Route("/small", small), Route("/events", events),
+        Route("/pre", pre_compressed), Route("/chunks", chunks),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_accepted_encodings():
+    """q=0 entries are excluded."""
+    assert accepted_encodings("gzip, deflate;q=0.5, br;q=0") == {"gzip", "deflate"}
+    assert accepted_encodings("") == set()
+
+
+def test_gzip_large_response():
+    """Responses above the threshold are gzipped for gzip-only clients."""
+    response = make_client().get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.text == BIG
+
+
+def test_small_response_is_not_compressed():
+    response = make_client().get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_event_stream_and_compressed_content_are_skipped():
+    """SSE must stream unbuffered and gzip files must not be compressed twice."""
+    client = make_client()
+
+    assert "content-encoding" not in client.get("/events", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/pre", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_streamed_response_is_compressed_per_chunk():
+    response = make_client().get("/chunks", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BIG * 3
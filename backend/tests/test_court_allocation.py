@@ -0,0 +1,77 @@
+import itertools
+import random
+
+import pytest
+from app.algorithm import (AssignmentPreferences, PlayerStats,
+                           auto_assign_courts)
+from app.court_allocation import CourtInfo, allocate_courts, hungarian
+from app.models import Gender
+
+
+def player(player_id, rank=5.0, courts_played=()):
+    return PlayerStats(
+        player_id=player_id, name=f"Player {player_id}", gender=Gender.MALE, numeric_rank=rank,
+        matches_played=0, rounds_sitting_out=0, last_played_round=-1,
+        recent_partners=set(), recent_opponents=set(), courts_played=set(courts_played)
+    )
+
+
+def group(first_id, rank=5.0, courts_played=()):
+    return [player(first_id + i, rank, courts_played) for i in range(4)]
+
+
+def brute_force(cost):
+    n, m = len(cost), len(cost[0])
+    return min(sum(cost[i][cols[i]] for i in range(n)) for cols in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize("n,m", [(1, 1), (3, 3), (4, 6), (5, 5)])
+def test_hungarian_finds_the_minimum_cost(n, m):
+    rng = random.Random(n * 10 + m)
+    for _ in range(20):
+        cost = [[rng.randint(0, 20) for _ in range(m)] for _ in range(n)]
+        columns = hungarian(cost)
+        assert len(set(columns)) == n
+        assert sum(cost[i][c] for i, c in enumerate(columns)) == brute_force(cost)
+
+
+def test_hungarian_rejects_more_rows_than_columns():
+    with pytest.raises(ValueError):
+        hungarian([[1], [2]])
+    assert hungarian([]) == []
+
+
+def test_plain_courts_are_filled_in_order():
+    groups = [group(0), group(10), group(20)]
+    assert allocate_courts(groups, [0, 1, 2, 3], {}, AssignmentPreferences()) == [0, 1, 2]
+
+
+def test_show_and_beginner_courts_follow_group_strength():
+    groups = [group(0, rank=5.0), group(10, rank=2.0), group(20, rank=9.0)]
+    courts = {0: CourtInfo(0, show_court=True), 2: CourtInfo(2, beginners_only=True)}
+
+    assert allocate_courts(groups, [0, 1, 2], courts, AssignmentPreferences()) == [1, 2, 0]
+
+
+def test_court_variety_moves_groups_off_courts_they_played():
+    groups = [group(0, courts_played={0}), group(10, courts_played={1})]
+    assert allocate_courts(groups, [0, 1], {}, AssignmentPreferences()) == [1, 0]
+
+
+def test_poor_lighting_court_rotates():
+    groups = [group(0, courts_played={3}), group(10)]
+    courts = {0: CourtInfo(0, poor_lighting=True), 3: CourtInfo(3, poor_lighting=True)}
+    assert allocate_courts(groups, [0, 1], courts, AssignmentPreferences()) == [1, 0]
+
+
+def test_auto_assign_uses_free_courts_and_attributes():
+    players = group(0, rank=2.0) + group(10, rank=9.0) + group(20, rank=5.0)
+    courts = {2: CourtInfo(2, show_court=True)}
+    locked = {0: [20, 21, 22, 23]}
+
+    assignments, waiting = auto_assign_courts(players, 3, 0, AssignmentPreferences(), locked, courts)
+
+    by_court = {a.court_number: set(a.team_a + a.team_b) for a in assignments}
+    assert sorted(by_court) == [0, 1, 2]
+    assert by_court[2] == {10, 11, 12, 13}
+    assert waiting == []
@@ -0,0 +1,63 @@
+import pytest
+from app.models import CourtAssignment
+
+SLOTS = ("team_a_player1_id", "team_a_player2_id", "team_b_player1_id", "team_b_player2_id")
+
+
+@pytest.fixture
+def planned_round(client, auth_headers, live_session, make_players):
+    players = make_players(8)
+    client.post(f"/sessions/{live_session.id}/attendance",
+                json={"player_ids": [p.id for p in players]}, headers=auth_headers)
+    return client.post(f"/sessions/{live_session.id}/rounds/auto_assign",
+                       json={"session_id": live_session.id}, headers=auth_headers).json()
+
+
+def saved_courts(db, round_id):
+    db.expire_all()
+    courts = db.query(CourtAssignment).filter(CourtAssignment.round_id == round_id)
+    return {c.court_number: tuple(getattr(c, slot) for slot in SLOTS) for c in courts}
+
+
+def patch(client, headers, round_id, *courts):
+    return client.patch(f"/sessions/rounds/{round_id}/courts", json={"courts": list(courts)}, headers=headers)
+
+
+def test_swap_is_saved_in_one_batch(client, auth_headers, db, planned_round):
+    first, second = sorted(planned_round["court_assignments"], key=lambda c: c["court_number"])
+
+    response = patch(client, auth_headers, planned_round["id"],
+                     {"court_number": first["court_number"], "team_a_player1_id": second["team_a_player1_id"]},
+                     {"court_number": second["court_number"], "team_a_player1_id": first["team_a_player1_id"]})
+
+    assert response.status_code == 200
+    courts = saved_courts(db, planned_round["id"])
+    assert courts[first["court_number"]][0] == second["team_a_player1_id"]
+    assert courts[second["court_number"]][0] == first["team_a_player1_id"]
+
+
+@pytest.mark.parametrize("case, expected_status", [
+    ("duplicate_court", 400),
+    ("player_on_two_courts", 400),
+    ("unknown_player", 400),
+    ("missing_court", 404),
+])
+def test_rejected_batch_writes_nothing(client, auth_headers, db, planned_round, case, expected_status):
+    first, second = sorted(planned_round["court_assignments"], key=lambda c: c["court_number"])
+    before = saved_courts(db, planned_round["id"])
+    # A valid edit first, so a partial write would show
+    valid = {"court_number": first["court_number"], "team_a_player1_id": first["team_a_player2_id"],
+             "team_a_player2_id": first["team_a_player1_id"]}
+    bad = {
+        "duplicate_court": {"court_number": first["court_number"], "locked": True},
+        "player_on_two_courts": {"court_number": second["court_number"], "team_b_player2_id": first["team_b_player1_id"]},
+        "unknown_player": {"court_number": second["court_number"], "team_b_player2_id": 999999},
+        "missing_court": {"court_number": 99, "locked": True},
+    }[case]
+
+    response = patch(client, auth_headers, planned_round["id"], valid, bad)
+
+    assert response.status_code == expected_status
+    assert saved_courts(db, planned_round["id"]) == before
+    rounds = client.get(f"/sessions/{planned_round['session_id']}/rounds", headers=auth_headers).json()
+    assert not any(c["locked"] for c in rounds[0]["court_assignments"])
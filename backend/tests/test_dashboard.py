@@ -0,0 +1,80 @@
+from app.config import settings
+from app.models import Session as SessionModel
+
+
+def dashboard(client, headers, session_id, since_version=None):
+    params = {} if since_version is None else {"since_version": since_version}
+    response = client.get(f"/sessions/{session_id}/dashboard", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def play_two_rounds(client, headers, session_id, player_ids):
+    client.post(f"/sessions/{session_id}/attendance", json={"player_ids": player_ids}, headers=headers)
+    rounds = []
+    for _ in range(2):
+        round_data = client.post(f"/sessions/{session_id}/rounds/auto_assign",
+                                 json={"session_id": session_id}, headers=headers).json()
+        client.post(f"/sessions/rounds/{round_data['id']}/start", headers=headers)
+        client.post(f"/sessions/rounds/{round_data['id']}/end", headers=headers)
+        rounds.append(round_data)
+    return rounds
+
+
+def test_delta_holds_exactly_the_rows_changed_since(client, auth_headers, live_session, make_players):
+    players = make_players(10)
+    first, second = play_two_rounds(client, auth_headers, live_session.id, [p.id for p in players])
+    seen = dashboard(client, auth_headers, live_session.id)
+    assert not seen["is_delta"] and len(seen["rounds"]) == 2 and len(seen["attendance"]) == 10
+
+    court = second["court_assignments"][0]
+    client.put(f"/sessions/court-assignments/{court['id']}/score",
+               json={"team_a_score": 21, "team_b_score": 18}, headers=auth_headers)
+    delta = dashboard(client, auth_headers, live_session.id, seen["version"])
+
+    assert delta["is_delta"] and delta["version"] == seen["version"] + 1
+    assert [r["id"] for r in delta["rounds"]] == [second["id"]]
+    changed = [c for c in delta["rounds"][0]["court_assignments"] if c["id"] == court["id"]]
+    assert changed[0]["team_a_score"] == 21
+    assert delta["attendance"] == []
+    assert delta["round_ids"] == [first["id"], second["id"]]
+
+    # Nothing changed since the latest version
+    empty = dashboard(client, auth_headers, live_session.id, delta["version"])
+    assert empty["is_delta"] and empty["rounds"] == [] and empty["attendance"] == []
+
+
+def test_deleted_rows_are_missing_from_the_id_lists(client, auth_headers, live_session, make_players):
+    players = make_players(10)
+    first, second = play_two_rounds(client, auth_headers, live_session.id, [p.id for p in players])
+    seen = dashboard(client, auth_headers, live_session.id)
+    leaving = {a["id"] for a in seen["attendance"] if a["player_id"] == players[-1].id}
+
+    planned = client.post(f"/sessions/{live_session.id}/rounds/auto_assign",
+                          json={"session_id": live_session.id}, headers=auth_headers).json()
+    client.delete(f"/sessions/rounds/{planned['id']}", headers=auth_headers)
+    client.post(f"/sessions/{live_session.id}/attendance",
+                json={"player_ids": [p.id for p in players[:-1]]}, headers=auth_headers)
+    delta = dashboard(client, auth_headers, live_session.id, seen["version"])
+
+    assert delta["is_delta"]
+    assert delta["round_ids"] == [first["id"], second["id"]]
+    assert len(delta["attendance_ids"]) == 9
+    assert leaving.isdisjoint(delta["attendance_ids"])
+
+
+def test_unusable_versions_get_a_full_payload(client, auth_headers, db, live_session, make_players):
+    players = make_players(8)
+    play_two_rounds(client, auth_headers, live_session.id, [p.id for p in players])
+    version = dashboard(client, auth_headers, live_session.id)["version"]
+
+    ahead = dashboard(client, auth_headers, live_session.id, version + 5)
+    assert not ahead["is_delta"] and ahead["since_version"] is None
+    assert len(ahead["rounds"]) == 2 and len(ahead["players"]) == 8
+
+    db.query(SessionModel).filter(SessionModel.id == live_session.id).update(
+        {SessionModel.version: version + settings.DASHBOARD_MAX_DELTA_VERSIONS + 1}
+    )
+    db.commit()
+    too_old = dashboard(client, auth_headers, live_session.id, version)
+    assert not too_old["is_delta"] and len(too_old["rounds"]) == 2
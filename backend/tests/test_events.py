@@ -0,0 +1,120 @@
+import asyncio
+
+from app.events import RESYNC, SessionEventBroker
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_backlog_replays_missed_events():
+    """A client resuming from seq 1 gets events 2 and 3 in order."""
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=10)
+        for seq in (1, 3, 2):
+            broker.publish(7, seq, "round_started", {"round_id": seq})
+        _, backlog = broker.subscribe(7, last_seq=1, current_seq=3)
+        return [event.seq for event in backlog]
+
+    assert run(scenario()) == [2, 3]
+
+
+def test_resync_when_gap_no_longer_buffered():
+    """Events evicted from the ring buffer cannot be replayed."""
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=2, queue_size=10)
+        for seq in range(1, 6):
+            broker.publish(7, seq, "court_updated", {})
+        _, backlog = broker.subscribe(7, last_seq=1, current_seq=5)
+        return backlog
+
+    backlog = run(scenario())
+    assert [(e.type, e.seq) for e in backlog] == [(RESYNC, 5)]
+
+
+def test_resync_when_client_is_ahead():
+    """After a server restart the client's sequence number may be ahead."""
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=10)
+        _, backlog = broker.subscribe(7, last_seq=40, current_seq=3)
+        return backlog
+
+    assert run(scenario())[0].type == RESYNC
+
+
+def test_fan_out_and_unsubscribe():
+    """Every subscriber of a session receives new events until it unsubscribes."""
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=10)
+        first, _ = broker.subscribe(7, None, 0)
+        second, _ = broker.subscribe(7, None, 0)
+        other, _ = broker.subscribe(8, None, 0)
+        broker.publish(7, 1, "round_created", {"round_id": 1})
+        await asyncio.sleep(0)
+
+        received = [first.queue.get_nowait().seq, second.queue.get_nowait().seq]
+        broker.unsubscribe(7, first)
+        return received, other.queue.empty(), broker.subscriber_count(7)
+
+    received, other_empty, remaining = run(scenario())
+    assert received == [1, 1]
+    assert other_empty
+    assert remaining == 1
+
+
+def test_slow_subscriber_is_flagged():
+    """A full queue marks the subscriber as overflowed instead of blocking publishers."""
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=1)
+        subscriber, _ = broker.subscribe(7, None, 0)
+        broker.publish(7, 1, "court_updated", {})
+        broker.publish(7, 2, "court_updated", {})
+        await asyncio.sleep(0)
+        return subscriber
+
+    subscriber = run(scenario())
+    assert subscriber.overflowed
+    assert subscriber.queue.qsize() == 1
+
+
+def test_sse_format():
+    """Events serialise to id/event/data lines."""
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=10)
+        broker.publish(7, 4, "round_ended", {"round_id": 2})
+        _, backlog = broker.subscribe(7, 3, 4)
+        return backlog[0].to_sse()
+
+    assert run(scenario()) == 'id: 4\nevent: round_ended\ndata: {"round_id":2}\n\n'
+
+
+def test_ended_session_channel_is_dropped_with_its_last_subscriber():
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=10)
+        subscriber, _ = broker.subscribe(7, last_seq=None, current_seq=0)
+        broker.publish(7, 1, "session_ended", {})
+        broker.close(7)
+        still_open = broker.channel_count()
+        broker.unsubscribe(7, subscriber)
+
+        broker.publish(8, 1, "session_ended", {})
+        broker.close(8)
+        return still_open, broker.channel_count()
+
+    assert run(scenario()) == (1, 0)
+
+
+def test_idle_channels_are_evicted_least_recently_used_first():
+    async def scenario():
+        broker = SessionEventBroker(buffer_size=10, queue_size=10, max_channels=2)
+        watched, _ = broker.subscribe(1, last_seq=None, current_seq=0)
+        broker.publish(2, 1, "court_updated", {})
+        broker.publish(3, 1, "court_updated", {})
+        broker.publish(4, 1, "court_updated", {})
+        # Session 1 has a subscriber and stays; 2 and then 3 were idle
+        _, backlog = broker.subscribe(4, last_seq=0, current_seq=1)
+        return broker.channel_count(), broker.subscriber_count(1), backlog
+
+    count, watchers, backlog = run(scenario())
+    assert count == 2 and watchers == 1
+    assert [e.seq for e in backlog] == [1]
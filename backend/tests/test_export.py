@@ -0,0 +1,56 @@
+import gzip
+import json
+
+from app.export import (MATCH_HISTORY_COLUMNS, gzip_stream, iter_csv,
+                        iter_ndjson, iter_record_batches)
+
+
+def make_rows(count):
+    return [
+        (1, "Club Night", "2026-01-01T19:00:00", "ended", 10, i // 2, None, None,
+         i % 2, "MF", 1, "A", 2, "B", 3, "C", 4, "D")
+        for i in range(count)
+    ]
+
+
+def test_csv_has_header_and_all_rows():
+    """CSV output starts with the header and contains one line per row."""
+    data = b"".join(iter_csv(make_rows(1201), rows_per_chunk=100)).decode()
+    lines = data.strip().splitlines()
+
+    assert lines[0] == ",".join(MATCH_HISTORY_COLUMNS)
+    assert len(lines) == 1202
+
+
+def test_csv_is_chunked():
+    """Rows are emitted in several chunks instead of one big buffer."""
+    chunks = list(iter_csv(make_rows(1000), rows_per_chunk=100))
+    assert len(chunks) >= 10
+
+
+def test_ndjson_round_trip():
+    """Each NDJSON line decodes into a dict keyed by the export columns."""
+    data = b"".join(iter_ndjson(make_rows(5))).decode()
+    records = [json.loads(line) for line in data.splitlines()]
+
+    assert len(records) == 5
+    assert records[0]["match_type"] == "MF"
+    assert records[0]["round_started_at"] is None
+    assert set(records[0]) == set(MATCH_HISTORY_COLUMNS)
+
+
+def test_gzip_stream_is_valid_gzip():
+    """Incremental gzip output decompresses back to the original bytes."""
+    raw = b"".join(iter_csv(make_rows(300)))
+    compressed = b"".join(gzip_stream(iter_csv(make_rows(300))))
+
+    assert gzip.decompress(compressed) == raw
+    assert len(compressed) < len(raw)
+
+
+def test_record_batches_split_by_size():
+    """Column batches never exceed the requested size."""
+    batches = list(iter_record_batches(make_rows(25), batch_size=10))
+
+    assert [len(b["session_id"]) for b in batches] == [10, 10, 5]
+    assert batches[0]["team_a_player1_name"][0] == "A"
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from app.fairness import (METRICS, build_assignment_matrix, compute_metrics,
+                          fairness_score, gini, played_rounds, register_metric)
+
+START = datetime(2026, 1, 1, 19, 0)
+
+
+def court(a1, a2, b1, b2):
+    return SimpleNamespace(
+        team_a_player1_id=a1, team_a_player2_id=a2,
+        team_b_player1_id=b1, team_b_player2_id=b2
+    )
+
+
+def make_round(index, *courts):
+    return SimpleNamespace(
+        round_index=index,
+        created_at=START + timedelta(minutes=15 * index),
+        court_assignments=list(courts)
+    )
+
+
+def test_gini():
+    """Equal values give 0, one player taking everything approaches 1."""
+    assert gini([1, 1, 1, 1]) == pytest.approx(0.0)
+    assert gini([0, 0, 0, 4]) == pytest.approx(0.75)
+    assert gini([]) == 0.0
+
+
+def test_equal_rotation_is_perfectly_fair():
+    """Five players rotating one court evenly have a Gini of 0."""
+    rounds = [
+        make_round(0, court(1, 2, 3, 4)),
+        make_round(1, court(2, 3, 4, 5)),
+        make_round(2, court(3, 4, 5, 1)),
+        make_round(3, court(4, 5, 1, 2)),
+        make_round(4, court(5, 1, 2, 3)),
+    ]
+    matrix = build_assignment_matrix(rounds, {pid: 5.0 for pid in range(1, 6)}, number_of_courts=1)
+
+    assert fairness_score(matrix) == pytest.approx(100.0)
+    metrics = compute_metrics(matrix)
+    assert metrics["max_consecutive_sit_outs"] == 1
+    assert metrics["court_utilisation"] == 1.0
+
+
+def test_late_arrival_is_not_penalised():
+    """A player checking in before round 2 is only judged on rounds 2-3."""
+    rounds = [
+        make_round(0, court(1, 2, 3, 4)),
+        make_round(1, court(1, 2, 3, 4)),
+        make_round(2, court(1, 2, 3, 5)),
+        make_round(3, court(5, 2, 3, 4)),
+    ]
+    ranks = {pid: 5.0 for pid in range(1, 6)}
+    check_in = {5: START + timedelta(minutes=20)}
+
+    late_aware = build_assignment_matrix(rounds, ranks, 1, check_in)
+    naive = build_assignment_matrix(rounds, ranks, 1)
+
+    assert late_aware.eligible[:, 4].tolist() == [False, False, True, True]
+    assert fairness_score(late_aware) > fairness_score(naive)
+
+
+def test_consecutive_sit_outs():
+    """The longest waiting streak is reported, not the total."""
+    rounds = [
+        make_round(0, court(1, 2, 3, 4)),
+        make_round(1, court(1, 2, 3, 4)),
+        make_round(2, court(1, 2, 3, 4)),
+        make_round(3, court(5, 2, 3, 4)),
+    ]
+    matrix = build_assignment_matrix(rounds, {pid: 5.0 for pid in range(1, 6)}, 1)
+
+    assert compute_metrics(matrix, ["max_consecutive_sit_outs"]) == {"max_consecutive_sit_outs": 3.0}
+
+
+def test_partner_and_opponent_repeats():
+    """Playing the same match twice repeats every partnership and opponent."""
+    rounds = [make_round(0, court(1, 2, 3, 4)), make_round(1, court(1, 2, 3, 4))]
+    matrix = build_assignment_matrix(rounds, {pid: 5.0 for pid in range(1, 5)}, 1)
+    metrics = compute_metrics(matrix)
+
+    assert metrics["partner_repeat_rate"] == pytest.approx(0.5)
+    assert metrics["opponent_diversity"] == pytest.approx(0.5)
+
+
+def test_skill_gap_per_match():
+    """Skill gap compares the average rank of the two teams."""
+    rounds = [make_round(0, court(1, 2, 3, 4))]
+    ranks = {1: 10.0, 2: 8.0, 3: 2.0, 4: 4.0}
+    matrix = build_assignment_matrix(rounds, ranks, number_of_courts=2)
+    metrics = compute_metrics(matrix)
+
+    assert metrics["avg_skill_gap"] == pytest.approx(6.0)
+    assert metrics["court_utilisation"] == pytest.approx(0.5)
+
+
+def test_incomplete_courts_are_ignored():
+    """Courts with empty slots do not count as matches."""
+    rounds = [make_round(0, court(1, 2, 3, None))]
+    matrix = build_assignment_matrix(rounds, {1: 5.0, 2: 5.0, 3: 5.0}, 1)
+
+    assert compute_metrics(matrix, ["avg_skill_gap", "court_utilisation"]) == {
+        "avg_skill_gap": 0.0,
+        "court_utilisation": 0.0,
+    }
+
+
+def test_empty_session():
+    """Metrics are defined for sessions with no rounds or players."""
+    matrix = build_assignment_matrix([], {}, 2)
+
+    assert fairness_score(matrix) == 100.0
+    assert all(value >= 0 for value in compute_metrics(matrix).values())
+
+
+def test_register_custom_metric():
+    """Custom metrics are picked up by compute_metrics."""
+    @register_metric("rounds_played")
+    def rounds_played(matrix):
+        return float(matrix.num_rounds)
+
+    try:
+        matrix = build_assignment_matrix([make_round(0, court(1, 2, 3, 4))], {1: 5.0}, 1)
+        assert compute_metrics(matrix)["rounds_played"] == 1.0
+    finally:
+        METRICS.pop("rounds_played")
+
+
+def test_planned_round_does_not_count():
+    """Live stats and the end-of-session snapshot both skip an unstarted round."""
+    rounds = [make_round(0, court(1, 2, 3, 4)), make_round(1, court(1, 2, 3, 4))]
+    rounds[0].started_at = START
+    rounds[1].started_at = None
+    ranks = {pid: 5.0 for pid in range(1, 7)}
+
+    played = played_rounds(rounds)
+
+    assert played == rounds[:1]
+    assert build_assignment_matrix(played, ranks, 1).num_rounds == 1
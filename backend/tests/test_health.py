@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.health import ReadinessProbe, alembic_heads
+from app.models import Job, JobStatus
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+
+def make_engine(tmp_path, **kwargs):
+    engine = create_engine(f"sqlite:///{tmp_path / 'health.db'}", **kwargs)
+    Job.__table__.create(engine)
+    return engine
+
+
+def stamp_head(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        for head in alembic_heads():
+            conn.execute(text("INSERT INTO alembic_version VALUES (:head)"), {"head": head})
+
+
+def test_ready_when_migrated_and_idle(tmp_path):
+    engine = make_engine(tmp_path)
+    stamp_head(engine)
+
+    result = ReadinessProbe(lambda: engine).evaluate()
+
+    assert result["status"] == "ready", result
+    assert result["checks"]["jobs"]["backlog"] == 0
+    assert result["checks"]["migrations"]["current"] == sorted(alembic_heads())
+
+
+def test_pending_migrations_make_the_instance_unavailable(tmp_path):
+    result = ReadinessProbe(lambda: make_engine(tmp_path)).evaluate()
+
+    assert result["status"] == "unavailable"
+    assert result["checks"]["migrations"]["ok"] is False
+    assert result["checks"]["migrations"]["current"] == []
+
+
+def test_job_backlog_threshold(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_MAX_JOB_BACKLOG", 1)
+    engine = make_engine(tmp_path)
+    stamp_head(engine)
+    with Session(engine) as db:
+        for run_after in (datetime.utcnow() - timedelta(minutes=1),) * 2 + (datetime.utcnow() + timedelta(hours=1),):
+            db.add(Job(job_type="session_snapshot", payload={}, status=JobStatus.QUEUED, attempts=0,
+                       max_attempts=3, run_after=run_after))
+        db.commit()
+
+    jobs = ReadinessProbe(lambda: engine).evaluate()["checks"]["jobs"]
+
+    assert jobs == {"ok": False, "backlog": 2}
+
+
+def test_saturated_pool_skips_the_database_ping(tmp_path):
+    engine = make_engine(tmp_path, poolclass=QueuePool, pool_size=1, max_overflow=0)
+    with engine.connect():
+        result = ReadinessProbe(lambda: engine).evaluate()
+
+    assert result["checks"]["pool"] == {"ok": False, "checked_out": 1, "capacity": 1}
+    assert result["checks"]["database"]["ok"] is False
+    assert "migrations" not in result["checks"]
+
+
+def test_results_are_cached(tmp_path):
+    engine = make_engine(tmp_path)
+    calls = []
+
+    def engine_factory():
+        calls.append(1)
+        return engine
+
+    probe = ReadinessProbe(engine_factory, cache_seconds=60)
+    first = probe.check()
+
+    assert probe.check() is first
+    assert len(calls) == 1
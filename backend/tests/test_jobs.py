@@ -0,0 +1,203 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from app.config import settings
+from app.jobs import JOB_HANDLERS, JobRunner, enqueue_job
+from app.models import Job, JobStatus, SessionHistory
+
+
+@pytest.fixture(autouse=True)
+def export_dir(tmp_path, monkeypatch):
+    # Sweeps delete old export files; keep them away from a real EXPORT_DIR
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    calls = []
+
+    def ok(db, payload):
+        calls.append(payload)
+        if payload.get("sleep"):
+            time.sleep(payload["sleep"])
+        return {"done": payload["n"]}
+
+    def broken(db, payload):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(JOB_HANDLERS, "test_ok", ok)
+    monkeypatch.setitem(JOB_HANDLERS, "test_broken", broken)
+    return calls
+
+
+def reload(db, job):
+    db.expire_all()
+    return db.get(Job, job.id)
+
+
+def test_oldest_runnable_job_is_claimed(db, handlers):
+    later = enqueue_job(db, "test_ok", {"n": 0})
+    later.run_after = datetime.utcnow() + timedelta(minutes=5)
+    first = enqueue_job(db, "test_ok", {"n": 1})
+    second = enqueue_job(db, "test_ok", {"n": 2})
+    db.commit()
+    runner = JobRunner()
+
+    claimed = runner.claim_next(db)
+
+    assert claimed.id == first.id
+    assert claimed.status == JobStatus.RUNNING
+    assert claimed.attempts == 1 and claimed.locked_by == runner.worker_id
+    assert runner.run_one()
+    assert not runner.run_one()  # "later" is not due yet
+    assert reload(db, second).result == {"done": 2}
+    assert handlers == [{"n": 2}]  # the first job was only claimed, never run
+
+
+def test_failed_job_is_retried_with_backoff(db, handlers):
+    job = enqueue_job(db, "test_broken", {}, max_attempts=3)
+    db.commit()
+    runner = JobRunner()
+
+    assert runner.run_one()
+
+    job = reload(db, job)
+    assert job.status == JobStatus.QUEUED
+    assert job.attempts == 1 and job.locked_by is None
+    assert job.error == "RuntimeError: boom"
+    assert job.run_after > datetime.utcnow() + timedelta(seconds=1)
+    assert not runner.run_one()  # backing off
+
+
+def test_job_fails_after_max_attempts(db, handlers):
+    job = enqueue_job(db, "test_broken", {}, max_attempts=2)
+    db.commit()
+    runner = JobRunner()
+
+    for _ in range(2):
+        db.query(Job).update({Job.run_after: datetime.utcnow() - timedelta(seconds=1)})
+        db.commit()
+        assert runner.run_one()
+
+    job = reload(db, job)
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 2 and job.finished_at is not None
+    assert not runner.run_one()
+
+
+def test_stale_running_jobs_are_requeued_periodically(db, handlers, monkeypatch):
+    stale = enqueue_job(db, "test_ok", {"n": 1})
+    fresh = enqueue_job(db, "test_ok", {"n": 2})
+    for job, age in ((stale, 2 * settings.JOB_STALE_AFTER_SECONDS), (fresh, 1)):
+        job.status = JobStatus.RUNNING
+        job.locked_by = "crashed-host:1"
+        job.started_at = datetime.utcnow() - timedelta(seconds=age)
+    db.commit()
+    runner = JobRunner()
+
+    assert runner.sweep_if_due() == 1
+    assert reload(db, stale).status == JobStatus.QUEUED
+    assert reload(db, fresh).status == JobStatus.RUNNING
+
+    # Not again until the sweep interval has passed
+    db.query(Job).filter(Job.id == fresh.id).update({Job.started_at: datetime(2000, 1, 1)})
+    db.commit()
+    assert runner.sweep_if_due() == 0
+    monkeypatch.setattr(settings, "JOB_STALE_SWEEP_SECONDS", 0)
+    runner._next_sweep = 0.0
+    assert runner.sweep_if_due() == 1
+
+
+def test_heartbeat_keeps_a_long_job_from_being_requeued(db, handlers):
+    job = enqueue_job(db, "test_ok", {"n": 1})
+    runner = JobRunner()
+    job.status = JobStatus.RUNNING
+    job.locked_by = runner.worker_id
+    job.started_at = datetime.utcnow() - timedelta(seconds=2 * settings.JOB_STALE_AFTER_SECONDS)
+    db.commit()
+
+    assert runner.beat(job.id)
+    assert runner.requeue_stale_jobs() == 0
+    assert reload(db, job).status == JobStatus.RUNNING
+
+    # Taken over by another worker: no longer ours to keep alive
+    db.query(Job).update({Job.locked_by: "other-host:1"})
+    db.commit()
+    assert not runner.beat(job.id)
+
+
+def test_worker_beats_while_the_handler_runs(db, handlers, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.01)
+    job = enqueue_job(db, "test_ok", {"n": 1, "sleep": 0.1})
+    db.commit()
+
+    assert JobRunner().run_one()
+
+    job = reload(db, job)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.heartbeat_at > job.started_at
+
+
+def test_sweep_deletes_old_jobs_and_exports(db, handlers, export_dir):
+    old = enqueue_job(db, "test_ok", {"n": 1})
+    recent = enqueue_job(db, "test_ok", {"n": 2})
+    for job, age in ((old, settings.JOB_RETENTION_DAYS + 1), (recent, 1)):
+        job.status = JobStatus.SUCCEEDED
+        job.finished_at = datetime.utcnow() - timedelta(days=age)
+    db.commit()
+    expired, fresh = export_dir / "expired.csv.gz", export_dir / "fresh.csv.gz"
+    expired.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    past = time.time() - (settings.EXPORT_RETENTION_DAYS + 1) * 86400
+    os.utime(expired, (past, past))
+
+    JobRunner().sweep_if_due()
+
+    db.expire_all()
+    assert [j.id for j in db.query(Job)] == [recent.id]
+    assert not expired.exists() and fresh.exists()
+
+
+def test_jobs_run_inline_without_workers(db, handlers, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+
+    ok = enqueue_job(db, "test_ok", {"n": 5})
+    broken = enqueue_job(db, "test_broken", {})
+    db.commit()
+
+    assert reload(db, ok).status == JobStatus.SUCCEEDED
+    assert reload(db, ok).result == {"done": 5}
+    assert reload(db, broken).status == JobStatus.FAILED
+    assert reload(db, broken).error == "RuntimeError: boom"
+
+
+def test_restart_waits_for_pending_snapshot(db, club, live_session, client, auth_headers):
+    other = Job(job_type="session_snapshot", club_id=club.id, payload={"session_id": live_session.id + 1},
+                status=JobStatus.RUNNING, attempts=1, max_attempts=3, run_after=datetime.utcnow())
+    db.add(other)
+    db.commit()
+    assert client.post(f"/sessions/{live_session.id}/start", headers=auth_headers).status_code == 200
+
+    pending = Job(job_type="session_snapshot", club_id=club.id, payload={"session_id": live_session.id},
+                  status=JobStatus.RUNNING, attempts=1, max_attempts=3, run_after=datetime.utcnow())
+    db.add(pending)
+    db.commit()
+    assert client.post(f"/sessions/{live_session.id}/start", headers=auth_headers).status_code == 409
+
+    pending.status = JobStatus.SUCCEEDED
+    db.commit()
+    assert client.post(f"/sessions/{live_session.id}/start", headers=auth_headers).status_code == 200
+
+
+def test_ending_a_session_without_workers_saves_the_snapshot(db, live_session, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+
+    response = client.post(f"/sessions/{live_session.id}/end", headers=auth_headers)
+
+    assert response.status_code == 200
+    job = db.get(Job, int(response.headers["X-Job-Id"]))
+    assert job.status == JobStatus.SUCCEEDED
+    assert db.get(SessionHistory, job.result["session_history_id"]).session_id == live_session.id
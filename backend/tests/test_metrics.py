@@ -0,0 +1,69 @@
+from app.metrics import (Counter, Histogram, MetricsMiddleware,
+                         query_budget_exceeded, registry, request_duration,
+                         request_sql_statements)
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+engine = create_engine("sqlite://")
+
+
+def make_app(query_budget=2, server_timing=True):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, query_budget=query_budget, server_timing=server_timing)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int, queries: int = 1):
+        with engine.connect() as conn:
+            for _ in range(queries):
+                conn.execute(text("SELECT 1"))
+        return {"id": item_id}
+
+    return app
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", [0.1, 1.0], ["route"])
+    histogram.observe(("/a",), 0.05)
+    histogram.observe(("/a",), 0.5)
+    histogram.observe(("/a",), 3.0)
+
+    lines = list(histogram.render())
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 3.55' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+
+
+def test_label_values_are_escaped():
+    counter = Counter("events_total", "Events.", ["name"])
+    counter.inc(('say "hi"\n',))
+    assert list(counter.render())[-1] == 'events_total{name="say \\"hi\\"\\n"} 1'
+
+
+def test_requests_are_labelled_by_route_template_and_count_sql():
+    registry.clear()
+    client = TestClient(make_app())
+
+    response = client.get("/items/1?queries=3")
+    client.get("/items/2?queries=1")
+
+    labels = ("/items/{item_id}", "GET", "200", "none")
+    assert request_duration.count(labels) == 2
+    assert request_sql_statements.count(labels) == 2
+    assert query_budget_exceeded.value(("/items/{item_id}", "GET")) == 1
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="3 queries"' in response.headers["Server-Timing"]
+    assert 'http_request_sql_statements_sum{route="/items/{item_id}",method="GET",status="200",club="none"} 4' \
+        in registry.render()
+
+
+def test_unknown_paths_share_one_label():
+    registry.clear()
+    client = TestClient(make_app(server_timing=False))
+
+    response = client.get("/does/not/exist")
+
+    assert "Server-Timing" not in response.headers
+    assert request_duration.count(("unmatched", "GET", "404", "none")) == 1
@@ -0,0 +1,94 @@
+import io
+from types import SimpleNamespace
+
+from app.models import Club, Player, RankingSystemType
+from app.player_import import (import_players, iter_csv_rows, normalise_header,
+                               normalise_name)
+from app.rankings import DEFAULT_LEVELS, club_levels, level_to_numeric_rank
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode("utf-8-sig"))
+
+
+def test_csv_rows_use_line_numbers_and_aliases():
+    """Headers are normalised, unknown columns and blank cells dropped."""
+    rows = list(iter_csv_rows(csv_file(
+        "Name,Gender,Phone,Favourite Racket\n"
+        "Ann Lee,female,0871234567,Yonex\n"
+        ",,,\n"
+        "Bob Ray,male,,\n"
+    )))
+
+    assert rows == [
+        (2, {"full_name": "Ann Lee", "gender": "female", "contact_number": "0871234567"}),
+        (4, {"full_name": "Bob Ray", "gender": "male"}),
+    ]
+
+
+def test_normalisation():
+    assert normalise_header(" Skill-Tier ") == "skill_tier"
+    assert normalise_header("Player Name") == "full_name"
+    assert normalise_name("  Ann   LEE ") == "ann lee"
+
+
+def test_level_to_numeric_rank():
+    """Levels map onto 1-10 by position, case-insensitively."""
+    levels = ["Beginner", "Intermediate", "Advanced"]
+
+    assert level_to_numeric_rank("beginner", levels) == 1.0
+    assert level_to_numeric_rank("Intermediate", levels) == 5.5
+    assert level_to_numeric_rank("ADVANCED", levels) == 10.0
+    assert level_to_numeric_rank("Expert", levels) is None
+    assert level_to_numeric_rank("A", ["A"]) == 5.0
+
+
+def test_club_levels():
+    letters = SimpleNamespace(
+        ranking_system_type=RankingSystemType.LETTER_RANGE,
+        letter_range_start="a", letter_range_end="D"
+    )
+
+    assert club_levels(letters) == ["A", "B", "C", "D"]
+    assert club_levels(None) == DEFAULT_LEVELS
+
+
+IMPORT_CSV = (
+    "Name,Gender,Level\n"
+    "  ann   LEE ,female,3\n"  # line 2: already in the club
+    "Bob Ray,male,7\n"
+    "Cat Kim,female,10\n"
+    "bob ray,male,2\n"  # line 5: duplicate of line 3
+    "Dan Wu,robot,4\n"  # line 6: bad gender
+    "Eve Ng,female,Pro\n"  # line 7: not a club level
+    "Fay Oh,female,\n"
+)
+
+
+def test_import_dedupes_and_reports_rejected_rows(db, club):
+    other_club = Club(name="Other club")
+    db.add_all([other_club, Player(club_id=club.id, full_name="Ann Lee")])
+    db.flush()
+    db.add(Player(club_id=other_club.id, full_name="Cat Kim"))  # other clubs do not count
+    db.commit()
+
+    report = import_players(db, club.id, iter_csv_rows(csv_file(IMPORT_CSV)), batch_size=2)
+    db.commit()
+
+    assert (report.total_rows, report.created, report.duplicates) == (7, 3, 2)
+    assert [e.row for e in report.errors] == [6, 7]
+    assert report.errors[0].errors[0].startswith("gender:")
+    assert "not one of the club's levels" in report.errors[1].errors[0]
+
+    imported = {p.full_name: p for p in db.query(Player).filter(Player.club_id == club.id)}
+    assert sorted(imported) == ["Ann Lee", "Bob Ray", "Cat Kim", "Fay Oh"]
+    assert imported["Bob Ray"].gender.value == "male"
+    assert imported["Cat Kim"].numeric_rank == 10.0
+    assert imported["Fay Oh"].numeric_rank is None
+
+
+def test_dry_run_counts_without_inserting(db, club):
+    report = import_players(db, club.id, iter_csv_rows(csv_file(IMPORT_CSV)), dry_run=True)
+
+    assert report.created == 4 and report.duplicates == 1
+    assert db.query(Player).count() == 0
@@ -0,0 +1,77 @@
+import pickle
+from datetime import datetime
+
+from app.algorithm import AssignmentPreferences, PlayerStats
+from app.config import settings
+from app.models import Gender
+from app.preview import (CourtView, RoundView, SessionSnapshot,
+                         evaluate_variant, get_preview_executor,
+                         preview_variants, shutdown_preview_executor)
+
+
+def player(player_id, gender, numeric_rank=5.0):
+    return PlayerStats(
+        player_id=player_id, name=f"Player {player_id}", gender=gender, numeric_rank=numeric_rank,
+        matches_played=1, rounds_sitting_out=0, last_played_round=0,
+        recent_partners=set(), recent_opponents=set(), courts_played=set()
+    )
+
+
+def snapshot():
+    stats = [player(i, Gender.MALE if i % 2 else Gender.FEMALE, 2.0 + i % 6) for i in range(1, 11)]
+    return SessionSnapshot(
+        player_stats=stats,
+        rated_ranks={1: 9.0},
+        history=[RoundView(datetime(2024, 1, 1, 19), [CourtView(1, 2, 3, 4), CourtView(5, 6, 7, 8)])],
+        player_ranks={ps.player_id: ps.numeric_rank for ps in stats},
+        check_in_times={ps.player_id: datetime(2024, 1, 1, 18) for ps in stats},
+        number_of_courts=2,
+        round_index=1,
+    )
+
+
+def test_candidate_is_a_full_scored_round():
+    result = evaluate_variant(snapshot(), AssignmentPreferences())
+
+    courts = result["court_assignments"]
+    assert len({c["court_number"] for c in courts}) == 2
+    seated = {c[k] for c in courts for k in ("team_a_player1_id", "team_a_player2_id",
+                                             "team_b_player1_id", "team_b_player2_id")}
+    assert len(seated) == 8
+    assert seated.isdisjoint(result["waiting_player_ids"]) and len(result["waiting_player_ids"]) == 2
+    assert sum(result["match_type_counts"].values()) == 2
+    assert 0 <= result["fairness_score"] <= 100
+    assert result["fairness_metrics"]
+
+
+def test_variants_come_back_in_order(monkeypatch):
+    monkeypatch.setattr(settings, "PREVIEW_WORKERS", 0)
+    snap = snapshot()
+    variants = [(AssignmentPreferences(), False), (AssignmentPreferences(balance_skill=1.0), True)]
+
+    results = preview_variants(snap, variants)
+
+    assert len(results) == 2
+    assert results[0]["court_assignments"] == evaluate_variant(snap, *variants[0])["court_assignments"]
+
+
+def test_variants_run_on_spawned_worker_processes(monkeypatch):
+    monkeypatch.setattr(settings, "PREVIEW_WORKERS", 2)
+    shutdown_preview_executor()
+    snap = snapshot()
+    variants = [(AssignmentPreferences(), False), (AssignmentPreferences(balance_skill=1.0), True)]
+    try:
+        assert get_preview_executor()._mp_context.get_start_method() == "spawn"
+
+        results = preview_variants(snap, variants)
+    finally:
+        shutdown_preview_executor()
+
+    assert [r["court_assignments"] for r in results] == [
+        evaluate_variant(snap, *variant)["court_assignments"] for variant in variants
+    ]
+
+
+def test_snapshot_can_be_sent_to_worker_processes():
+    snap = snapshot()
+    assert pickle.loads(pickle.dumps(snap)) == snap
@@ -0,0 +1,69 @@
+import time
+
+from app.models import UserRole
+from app.principals import Principal, PrincipalCache
+
+ADMIN = Principal(id=1, username="admin", role=UserRole.CLUB_ADMIN, club_id=7, is_active=True)
+
+
+def test_cached_principal_expires():
+    """Entries are dropped once their TTL has passed."""
+    cache = PrincipalCache(ttl_seconds=0.05, max_entries=10)
+    cache.set("admin", ADMIN)
+    assert cache.get("admin") == ADMIN
+
+    time.sleep(0.06)
+    assert cache.get("admin") is None
+
+
+def test_invalidate_removes_entry():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    cache.set("admin", ADMIN)
+    cache.invalidate("admin")
+
+    assert cache.get("admin") is None
+
+
+def test_invalidate_club():
+    """Deleting a club forgets all of its users but no one else's."""
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    other = Principal(id=2, username="other", role=UserRole.CLUB_ADMIN, club_id=8, is_active=True)
+    cache.set("admin", ADMIN)
+    cache.set("other", other)
+    cache.invalidate_club(7)
+
+    assert cache.get("admin") is None
+    assert cache.get("other") == other
+
+
+def test_max_entries():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.set(name, ADMIN)
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_claims_distrusted_after_invalidation():
+    """Tokens issued before a user or club change fall back to a lookup."""
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    issued_before = time.time() - 10
+    assert cache.claims_trusted(ADMIN, issued_before)
+    assert not cache.claims_trusted(ADMIN, None)
+
+    cache.invalidate("admin")
+    assert not cache.claims_trusted(ADMIN, issued_before)
+    assert cache.claims_trusted(ADMIN, time.time() + 1)
+
+    cache.clear()
+    cache.invalidate_club(7)
+    assert not cache.claims_trusted(ADMIN, issued_before)
+
+
+def test_principal_from_claims():
+    payload = {"sub": "admin", "uid": 1, "role": "club_admin", "club_id": 7}
+
+    assert Principal.from_claims(payload) == ADMIN
+    assert Principal.from_claims({"sub": "admin"}) is None
+    assert Principal.from_claims({**payload, "role": "emperor"}) is None
@@ -0,0 +1,53 @@
+from app.algorithm import (AssignmentPreferences, PlayerStats,
+                           auto_assign_courts)
+from app.models import Gender
+from app.profiling import current_profile, profiling
+
+
+def make_players(count):
+    return [
+        PlayerStats(
+            player_id=i,
+            name=f"Player {i}",
+            gender=Gender.MALE if i % 2 else Gender.FEMALE,
+            numeric_rank=float(i % 10 + 1),
+            matches_played=0,
+            rounds_sitting_out=0,
+            last_played_round=-1,
+            recent_partners=set(),
+            recent_opponents=set(),
+            courts_played=set()
+        )
+        for i in range(count)
+    ]
+
+
+def test_profile_records_phases_and_counters():
+    with profiling(True) as profile:
+        assignments, waiting = auto_assign_courts(make_players(18), 4, 0, AssignmentPreferences())
+
+    assert current_profile() is None
+    assert set(profile.phases_us) == {"priority_sort", "gender_grouping", "team_arrangement"}
+    assert all(us >= 0 for us in profile.phases_us.values())
+    assert profile.counters["players_available"] == 18
+    assert profile.counters["courts_assigned"] == len(assignments) == 4
+    # Mixed groups have two valid arrangements, single-gender groups three
+    assert 8 <= profile.counters["arrangements_evaluated"] <= 12
+
+
+def test_disabled_profiling_collects_nothing():
+    with profiling(False) as profile:
+        assert profile is None
+        assert current_profile() is None
+        auto_assign_courts(make_players(8), 2, 0, AssignmentPreferences())
+
+
+def test_laps_accumulate():
+    with profiling(True) as profile:
+        profile.lap("a")
+        profile.lap("b")
+        profile.lap("a")
+
+    assert set(profile.phases_us) == {"a", "b"}
+    assert profile.as_dict()["counters"] == {}
+    assert profile.server_timing().startswith("assign-a;dur=")
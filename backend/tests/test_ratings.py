@@ -0,0 +1,176 @@
+import random
+
+import numpy as np
+import pytest
+from app.archive import archive_session, decode_archive, write_archive
+from app.config import settings
+from app.models import CourtAssignment, Player
+from app.ratings import (BASE_RATING, build_history, court_player_ids,
+                         initial_rating, match_delta, rank_from_rating,
+                         rate_court, recompute_club_ratings, replay)
+
+
+def test_even_teams_split_the_k_factor():
+    assert match_delta([1500, 1500, 1500, 1500], 21, 15) == pytest.approx(16.0)
+    assert match_delta([1500, 1500, 1500, 1500], 15, 21) == pytest.approx(-16.0)
+    assert match_delta([1500, 1500, 1500, 1500], 21, 21) == pytest.approx(0.0)
+    # The favourite gains little for winning
+    assert 0 < match_delta([1700, 1700, 1500, 1500], 21, 10) < 8
+
+
+def test_seed_ratings_map_back_to_ranks():
+    assert initial_rating(None) == BASE_RATING
+    assert rank_from_rating(initial_rating(7.5)) == pytest.approx(7.5)
+
+
+def test_rate_court_reverts_before_re_rating():
+    players = {i: Player(id=i, numeric_rank=5.0, rating=None, rating_matches=0) for i in range(1, 5)}
+    court = CourtAssignment(team_a_player1_id=1, team_a_player2_id=2, team_b_player1_id=3, team_b_player2_id=4,
+                            team_a_score=21, team_b_score=15, rating_delta=None)
+
+    assert rate_court(court, players)
+    assert players[1].rating == pytest.approx(1516.0)
+    assert players[3].rating == pytest.approx(1484.0)
+
+    # Corrected score: the first result no longer counts
+    court.team_a_score, court.team_b_score = 10, 21
+    assert rate_court(court, players)
+    assert players[1].rating == pytest.approx(1484.0)
+    assert players[1].rating_matches == 1
+
+    court.team_a_score = court.team_b_score = None
+    assert not rate_court(court, players)
+    assert players[1].rating == pytest.approx(1500.0)
+    assert players[1].rating_matches == 0 and court.rating_delta is None
+
+
+def sequential_replay(seeds, matches):
+    ratings = dict(seeds)
+    for _, _, _, ids, score_a, score_b in sorted(matches, key=lambda m: (m[0], m[1])):
+        delta = match_delta([ratings[pid] for pid in ids], score_a, score_b)
+        for i, pid in enumerate(ids):
+            ratings[pid] += delta if i < 2 else -delta
+    return ratings
+
+
+def test_vectorised_replay_matches_match_by_match_updates():
+    rng = random.Random(7)
+    seeds = {pid: initial_rating(rng.uniform(1, 9)) for pid in range(100, 140)}
+    matches = []
+    for round_key in range(60):
+        players = rng.sample(list(seeds), 16)
+        for court in range(4):
+            matches.append((round_key // 3, round_key, None, players[court * 4:court * 4 + 4],
+                            rng.randint(5, 21), rng.randint(5, 21)))
+    rng.shuffle(matches)
+
+    history = build_history(seeds, matches)
+    ratings, deltas, counts = replay(history)
+
+    expected = sequential_replay(seeds, matches)
+    assert ratings == pytest.approx(np.array([expected[pid] for pid in history.player_ids]))
+    assert len(history.round_starts) == 60
+    assert counts.sum() == 4 * len(matches)
+    # Zero-sum: the mean rating never moves
+    assert ratings.mean() == pytest.approx(history.seeds.mean())
+    assert deltas.shape == (len(matches),)
+
+
+def test_matches_with_unknown_players_are_skipped():
+    history = build_history({1: 1500.0, 2: 1500.0, 3: 1500.0, 4: 1500.0}, [
+        (0, 0, 10, [1, 2, 3, 4], 21, 19),
+        (0, 0, 11, [1, 2, 3, 99], 21, 19),
+    ])
+    assert history.court_ids == [10]
+
+
+def play_scored_round(client, headers, session_id, players):
+    client.post(f"/sessions/{session_id}/attendance", json={"player_ids": [p.id for p in players]}, headers=headers)
+    round_data = client.post(f"/sessions/{session_id}/rounds/auto_assign",
+                             json={"session_id": session_id}, headers=headers).json()
+    court = round_data["court_assignments"][0]
+    client.put(f"/sessions/court-assignments/{court['id']}/score",
+               json={"team_a_score": 21, "team_b_score": 12}, headers=headers)
+    client.post(f"/sessions/rounds/{round_data['id']}/start", headers=headers)
+    client.post(f"/sessions/rounds/{round_data['id']}/end", headers=headers)
+    return round_data, court
+
+
+def assert_unrated(db, players):
+    db.expire_all()
+    for player in players:
+        assert player.rating == pytest.approx(initial_rating(player.numeric_rank))
+        assert player.rating_matches == 0
+
+
+@pytest.mark.parametrize("action", ["cancel_round", "restart_session"])
+def test_deleting_rated_courts_reverts_ratings(client, auth_headers, db, live_session, make_players, action):
+    players = make_players(4)
+    round_data, _ = play_scored_round(client, auth_headers, live_session.id, players)
+    db.expire_all()
+    assert all(p.rating_matches == 1 for p in players)
+
+    if action == "cancel_round":
+        response = client.delete(f"/sessions/rounds/{round_data['id']}", headers=auth_headers)
+    else:
+        response = client.post(f"/sessions/{live_session.id}/start", headers=auth_headers)
+
+    assert response.status_code in (200, 204)
+    assert_unrated(db, players)
+
+
+@pytest.mark.parametrize("action", ["restart_session", "delete_session"])
+def test_archived_rated_courts_are_reverted(client, auth_headers, db, live_session, make_players, action,
+                                            monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)  # Snapshot inline, so a restart is not blocked
+    players = make_players(4)
+    play_scored_round(client, auth_headers, live_session.id, players)
+    client.post(f"/sessions/{live_session.id}/end", headers=auth_headers)
+    db.expire_all()
+    archive_session(db, live_session)
+    db.commit()
+
+    if action == "restart_session":
+        response = client.post(f"/sessions/{live_session.id}/start", headers=auth_headers)
+    else:
+        response = client.delete(f"/sessions/{live_session.id}", headers=auth_headers)
+
+    assert response.status_code in (200, 204)
+    assert_unrated(db, players)
+
+
+def test_rating_moves_with_a_player_swap(client, auth_headers, db, live_session, make_players):
+    players = make_players(5)
+    _, court = play_scored_round(client, auth_headers, live_session.id, players)
+    on_court = court_player_ids(db.get(CourtAssignment, court["id"]))
+    bench = next(p for p in players if p.id not in on_court)
+    replaced = next(p for p in players if p.id == on_court[0])
+
+    response = client.patch(f"/sessions/court-assignments/{court['id']}",
+                            json={"team_a_player1_id": bench.id}, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert_unrated(db, [replaced])
+    assert db.get(CourtAssignment, court["id"]).rating_delta is not None
+    assert bench.rating > initial_rating(bench.numeric_rank) and bench.rating_matches == 1
+    # The other three were reverted and re-rated once, not twice
+    assert all(p.rating_matches == 1 for p in players if p.id in on_court[1:])
+
+
+def test_recompute_rewrites_archived_rating_changes(client, auth_headers, db, club, live_session, make_players):
+    players = make_players(4)
+    _, court = play_scored_round(client, auth_headers, live_session.id, players)
+    client.post(f"/sessions/{live_session.id}/end", headers=auth_headers)
+    db.expire_all()
+    played = db.get(CourtAssignment, court["id"]).rating_delta
+    archive = archive_session(db, live_session)
+    rounds = decode_archive(archive)
+    rounds[0].court_assignments[0].rating_delta = 99.0  # Stale, e.g. from before a score correction
+    write_archive(archive, rounds)
+    db.commit()
+
+    recompute_club_ratings(db, club.id)
+    db.commit()
+
+    archived = decode_archive(live_session.archive)[0].court_assignments[0]
+    assert archived.rating_delta == pytest.approx(played)
@@ -0,0 +1,87 @@
+from app.algorithm import PlayerStats
+from app.models import Gender
+from app.replacement import ReplacementPool, fill_court
+
+M, F = Gender.MALE, Gender.FEMALE
+
+
+def player(player_id, gender=M, last_played_round=0, matches_played=1):
+    return PlayerStats(
+        player_id=player_id, name=f"Player {player_id}", gender=gender, numeric_rank=5.0,
+        matches_played=matches_played, rounds_sitting_out=0, last_played_round=last_played_round,
+        recent_partners=set(), recent_opponents=set(), courts_played=set()
+    )
+
+
+def test_pool_hands_out_highest_priority_per_gender():
+    pool = ReplacementPool([
+        player(1, M, last_played_round=2),
+        player(2, M, last_played_round=0),
+        player(3, F, last_played_round=-1, matches_played=0),
+        player(4, M, last_played_round=0),
+    ], current_round=3)
+
+    assert [p.player_id for p in pool.peek(M, 3)] == [2, 4, 1]
+    assert pool.take(M).player_id == 2
+    assert pool.take(F).player_id == 3
+    assert pool.available(F) == 0
+    assert len(pool) == 2 and 2 not in pool
+
+    pool.add(player(5, M, last_played_round=-1, matches_played=0))
+    assert pool.take(M).player_id == 5
+
+
+def test_single_departure_keeps_the_match_type():
+    pool = ReplacementPool([player(10, F, last_played_round=-1), player(11, M)], current_round=2)
+
+    assert {i: p.player_id for i, p in fill_court(pool, [M, F, None, F]).items()} == {2: 11}
+    assert 10 in pool
+
+
+def test_several_departures_are_filled_in_one_pass():
+    pool = ReplacementPool([player(i, M if i % 2 else F) for i in range(10, 14)], current_round=1)
+
+    substitutes = fill_court(pool, [None, None, None, F])
+
+    genders = [substitutes[i].gender for i in range(3)] + [F]
+    # Mixed teams: one man and one woman on each side
+    assert sorted(genders[:2]) == sorted(genders[2:]) == [F, M]
+    assert len(pool) == 1
+
+
+def test_court_is_not_filled_when_no_valid_match_exists():
+    pool = ReplacementPool([player(10, F)], current_round=1)
+
+    assert fill_court(pool, [M, M, M, None]) is None
+    assert len(pool) == 1
+    # MM vs F-something can never be a valid match
+    assert fill_court(pool, [M, M, F, None]) is None
+    assert fill_court(pool, [M, F, M, None]).keys() == {3}
+
+
+def test_higher_priority_match_type_wins():
+    # Two long-waiting men can complete the court as MM instead of MF
+    pool = ReplacementPool([
+        player(10, M, last_played_round=-1, matches_played=0),
+        player(11, M, last_played_round=-1, matches_played=0),
+        player(12, F),
+    ], current_round=3)
+
+    substitutes = fill_court(pool, [M, None, M, None])
+
+    assert {p.player_id for p in substitutes.values()} == {10, 11}
+
+
+def test_same_gender_team_is_not_completed_as_mixed():
+    # Team A is already two men, so the women waiting longer cannot make it mixed
+    pool = ReplacementPool([
+        player(10, F, last_played_round=-1, matches_played=0),
+        player(11, F, last_played_round=-1, matches_played=0),
+        player(12, M),
+        player(13, M),
+    ], current_round=3)
+
+    substitutes = fill_court(pool, [M, M, None, None])
+
+    assert {i: p.player_id for i, p in substitutes.items()} == {2: 12, 3: 13}
+    assert pool.available(F) == 2
@@ -0,0 +1,111 @@
+from app.algorithm import AssignmentPreferences, CourtAssignment, PlayerStats
+from app.models import Gender, MatchType
+from app.replan import replan_round
+
+
+def player(player_id, gender=Gender.MALE, rank=5.0, last_played_round=0, matches_played=1):
+    return PlayerStats(
+        player_id=player_id, name=f"Player {player_id}", gender=gender, numeric_rank=rank,
+        matches_played=matches_played, rounds_sitting_out=0, last_played_round=last_played_round,
+        recent_partners=set(), recent_opponents=set(), courts_played=set()
+    )
+
+
+def court(number, ids, match_type=MatchType.MM):
+    return CourtAssignment(court_number=number, team_a=(ids[0], ids[1]), team_b=(ids[2], ids[3]),
+                           match_type=match_type)
+
+
+def players_on(result):
+    return {c.court_number: [*c.team_a, *c.team_b] for c in result.assignments}
+
+
+def test_unchanged_round_is_kept():
+    players = [player(i) for i in range(8)]
+    current = [court(0, [0, 1, 2, 3]), court(1, [4, 5, 6, 7])]
+
+    result = replan_round(current, players, 2, 1, AssignmentPreferences(), max_moves=8)
+
+    assert result.moves == 0
+    assert result.changed_courts == [] and result.removed_courts == []
+    assert players_on(result) == {0: [0, 1, 2, 3], 1: [4, 5, 6, 7]}
+
+
+def test_departed_player_is_replaced_in_place_by_the_longest_waiting():
+    players = [player(i) for i in range(8) if i != 5]
+    players += [player(8, last_played_round=0), player(9, last_played_round=-1, matches_played=0)]
+    current = [court(0, [0, 1, 2, 3]), court(1, [4, 5, 6, 7])]
+
+    result = replan_round(current, players, 2, 1, AssignmentPreferences(), max_moves=1)
+
+    assert result.moves == 1
+    assert result.changed_courts == [1]
+    assert players_on(result) == {0: [0, 1, 2, 3], 1: [4, 9, 6, 7]}
+    assert result.waiting_ids == [8]
+
+
+def test_mixed_court_keeps_its_match_type():
+    players = [player(0), player(1, Gender.FEMALE), player(3, Gender.FEMALE)]
+    # The woman who waited longest would break the mixed court; the man waited long enough
+    players += [player(10, Gender.FEMALE, last_played_round=-1, matches_played=0), player(11, Gender.MALE)]
+    current = [court(0, [0, 1, 2, 3], MatchType.MF)]
+
+    result = replan_round(current, players, 1, 1, AssignmentPreferences(), max_moves=1)
+
+    assert players_on(result)[0] == [0, 1, 11, 3]
+    assert result.assignments[0].match_type == MatchType.MF
+
+
+def test_court_with_most_holes_is_dissolved_when_too_few_wait():
+    players = [player(i) for i in range(5)] + [player(8)]
+    current = [court(0, [0, 1, 2, 3]), court(1, [4, 5, 6, 7])]
+
+    result = replan_round(current, players, 2, 1, AssignmentPreferences(), max_moves=8)
+
+    assert result.removed_courts == [1]
+    assert result.moves == 1
+    assert players_on(result) == {0: [0, 1, 2, 3]}
+    assert sorted(result.waiting_ids) == [4, 8]
+
+
+def test_free_court_is_filled_without_moving_anyone():
+    players = [player(i) for i in range(4)] + [player(i, last_played_round=-1, matches_played=0) for i in range(4, 8)]
+    current = [court(0, [0, 1, 2, 3])]
+
+    result = replan_round(current, players, 2, 1, AssignmentPreferences(), max_moves=0)
+
+    assert result.moves == 0
+    assert result.changed_courts == [1]
+    assert sorted(players_on(result)[1]) == [4, 5, 6, 7]
+
+
+def test_fairness_swaps_stop_at_the_move_cap():
+    players = [player(i) for i in range(4)]
+    players += [player(i, last_played_round=-1, matches_played=0) for i in (10, 11)]
+    current = [court(0, [0, 1, 2, 3])]
+
+    capped = replan_round(current, players, 1, 2, AssignmentPreferences(), max_moves=1)
+    assert capped.moves == 1
+    assert len(set(players_on(capped)[0]) & {10, 11}) == 1
+
+    free = replan_round(current, players, 1, 2, AssignmentPreferences(), max_moves=8)
+    assert free.moves == 2
+    assert {10, 11} <= set(players_on(free)[0])
+
+
+def test_locked_courts_are_not_swapped():
+    players = [player(i) for i in range(4)] + [player(10, last_played_round=-1, matches_played=0)]
+    current = [court(0, [0, 1, 2, 3])]
+
+    result = replan_round(current, players, 1, 2, AssignmentPreferences(), max_moves=8, locked={0})
+
+    assert result.moves == 0
+    assert result.waiting_ids == [10]
+
+
+def test_returns_none_when_the_cap_is_too_low():
+    players = [player(i) for i in range(2)] + [player(i) for i in (8, 9)]
+    current = [court(0, [0, 1, 2, 3])]
+
+    assert replan_round(current, players, 1, 1, AssignmentPreferences(), max_moves=1) is None
+    assert replan_round(current, players, 1, 1, AssignmentPreferences(), max_moves=2).moves == 2
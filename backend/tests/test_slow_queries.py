@@ -0,0 +1,64 @@
+import json
+
+from app.slow_queries import (SlowQueryRecorder, is_explainable,
+                              summarise_parameters)
+from sqlalchemy import create_engine, text
+
+
+def make_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE players (id INTEGER PRIMARY KEY, full_name TEXT)"))
+        conn.execute(text("INSERT INTO players (full_name) VALUES ('Ann'), ('Bob')"))
+    return engine
+
+
+def test_records_statements_over_threshold_with_sampled_plan(tmp_path):
+    engine = make_engine(tmp_path)
+    log_file = tmp_path / "logs" / "slow.jsonl"
+    recorder = SlowQueryRecorder(threshold_ms=0, explain_sample_rate=1.0, log_file=str(log_file))
+    recorder.install(engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT * FROM players WHERE full_name = :name"), {"name": "Ann"})
+    finally:
+        recorder.uninstall(engine)
+        recorder._explain_executor.shutdown(wait=True)
+
+    [record] = recorder.recent()
+    assert record["statement"].startswith("SELECT * FROM players")
+    assert record["parameters"] == ["Ann"]
+    assert record["route"] is None
+    assert any("players" in line for line in record["explain"])
+
+    [line] = log_file.read_text().splitlines()
+    assert json.loads(line)["explain"] == record["explain"]
+
+
+def test_fast_statements_are_ignored(tmp_path):
+    engine = make_engine(tmp_path)
+    recorder = SlowQueryRecorder(threshold_ms=60_000)
+    recorder.install(engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        recorder.uninstall(engine)
+
+    assert recorder.recent() == []
+
+
+def test_parameter_summaries_are_truncated():
+    summary = summarise_parameters({"a": "x" * 500, "b": 3}, False)
+    assert summary["b"] == 3
+    assert len(summary["a"]) == 203
+
+    many = summarise_parameters([(1, "a"), (2, "b")], True)
+    assert many == {"executemany": 2, "first": [1, "a"]}
+
+
+def test_only_reads_are_explained():
+    assert is_explainable("  select 1")
+    assert is_explainable("WITH x AS (SELECT 1) SELECT * FROM x")
+    assert not is_explainable("UPDATE players SET full_name = 'x'")
+    assert not is_explainable("")
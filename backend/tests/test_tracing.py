@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from app.algorithm import (AssignmentPreferences, PlayerStats,
+                           auto_assign_courts)
+from app.models import Gender
+from app.profiling import profiling
+from app.tracing import (InMemoryExporter, _run_in_process, carrier,
+                         current_span, flame_summary, folded_stacks, submit,
+                         traced, tracer)
+from sqlalchemy import create_engine, text
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracer.configure(exporter)
+    yield exporter
+    tracer.configure(None)
+
+
+def make_players(count):
+    return [
+        PlayerStats(
+            player_id=i, name=f"Player {i}", gender=Gender.MALE if i % 2 else Gender.FEMALE,
+            numeric_rank=float(i % 10 + 1), matches_played=0, rounds_sitting_out=0, last_played_round=-1,
+            recent_partners=set(), recent_opponents=set(), courts_played=set()
+        )
+        for i in range(count)
+    ]
+
+
+def by_name(exporter):
+    return {span["name"]: span for span in exporter.spans}
+
+
+def test_spans_nest_under_the_current_span(exporter):
+    with tracer.span("request", root=True) as root:
+        with tracer.span("child", "handler", answer=42):
+            pass
+
+    assert current_span() is None
+    spans = by_name(exporter)
+    assert spans["child"]["parent_id"] == root.span_id
+    assert spans["child"]["trace_id"] == root.trace_id
+    assert spans["child"]["attributes"] == {"answer": 42}
+    assert spans["request"]["parent_id"] is None
+
+
+def test_nothing_is_recorded_outside_a_trace(exporter):
+    @traced()
+    def work():
+        return current_span()
+
+    assert work() is None
+    with tracer.span("orphan"):
+        pass
+    assert exporter.spans == []
+
+
+def test_errors_are_recorded_and_restore_the_parent(exporter):
+    with tracer.span("request", root=True) as root:
+        with pytest.raises(ValueError):
+            with tracer.span("failing"):
+                raise ValueError("boom")
+        assert current_span() is root
+
+    failing = by_name(exporter)["failing"]
+    assert failing["status"] == "error"
+    assert failing["attributes"]["error"] == "ValueError: boom"
+
+
+def test_trace_context_propagates_to_threads_and_processes(exporter):
+    def work():
+        return current_span().trace_id
+
+    with tracer.span("request", root=True) as root:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert submit(executor, work).result() == root.trace_id
+        # What a process pool worker runs, called in-process
+        assert _run_in_process(carrier(), "work", work, (), {}) == root.trace_id
+
+    offloads = [s for s in exporter.spans if s["kind"] == "offload"]
+    assert len(offloads) == 2
+    assert all(s["parent_id"] == root.span_id for s in offloads)
+
+
+def test_sql_statements_become_spans(exporter):
+    engine = create_engine("sqlite://")
+    with tracer.span("request", root=True) as root:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    [sql] = [s for s in exporter.spans if s["kind"] == "sql"]
+    assert sql["name"] == "SELECT"
+    assert sql["parent_id"] == root.span_id
+    assert sql["attributes"]["db.statement"] == "SELECT 1"
+
+
+def test_assignment_phases_are_traced(exporter):
+    with tracer.span("request", root=True):
+        with profiling(False) as profile:
+            auto_assign_courts(make_players(12), 3, 0, AssignmentPreferences())
+
+    assert profile is not None
+    spans = by_name(exporter)
+    algorithm = spans["auto_assign_courts"]
+    assert algorithm["kind"] == "algorithm"
+    for phase in ("priority_sort", "gender_grouping", "team_arrangement"):
+        assert spans[phase]["kind"] == "phase"
+        assert spans[phase]["parent_id"] == algorithm["span_id"]
+
+
+def span(span_id, parent_id, kind, name, start, duration_us):
+    return {
+        "trace_id": "t", "span_id": span_id, "parent_id": parent_id, "kind": kind,
+        "name": name, "start": start, "duration_us": duration_us,
+    }
+
+
+def test_flame_summary_aggregates_paths_and_nests_phases():
+    spans = [
+        span("r", None, "server", "GET /x", 100.0, 1000.0),
+        span("h", "r", "handler", "x", 100.0, 900.0),
+        span("p", "h", "phase", "load", 100.0, 600.0),
+        span("q1", "h", "sql", "SELECT", 100.0001, 200.0),
+        span("q2", "h", "sql", "SELECT", 100.0003, 200.0),
+        span("q3", "h", "sql", "UPDATE", 100.0008, 50.0),
+    ]
+    rows = {" > ".join(row["path"]): row for row in flame_summary(spans)}
+
+    load = rows["server:GET /x > handler:x > phase:load"]
+    assert load["self_us"] == pytest.approx(200.0)
+    selects = rows["server:GET /x > handler:x > phase:load > sql:SELECT"]
+    assert selects["count"] == 2
+    assert selects["total_us"] == pytest.approx(400.0)
+    assert rows["server:GET /x > handler:x > sql:UPDATE"]["count"] == 1
+    assert rows["server:GET /x > handler:x"]["self_us"] == pytest.approx(250.0)
+
+    assert "server:GET /x;handler:x;phase:load 200" in folded_stacks(flame_summary(spans))
@@ -0,0 +1,89 @@
+import random
+from types import SimpleNamespace
+
+from app.algorithm import AssignmentPreferences
+from app.models import Gender
+from app.routers.sessions import assignment_preferences, session_player_stats
+from app.schemas import AutoAssignmentPreferences
+from app.tuning import (TUNABLE_WEIGHTS, Scenario, ScenarioPlayer, TrialResult,
+                        _RunningStats, default_weights, grid_candidates,
+                        pareto_front, random_candidates, random_scenario,
+                        run_trials, simulate)
+
+
+def seated(round_view):
+    return [pid for c in round_view.court_assignments
+            for pid in (c.team_a_player1_id, c.team_a_player2_id, c.team_b_player1_id, c.team_b_player2_id)]
+
+
+def test_simulation_respects_arrivals_and_courts():
+    players = [ScenarioPlayer(i, Gender.MALE if i % 2 else Gender.FEMALE, 1.0 + i % 8) for i in range(1, 13)]
+    players.append(ScenarioPlayer(13, Gender.MALE, 5.0, arrives=3))
+    rounds, timings = simulate(Scenario("club night", players, 2, 5), AssignmentPreferences())
+
+    assert len(rounds) == len(timings) == 5
+    for i, round_view in enumerate(rounds):
+        ids = seated(round_view)
+        assert len(ids) == len(set(ids)) == 8
+        assert i >= 3 or 13 not in ids
+
+
+def test_running_stats_match_the_session_stats():
+    scenario = random_scenario(random.Random(3), "s", num_players=14, number_of_courts=3, num_rounds=6, late_share=0)
+    rounds, _ = simulate(scenario, AssignmentPreferences())
+
+    running = {p.player_id: _RunningStats(p) for p in scenario.players}
+    for index, round_view in enumerate(rounds):
+        for c in round_view.court_assignments:
+            teams = ((c.team_a_player1_id, c.team_a_player2_id), (c.team_b_player1_id, c.team_b_player2_id))
+            for side, team in enumerate(teams):
+                for pid in team:
+                    running[pid].played(index, None, {p for p in team if p != pid}, set(teams[1 - side]))
+
+    rows = [SimpleNamespace(round_index=i, court_assignments=[
+        SimpleNamespace(court_number=None, **vars(c)) for c in r.court_assignments
+    ]) for i, r in enumerate(rounds)]
+    orm_players = [SimpleNamespace(id=p.player_id, full_name=str(p.player_id), gender=p.gender,
+                                   numeric_rank=p.numeric_rank, rating=None) for p in scenario.players]
+    for expected in session_player_stats(rows, orm_players, len(rounds)):
+        actual = running[expected.player_id].stats(len(rounds))
+        assert (actual.matches_played, actual.last_played_round) == (expected.matches_played, expected.last_played_round)
+        assert actual.recent_partners == expected.recent_partners
+        assert actual.recent_opponents == expected.recent_opponents
+
+
+def test_candidates_stay_in_range():
+    assert len(grid_candidates(2)) == 2 ** len(TUNABLE_WEIGHTS)
+    for weights in random_candidates(20, random.Random(1)):
+        for name, (low, high) in TUNABLE_WEIGHTS.items():
+            assert low <= weights[name] <= high
+
+
+def test_pareto_front_drops_dominated_results():
+    def result(objective, latency):
+        return TrialResult({}, objective, 0.0, latency, {})
+
+    front = pareto_front([result(60, 0.2), result(55, 0.1), result(58, 0.3), result(61, 0.5), result(55, 0.15)])
+
+    assert [(r.objective, r.latency_ms) for r in front] == [(55, 0.1), (60, 0.2), (61, 0.5)]
+
+
+def test_trials_come_back_in_candidate_order():
+    scenarios = [random_scenario(random.Random(5), "s", num_players=10, number_of_courts=2, num_rounds=4)]
+    candidates = [default_weights(), dict(default_weights(), balance_skill=5.0)]
+
+    results = run_trials(scenarios, candidates, workers=0)
+
+    assert [r.weights for r in results] == candidates
+    assert all(0 < r.objective <= 100 for r in results)
+
+
+def test_club_weights_fill_in_unset_preferences():
+    club = {"balance_skill": 2.0, "prioritize_waiting": 3.0}
+
+    prefs = assignment_preferences(AutoAssignmentPreferences(prioritize_waiting=1.5, desired_mf=2), club)
+
+    assert prefs.balance_skill == 2.0
+    assert prefs.prioritize_waiting == 1.5
+    assert prefs.desired_mf == 2
+    assert assignment_preferences(AutoAssignmentPreferences()).balance_skill == AssignmentPreferences().balance_skill
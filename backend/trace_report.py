@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Summarise spans written by the JSON-lines trace exporter as a flame tree.
+
+Usage:
+    python trace_report.py [logs/traces.jsonl] [--route "POST /sessions/{session_id}/rounds/auto_assign"]
+                           [--trace TRACE_ID] [--min-percent 1] [--folded]
+
+Each line is a call path (root request > handler > ... > span) aggregated
+over all matching traces: how often it ran, total and self time, and its
+share of the root time. ``--folded`` prints folded stacks instead, for
+flamegraph.pl or speedscope.
+"""
+import argparse
+import sys
+
+sys.path.insert(0, '.')
+
+from app.tracing import flame_summary, folded_stacks, load_spans
+
+
+def select_traces(spans, route=None, trace_id=None):
+    if trace_id:
+        return [s for s in spans if s["trace_id"] == trace_id]
+    if route:
+        trace_ids = {s["trace_id"] for s in spans if s["kind"] == "server" and s["name"] == route}
+        return [s for s in spans if s["trace_id"] in trace_ids]
+    return spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flame summary of recorded request traces")
+    parser.add_argument("file", nargs="?", default="logs/traces.jsonl", help="JSON-lines trace file")
+    parser.add_argument("--route", help='Only requests to this route, e.g. "GET /sessions/{session_id}"')
+    parser.add_argument("--trace", help="Only this trace id (see the X-Trace-Id response header)")
+    parser.add_argument("--min-percent", type=float, default=0.5, help="Hide paths below this share of root time")
+    parser.add_argument("--folded", action="store_true", help="Print folded stacks (self time in µs)")
+    args = parser.parse_args()
+
+    try:
+        spans = select_traces(load_spans(args.file), args.route, args.trace)
+    except FileNotFoundError:
+        print(f"❌ No trace file at {args.file} (set TRACING_ENABLED=true and make some requests)")
+        sys.exit(1)
+    if not spans:
+        print("❌ No matching spans")
+        sys.exit(1)
+
+    rows = flame_summary(spans)
+    if args.folded:
+        print("\n".join(folded_stacks(rows)))
+        return
+
+    root_total = sum(row["total_us"] for row in rows if len(row["path"]) == 1) or 1.0
+    traces = len({s["trace_id"] for s in spans})
+    print(f"{traces} trace(s), {len(spans)} spans, {root_total / 1000:.1f} ms at the root\n")
+    print(f"{'total ms':>10} {'self ms':>9} {'%':>6} {'calls':>6}  path")
+    for row in rows:
+        percent = row["total_us"] / root_total * 100
+        if percent < args.min_percent:
+            continue
+        indent = "  " * (len(row["path"]) - 1)
+        print(
+            f"{row['total_us'] / 1000:>10.2f} {row['self_us'] / 1000:>9.2f} {percent:>6.1f} {row['count']:>6}  "
+            f"{indent}{row['path'][-1]}"
+        )
+
+
+if __name__ == "__main__":
+    main()
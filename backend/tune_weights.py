@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tune the auto-assignment weights by replaying sessions.
+
+Usage:
+    python tune_weights.py --club-id 1 [--sessions 20] [--search random --trials 200] [--workers 4] [--save]
+    python tune_weights.py --simulate 12 [--players 20 --courts 4 --rounds 10] [--search grid --steps 3]
+
+Every candidate weighting replays the club's recent ended sessions (and/or
+simulated ones) through the assignment algorithm in a process pool, and is
+scored on the fairness objective of the rounds it produced (play time,
+partner and opponent variety, skill gaps) and the algorithm's median time
+per round. The fairness/latency Pareto front is printed with the current
+defaults for comparison. ``--save`` stores the fairest front candidate (within ``--max-latency-ms``) as the club's default weights.
+See app/tuning.py.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from app.database import SessionLocal
+from app.models import Club
+from app.tuning import (TUNABLE_WEIGHTS, club_assignment_weights,
+                        default_weights, grid_candidates, load_club_scenarios,
+                        pareto_front, random_candidates, random_scenario,
+                        run_trials, save_club_weights)
+
+SHORT_NAMES = {
+    "prioritize_waiting": "wait",
+    "prioritize_equal_matches": "equal",
+    "avoid_repeat_partners": "partner",
+    "avoid_repeat_opponents": "oppon",
+    "balance_skill": "skill",
+    "court_variety": "variety",
+}
+
+
+def print_result(label, result):
+    weights = "  ".join(f"{result.weights[name]:7.3f}" for name in TUNABLE_WEIGHTS)
+    print(f"   {label:<9} {result.objective:9.2f} {result.fairness_score:6.2f} {result.latency_ms:9.3f}  {weights}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune auto-assignment weights by replaying sessions")
+    parser.add_argument("--club-id", type=int, help="Replay this club's sessions (and save to it)")
+    parser.add_argument("--sessions", type=int, default=20, help="Most recent ended sessions to replay")
+    parser.add_argument("--simulate", type=int, default=0, help="Number of simulated sessions to add")
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--courts", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--search", choices=["random", "grid"], default="random")
+    parser.add_argument("--trials", type=int, default=200, help="Random search: candidates to try")
+    parser.add_argument("--steps", type=int, default=3, help=f"Grid search: values per weight (steps ** {len(TUNABLE_WEIGHTS)} candidates)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (0 = run inline)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-latency-ms", type=float, help="Latency budget per round for --save")
+    parser.add_argument("--save", action="store_true", help="Store the chosen weights as the club's defaults")
+    args = parser.parse_args()
+
+    if args.club_id is None and not args.simulate:
+        parser.error("give --club-id and/or --simulate")
+    if args.save and args.club_id is None:
+        parser.error("--save needs --club-id")
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        scenarios = []
+        current = {}
+        if args.club_id is not None:
+            club = db.query(Club).filter(Club.id == args.club_id).first()
+            if not club:
+                print(f"❌ Club {args.club_id} not found")
+                sys.exit(1)
+            scenarios.extend(load_club_scenarios(db, club.id, args.sessions))
+            current = club_assignment_weights(db, club.id)
+            print(f"✅ {club.name}: {len(scenarios)} ended sessions to replay")
+        scenarios.extend(
+            random_scenario(rng, f"simulated {i + 1}", args.players, args.courts, args.rounds)
+            for i in range(args.simulate)
+        )
+        if not scenarios:
+            print("❌ No sessions to replay")
+            sys.exit(1)
+
+        baseline = dict(default_weights(), **{k: v for k, v in current.items() if k in TUNABLE_WEIGHTS})
+        candidates = grid_candidates(args.steps) if args.search == "grid" else random_candidates(args.trials, rng)
+        candidates.insert(0, baseline)
+
+        started = time.perf_counter()
+        results = run_trials(scenarios, candidates, args.workers)
+        elapsed = time.perf_counter() - started
+        print(f"✅ {len(candidates)} candidates x {len(scenarios)} sessions in {elapsed:.1f}s "
+              f"({args.workers} workers)")
+
+        front = pareto_front(results)
+        print(f"\n   {'':<9} {'objective':>9} {'play':>6} {'ms/round':>9}  " + "  ".join(f"{SHORT_NAMES[n]:>7}" for n in TUNABLE_WEIGHTS))
+        print_result("current", results[0])
+        for i, result in enumerate(front, 1):
+            print_result(f"front {i}", result)
+
+        if args.save:
+            eligible = [r for r in front if args.max_latency_ms is None or r.latency_ms <= args.max_latency_ms]
+            if not eligible:
+                print(f"❌ No candidate within {args.max_latency_ms} ms per round")
+                sys.exit(1)
+            chosen = max(eligible, key=lambda r: r.objective)
+            if chosen.objective <= results[0].objective:
+                print("\n✅ No candidate is fairer than the current weights; nothing saved")
+                return
+            save_club_weights(db, args.club_id, dict(current, **chosen.weights))
+            db.commit()
+            print(f"\n✅ Saved weights with objective {chosen.objective:.2f} "
+                  f"(was {results[0].objective:.2f})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { Round, RoundPreview, RoundReplan, SessionCourt, SessionDashboard } from '../types';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
@@ -46,6 +47,10 @@ export const sessionsAPI = {
   getAll: (params?: { skip?: number; limit?: number }) =>
     api.get('/sessions', { params }),
   getById: (id: number) => api.get(`/sessions/${id}`),
+  getDashboard: (id: number, sinceVersion?: number) =>
+    api.get<SessionDashboard>(`/sessions/${id}/dashboard`, {
+      params: sinceVersion !== undefined ? { since_version: sinceVersion } : undefined,
+    }),
   create: (data: any) => api.post('/sessions', data),
   update: (id: number, data: any) => api.patch(`/sessions/${id}`, data),
   delete: (id: number) => api.delete(`/sessions/${id}`),
@@ -62,8 +67,39 @@ export const sessionsAPI = {
     }
     return api.post(`/sessions/${id}/rounds/auto_assign`, payload);
   },
+  // Re-plan the unstarted round in place; only changed courts come back
+  replanRound: (id: number, preferences: any, max_moves = 8) =>
+    api.post<RoundReplan>(`/sessions/${id}/rounds/replan`, { preferences, max_moves }),
+  // Compare the next round under several preference variants; nothing is saved
+  previewRound: (id: number, variants: { name: string; preferences: any }[]) =>
+    api.post<RoundPreview>(`/sessions/${id}/rounds/preview`, { variants }),
   getStats: (id: number) => api.get(`/sessions/${id}/stats`),
+  getCourts: (id: number) => api.get<SessionCourt[]>(`/sessions/${id}/courts`),
+  updateCourts: (id: number, courts: Omit<SessionCourt, 'id' | 'session_id'>[]) =>
+    api.put<SessionCourt[]>(`/sessions/${id}/courts`, { courts }),
   startSession: (id: number) => api.post(`/sessions/${id}/start`),
+  // EventSource cannot send headers, so the token goes in the query string
+  eventsUrl: (id: number) =>
+    `${API_URL}/sessions/${id}/events?access_token=${encodeURIComponent(localStorage.getItem('token') || '')}`,
+};
+
+// Apply a delta dashboard response to the previously loaded one
+export const mergeDashboard = (previous: SessionDashboard, delta: SessionDashboard): SessionDashboard => {
+  const mergeById = <T extends { id: number }>(rows: T[], changed: T[], keepIds: number[]) => {
+    const byId = new Map(rows.map((row) => [row.id, row]));
+    changed.forEach((row) => byId.set(row.id, row));
+    return keepIds.filter((id) => byId.has(id)).map((id) => byId.get(id)!);
+  };
+  const rounds = mergeById(previous.rounds, delta.rounds, delta.round_ids)
+    .sort((a, b) => a.round_index - b.round_index);
+  return {
+    ...delta,
+    players: mergeById(previous.players, delta.players, [
+      ...new Set([...previous.players, ...delta.players].map((p) => p.id)),
+    ]),
+    rounds,
+    attendance: mergeById(previous.attendance, delta.attendance, delta.attendance_ids),
+  };
 };
 
 // Rounds API
@@ -73,8 +109,13 @@ export const roundsAPI = {
   cancel: (id: number) => api.delete(`/sessions/rounds/${id}`),
   updateCourt: (roundId: number, courtNumber: number, data: any) =>
     api.patch(`/sessions/rounds/${roundId}/courts/${courtNumber}`, data),
+  updateCourts: (roundId: number, courts: any[]) =>
+    api.patch<Round>(`/sessions/rounds/${roundId}/courts`, { courts }),
   updateCourtAssignment: (courtAssignmentId: number, data: any) =>
     api.patch(`/sessions/court-assignments/${courtAssignmentId}`, data),
+  // Pass nulls to clear the result
+  setScore: (courtAssignmentId: number, team_a_score: number | null, team_b_score: number | null) =>
+    api.put(`/sessions/court-assignments/${courtAssignmentId}/score`, { team_a_score, team_b_score }),
 };
 
 // Player Portal API
@@ -1,12 +1,12 @@
 import { DndContext, DragEndEvent, DragOverEvent, DragOverlay, DragStartEvent, pointerWithin } from '@dnd-kit/core';
 import React, { useEffect, useRef, useState } from 'react';
 import { useNavigate, useParams } from 'react-router-dom';
-import { clubSettingsAPI, playersAPI, roundsAPI, sessionsAPI } from '../api/client';
+import { clubSettingsAPI, mergeDashboard, playersAPI, roundsAPI, sessionsAPI } from '../api/client';
 import ConfirmDialog from '../components/ConfirmDialog';
 import CourtCard from '../components/CourtCard';
 import WaitingList from '../components/WaitingList';
 import { useNotification } from '../context/NotificationContext';
-import { Attendance, CourtAssignment, MatchType, Player, Round, Session, SessionStats } from '../types';
+import { Attendance, CourtAssignment, MatchType, Player, Round, Session, SessionDashboard, SessionStats } from '../types';
 
 const SessionDetail: React.FC = () => {
   const { id } = useParams<{ id: string }>();
@@ -81,13 +81,42 @@ const SessionDetail: React.FC = () => {
   const alarmAudioContextRef = useRef<AudioContext | null>(null);
   const { showNotification } = useNotification();
 
+  // Last dashboard payload; later loads only fetch what changed since its version
+  const dashboardRef = useRef<SessionDashboard | null>(null);
+
   useEffect(() => {
     // Load data
+    dashboardRef.current = null;
     loadData();
     loadClubLevels();
     loadClubSettings();
   }, [sessionId]);
 
+  // Live updates: reload when another screen changes this session
+  const loadDataRef = useRef<() => Promise<void>>();
+  useEffect(() => {
+    if (!sessionId || typeof EventSource === 'undefined') return;
+
+    const source = new EventSource(sessionsAPI.eventsUrl(sessionId));
+    let reloadTimeout: ReturnType<typeof setTimeout> | null = null;
+    const scheduleReload = () => {
+      // Coalesce bursts (e.g. a round ending and the next one being created)
+      if (reloadTimeout) clearTimeout(reloadTimeout);
+      reloadTimeout = setTimeout(() => loadDataRef.current?.(), 300);
+    };
+    const eventTypes = [
+      'round_created', 'round_started', 'round_ended', 'round_cancelled',
+      'court_updated', 'courts_updated', 'attendance_changed',
+      'session_started', 'session_ended', 'session_updated', 'resync',
+    ];
+    eventTypes.forEach((type) => source.addEventListener(type, scheduleReload));
+
+    return () => {
+      if (reloadTimeout) clearTimeout(reloadTimeout);
+      source.close();
+    };
+  }, [sessionId]);
+
   const loadClubLevels = async () => {
     try {
       const response = await clubSettingsAPI.getLevels();
@@ -177,20 +206,24 @@ const SessionDetail: React.FC = () => {
 
   const loadData = async () => {
     try {
-      const [sessionRes, playersRes, roundsRes, attendanceRes] = await Promise.all([
-        sessionsAPI.getById(sessionId),
-        playersAPI.getAll({ is_active: true }),
-        sessionsAPI.getRounds(sessionId),
-        sessionsAPI.getAttendance(sessionId),
-      ]);
+      const previous = dashboardRef.current;
+      const dashboardRes = await sessionsAPI.getDashboard(sessionId, previous?.version);
+      const dashboard = previous && dashboardRes.data.is_delta
+        ? mergeDashboard(previous, dashboardRes.data)
+        : dashboardRes.data;
+      dashboardRef.current = dashboard;
+      const sessionData = dashboard.session;
+      const playersData = dashboard.players;
+      const roundsData = dashboard.rounds;
+      const attendanceData = dashboard.attendance;
       
-      setSession(sessionRes.data);
-      setAllPlayers(playersRes.data);
-      setRounds(roundsRes.data);
-      setAttendanceRecords(attendanceRes.data);
+      setSession(sessionData);
+      setAllPlayers(playersData);
+      setRounds(roundsData);
+      setAttendanceRecords(attendanceData);
       
       // Set attendance from backend (now includes guest players with is_temp=true)
-      const attendancePlayerIds = attendanceRes.data.map((a: any) => a.player_id);
+      const attendancePlayerIds = attendanceData.map((a: any) => a.player_id);
       
       // Always set these states, even if empty (important for ended sessions)
       setPresentPlayers(attendancePlayerIds);
@@ -199,7 +232,7 @@ const SessionDetail: React.FC = () => {
       // Only set temporaryPlayers if there's actual attendance
       // This prevents showing guest players when reopening an ended session
       if (attendancePlayerIds.length > 0) {
-        const guestPlayers = playersRes.data.filter((p: Player) => p.is_temp);
+        const guestPlayers = playersData.filter((p: Player) => p.is_temp);
         const activeGuestPlayers = guestPlayers.filter((p: Player) => 
           attendancePlayerIds.includes(p.id)
         );
@@ -209,17 +242,17 @@ const SessionDetail: React.FC = () => {
         setTemporaryPlayers([]);
       }
       
-      if (roundsRes.data.length > 0) {
-        const latestRound = roundsRes.data[roundsRes.data.length - 1];
+      if (roundsData.length > 0) {
+        const latestRound = roundsData[roundsData.length - 1];
         setCurrentRound(latestRound);
         
         // Set timer state based on round status
-        if (latestRound.started_at && !latestRound.ended_at && sessionRes.data) {
+        if (latestRound.started_at && !latestRound.ended_at && sessionData) {
           // Round is active, calculate remaining time
           const startTime = new Date(latestRound.started_at).getTime();
           const now = Date.now();
           const elapsedSeconds = Math.floor((now - startTime) / 1000);
-          const totalSeconds = sessionRes.data.match_duration_minutes * 60;
+          const totalSeconds = sessionData.match_duration_minutes * 60;
           const remaining = Math.max(0, totalSeconds - elapsedSeconds);
           setTimeRemaining(remaining);
           setIsTimerRunning(true);
@@ -238,6 +271,7 @@ const SessionDetail: React.FC = () => {
       setLoading(false);
     }
   };
+  loadDataRef.current = loadData;
 
   const handleSetAttendance = async (playerIds?: number[], silent = false) => {
     try {
@@ -459,11 +493,7 @@ const SessionDetail: React.FC = () => {
         desired_mm: mm,
         desired_mf: mf,
         desired_ff: ff,
-        prioritize_waiting: 1.0,
-        prioritize_equal_matches: 1.0,
-        avoid_repeat_partners: 0.5,
-        avoid_repeat_opponents: 0.3,
-        balance_skill: 0.5,
+        // Weights are left to the club's tuned defaults
       });
       // Immediately update currentRound state from response
       setCurrentRound(response.data);
@@ -489,20 +519,17 @@ const SessionDetail: React.FC = () => {
     setShowResetCourtsConfirm(false);
     
     try {
-      // Clear all court assignments sequentially to avoid race conditions
-      for (const court of currentRound.court_assignments) {
-        try {
-          await roundsAPI.updateCourtAssignment(court.id, {
-            team_a_player1_id: null,
-            team_a_player2_id: null,
-            team_b_player1_id: null,
-            team_b_player2_id: null,
-          });
-        } catch (courtError) {
-          console.error(`Failed to clear court ${court.court_number}:`, courtError);
-          // Continue with other courts even if one fails
-        }
-      }
+      // Clear all courts in one transaction
+      await roundsAPI.updateCourts(
+        currentRound.id,
+        currentRound.court_assignments.map(court => ({
+          court_number: court.court_number,
+          team_a_player1_id: null,
+          team_a_player2_id: null,
+          team_b_player1_id: null,
+          team_b_player2_id: null,
+        }))
+      );
       
       showNotification('success', 'All courts cleared. Players moved to waiting list.');
       
@@ -1076,20 +1103,22 @@ const SessionDetail: React.FC = () => {
       setRounds(rounds.map(r => r.id === updatedRound.id ? updatedRound : r));
 
       try {
-        // Update each affected court on the backend
+        // Save both affected courts in one transaction so a swap is never half-applied
         const courtsToUpdate = new Set([source.courtId, target.courtId]);
-        for (const courtId of courtsToUpdate) {
-          const court = updatedAssignments.find(c => c.id === courtId);
-          if (court) {
-            await roundsAPI.updateCourtAssignment(court.id, {
+        const response = await roundsAPI.updateCourts(
+          currentRound.id,
+          updatedAssignments
+            .filter(c => courtsToUpdate.has(c.id))
+            .map(court => ({
+              court_number: court.court_number,
               team_a_player1_id: court.team_a_player1_id || null,
               team_a_player2_id: court.team_a_player2_id || null,
               team_b_player1_id: court.team_b_player1_id || null,
               team_b_player2_id: court.team_b_player2_id || null,
-              match_type: court.match_type,
-            });
-          }
-        }
+            }))
+        );
+        setCurrentRound(response.data);
+        setRounds(rounds.map(r => r.id === response.data.id ? response.data : r));
         
         showNotification('success', 'Players swapped successfully');
         const statsRes = await sessionsAPI.getStats(sessionId);
@@ -2368,11 +2397,6 @@ const SessionDetail: React.FC = () => {
                           desired_mm: 0,
                           desired_mf: 0,
                           desired_ff: 0,
-                          prioritize_waiting: 1.0,
-                          prioritize_equal_matches: 1.0,
-                          avoid_repeat_partners: 0.5,
-                          avoid_repeat_opponents: 0.3,
-                          balance_skill: 0.5,
                         };
                         
                         if (autoAssignRemaining) {
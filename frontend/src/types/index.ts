@@ -56,6 +56,8 @@ export interface Player {
   rank_system?: string;
   rank_value?: string;
   numeric_rank?: number;
+  rating?: number | null;
+  rating_matches?: number;
   skill_tier?: number;
   level?: string;
   is_active: boolean;
@@ -80,6 +82,16 @@ export interface Session {
   ended_at?: string;
 }
 
+export interface SessionCourt {
+  id: number;
+  session_id: number;
+  court_number: number;
+  name?: string | null;
+  show_court: boolean;
+  poor_lighting: boolean;
+  beginners_only: boolean;
+}
+
 export enum AttendanceStatus {
   PRESENT = 'present',
   LEFT = 'left',
@@ -110,6 +122,8 @@ export interface CourtAssignment {
   team_b_player2_id?: number;
   match_type: MatchType;
   locked: boolean;
+  team_a_score?: number | null;
+  team_b_score?: number | null;
 }
 
 export interface Round {
@@ -122,6 +136,44 @@ export interface Round {
   court_assignments: CourtAssignment[];
 }
 
+export interface RoundReplan {
+  round_id: number;
+  warm_start: boolean;
+  moves: number;
+  changed_courts: CourtAssignment[];
+  removed_courts: number[];
+  waiting_player_ids: number[];
+}
+
+export interface RoundPreviewCandidate {
+  name: string;
+  court_assignments: Omit<CourtAssignment, 'id' | 'round_id'>[];
+  waiting_player_ids: number[];
+  match_type_counts: Record<string, number>;
+  round_skill_gap: number;
+  fairness_score: number;
+  fairness_metrics: Record<string, number>;
+  elapsed_ms: number;
+}
+
+export interface RoundPreview {
+  session_id: number;
+  round_index: number;
+  candidates: RoundPreviewCandidate[];
+}
+
+export interface SessionDashboard {
+  version: number;
+  since_version?: number;
+  is_delta: boolean;
+  session: Session;
+  players: Player[];
+  rounds: Round[];
+  attendance: Attendance[];
+  round_ids: number[];
+  attendance_ids: number[];
+}
+
 export interface AutoAssignmentPreferences {
   desired_mm: number;
   desired_mf: number;
@@ -131,6 +183,11 @@ export interface AutoAssignmentPreferences {
   avoid_repeat_partners: number;
   avoid_repeat_opponents: number;
   balance_skill: number;
+  court_variety?: number;
+  show_court_weight?: number;
+  beginner_court_weight?: number;
+  poor_lighting_rotation?: number;
+  balance_on_rating?: boolean;
 }
 
 export interface PlayerSessionStats {
@@ -150,6 +207,7 @@ export interface SessionStats {
   total_rounds: number;
   player_stats: PlayerSessionStats[];
   fairness_score: number;
+  fairness_metrics?: Record<string, number>;
   avg_matches_per_player: number;
   avg_waiting_time: number;
 }